@@ -0,0 +1,350 @@
+# Benchmarks: bench.py
+#
+# Micro-benchmarks for the native DCF functions (each timed against the
+# pure-Python port in reference.py), the valuation pipeline in main.py and
+# JSON serialization. Runs offline against the frames in fixtures.py.
+#
+#   python benchmarks/bench.py --output results.json
+#   python benchmarks/bench.py --compare baseline.json   # exit 1 on regressions
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'main'))
+sys.path.insert(0, HERE)
+
+# Quiet, in-memory, no upstream and no background jobs: must be set before
+# main is imported
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('WARMUP', '0')
+os.environ.setdefault('SCREENER', '0')
+os.environ.setdefault('PREFETCH', '0')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+os.environ.setdefault('MARKET_DATA_PROVIDER', 'replay')
+
+import numpy as np
+import pandas as pd
+import dcf_calculator as dcf
+import main
+import reference as ref
+from fixtures import FixtureProvider, FINANCIALS, BALANCE_SHEET, CASHFLOW
+from history import build_history, build_compact_history
+from encoding import compress
+from providers import TimedProvider
+from statements import extract_table, STATEMENT_FIELDS
+
+main.provider = TimedProvider(FixtureProvider())
+
+TICKER = 'BENCH'
+BATCH_SIZE = 10_000
+GRID_STEPS = 50
+MONTE_CARLO_SIMULATIONS = 20_000
+
+
+class Benchmark:
+    """
+    One timed case: `native` is the implementation under test and
+    `reference`, when given, the pure-Python baseline it is checked and
+    compared against.
+    """
+
+    def __init__(self, name, group, native, reference=None, check=True):
+        self.name = name
+        self.group = group
+        self.native = native
+        self.reference = reference
+        self.check = check and reference is not None
+
+
+def valuation_inputs():
+    """The same inputs value_company gets in production, as a struct and as a dict."""
+    stock_data, fcf = main.extract_valuation_inputs(TICKER)
+    fields = {
+        'market_cap': stock_data['marketCap'],
+        'total_debt': stock_data['totalDebt'],
+        'ebit': stock_data['ebit'],
+        'tax_rate': stock_data['taxRate'],
+        'net_debt': stock_data['netDebt'],
+        'shares_outstanding': stock_data['dilutedAverageShares'],
+        'invested_capital': stock_data['investedCapital'],
+        'capex': stock_data['capex'],
+        'change_in_working_capital': stock_data['changeInWorkingCapital'],
+        'treasury_rate': stock_data['treasuryRate'],
+        'benchmark_etf_return': stock_data['benchmarkEtfReturn'],
+        'industry_rate': stock_data['industryRate'],
+        'beta': stock_data['beta'],
+        'interest_expense': stock_data['interestExpense'],
+        'fcf_values': list(fcf.values()),
+    }
+    inputs = dcf.ValuationInputs()
+    for key, value in fields.items():
+        setattr(inputs, key, value)
+    return inputs, fields
+
+
+def monte_carlo_inputs():
+    fields = {
+        'base_fcf': 1.0e11, 'projection_growth': 0.06, 'projection_years': 5, 'shares_outstanding': 1.5e10, 'net_debt': 8.0e10, 'market_cap': 3.0e12,
+        'total_debt': 1.1e11, 'cost_of_debt': 0.027, 'tax_rate': 0.17, 'risk_free_rate': 0.045,
+        'market_return': 0.075, 'beta': 1.2, 'beta_sd': 0.2, 'cagr': 0.06, 'cagr_sd': 0.05,
+        'reinvestment': 0.02, 'reinvestment_sd': 0.05, 'wacc_sd': 0.01,
+    }
+    inputs = dcf.MonteCarloInputs()
+    for key, value in fields.items():
+        setattr(inputs, key, value)
+    return inputs, fields
+
+
+def build_benchmarks() -> list:
+    fcf = [1.08e11, 9.9e10, 1.11e11, 9.3e10]
+    future = ref.estimate_future_fcf(fcf)
+    struct, fields = valuation_inputs()
+    mc_struct, mc_fields = monte_carlo_inputs()
+
+    rng = np.random.default_rng(0)
+    fcf_matrix = rng.uniform(5e8, 5e9, (BATCH_SIZE, 5))
+    waccs = rng.uniform(0.06, 0.12, BATCH_SIZE)
+    growths = np.full(BATCH_SIZE, 0.03)
+    net_debts = rng.uniform(-1e9, 1e9, BATCH_SIZE)
+    # Company-level inputs for the element-wise batch functions
+    operating_cfs = rng.uniform(1e9, 8e9, BATCH_SIZE)
+    capexes = rng.uniform(1e8, 1e9, BATCH_SIZE)
+    market_caps = rng.uniform(1e10, 1e12, BATCH_SIZE)
+    total_debts = rng.uniform(1e9, 5e10, BATCH_SIZE)
+    costs_of_equity = rng.uniform(0.06, 0.14, BATCH_SIZE)
+    costs_of_debt = rng.uniform(0.02, 0.07, BATCH_SIZE)
+    tax_rates = rng.uniform(0.1, 0.3, BATCH_SIZE)
+    risk_free_rates = np.full(BATCH_SIZE, 0.045)
+    betas = rng.uniform(0.5, 2.0, BATCH_SIZE)
+    market_returns = np.full(BATCH_SIZE, 0.075)
+    interest_expenses = rng.uniform(5e7, 2e9, BATCH_SIZE)
+    tax_expenses = rng.uniform(1e8, 2e9, BATCH_SIZE)
+    pretax_incomes = rng.uniform(1e9, 1e10, BATCH_SIZE)
+    ebits = rng.uniform(1e9, 1e10, BATCH_SIZE)
+    invested_capitals = rng.uniform(5e9, 5e10, BATCH_SIZE)
+    working_capital_changes = rng.uniform(-5e8, 5e8, BATCH_SIZE)
+    equity_values = rng.uniform(1e10, 1e12, BATCH_SIZE)
+    shares = rng.uniform(1e8, 1e10, BATCH_SIZE)
+    # FCF histories of 2 to 5 years, NaN-padded on the right
+    fcf_history = rng.uniform(5e8, 5e9, (BATCH_SIZE, 5))
+    fcf_history[np.arange(5)[None, :] >= rng.integers(2, 6, BATCH_SIZE)[:, None]] = np.nan
+    grid_waccs = np.linspace(0.05, 0.11, GRID_STEPS)
+    grid_growths = np.linspace(0.01, 0.05, GRID_STEPS)
+
+    stock_data, fcf_by_year = main.extract_valuation_inputs(TICKER)
+    statements = main.get_snapshot(TICKER, main.provider).statements
+    valuation = main.filter_stock_financials(TICKER)
+    history = build_history(TICKER, main.provider)
+    compact_history = build_compact_history(TICKER, main.provider, precision='float32')
+
+    return [
+        # Native scalar functions
+        Benchmark('yearly_fcf', 'native', lambda: dcf.yearly_fcf(1.18e11, 9.4e9), lambda: ref.yearly_fcf(1.18e11, 9.4e9)),
+        Benchmark('discount_rate', 'native', lambda: dcf.discount_rate(3e12, 1.1e11, 0.08, 0.03, 0.17), lambda: ref.discount_rate(3e12, 1.1e11, 0.08, 0.03, 0.17)),
+        Benchmark('calculate_total_debt', 'native', lambda: dcf.calculate_total_debt(1e10, 9e10), lambda: ref.calculate_total_debt(1e10, 9e10)),
+        Benchmark('calculate_cost_of_equity', 'native', lambda: dcf.calculate_cost_of_equity(0.045, 1.2, 0.075), lambda: ref.calculate_cost_of_equity(0.045, 1.2, 0.075)),
+        Benchmark('calculate_cost_of_debt', 'native', lambda: dcf.calculate_cost_of_debt(3e9, 1.1e11), lambda: ref.calculate_cost_of_debt(3e9, 1.1e11)),
+        Benchmark('calculate_tax_rate', 'native', lambda: dcf.calculate_tax_rate(2.9e10, 1.2e11), lambda: ref.calculate_tax_rate(2.9e10, 1.2e11)),
+        Benchmark('calculate_cagr', 'native', lambda: dcf.calculate_cagr(fcf), lambda: ref.calculate_cagr(fcf)),
+        Benchmark('calculate_reinvestment_x_roic', 'native', lambda: dcf.calculate_reinvestment_x_roic(1.3e11, 0.17, 2.1e11, -9.4e9, 3.6e9), lambda: ref.calculate_reinvestment_x_roic(1.3e11, 0.17, 2.1e11, -9.4e9, 3.6e9)),
+        Benchmark('estimate_future_fcf', 'native', lambda: dcf.estimate_future_fcf(fcf), lambda: ref.estimate_future_fcf(fcf)),
+        Benchmark('calculate_tv', 'native', lambda: dcf.calculate_tv(future, 0.08, 0.03), lambda: ref.calculate_tv(future, 0.08, 0.03)),
+        Benchmark('calculate_pv', 'native', lambda: dcf.calculate_pv(1e11, 0.08, 3), lambda: ref.calculate_pv(1e11, 0.08, 3)),
+        Benchmark('calculate_equity_value', 'native', lambda: dcf.calculate_equity_value(future, 0.08, 0.03, 8e10), lambda: ref.calculate_equity_value(future, 0.08, 0.03, 8e10)),
+        Benchmark('calculate_intrinsic_value', 'native', lambda: dcf.calculate_intrinsic_value(2.2e12, 1.5e10), lambda: ref.calculate_intrinsic_value(2.2e12, 1.5e10)),
+        Benchmark('value_company', 'native', lambda: dcf.value_company(struct), lambda: ref.value_company(fields)),
+
+        # Native array functions
+        Benchmark(f'yearly_fcf_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.yearly_fcf_batch(operating_cfs, capexes),
+                  lambda: ref.yearly_fcf_batch(operating_cfs.tolist(), capexes.tolist())),
+        Benchmark(f'discount_rate_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.discount_rate_batch(market_caps, total_debts, costs_of_equity, costs_of_debt, tax_rates),
+                  lambda: ref.discount_rate_batch(market_caps.tolist(), total_debts.tolist(), costs_of_equity.tolist(), costs_of_debt.tolist(), tax_rates.tolist())),
+        Benchmark(f'calculate_total_debt_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_total_debt_batch(capexes, total_debts),
+                  lambda: ref.calculate_total_debt_batch(capexes.tolist(), total_debts.tolist())),
+        Benchmark(f'calculate_cost_of_equity_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_cost_of_equity_batch(risk_free_rates, betas, market_returns),
+                  lambda: ref.calculate_cost_of_equity_batch(risk_free_rates.tolist(), betas.tolist(), market_returns.tolist())),
+        Benchmark(f'calculate_cost_of_debt_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_cost_of_debt_batch(interest_expenses, total_debts),
+                  lambda: ref.calculate_cost_of_debt_batch(interest_expenses.tolist(), total_debts.tolist())),
+        Benchmark(f'calculate_tax_rate_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_tax_rate_batch(tax_expenses, pretax_incomes),
+                  lambda: ref.calculate_tax_rate_batch(tax_expenses.tolist(), pretax_incomes.tolist())),
+        Benchmark(f'calculate_reinvestment_x_roic_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_reinvestment_x_roic_batch(ebits, tax_rates, invested_capitals, capexes, working_capital_changes),
+                  lambda: ref.calculate_reinvestment_x_roic_batch(ebits.tolist(), tax_rates.tolist(), invested_capitals.tolist(), capexes.tolist(), working_capital_changes.tolist())),
+        Benchmark(f'calculate_cagr_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_cagr_batch(fcf_history),
+                  lambda: ref.calculate_cagr_batch(fcf_history.tolist())),
+        Benchmark(f'estimate_future_fcf_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.estimate_future_fcf_batch(fcf_history),
+                  lambda: ref.estimate_future_fcf_batch(fcf_history.tolist())),
+        Benchmark(f'calculate_tv_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_tv_batch(fcf_matrix, waccs, growths),
+                  lambda: ref.calculate_tv_batch(fcf_matrix.tolist(), waccs.tolist(), growths.tolist())),
+        Benchmark(f'calculate_equity_value_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_equity_value_batch(fcf_matrix, waccs, growths, net_debts),
+                  lambda: ref.calculate_equity_value_batch(fcf_matrix.tolist(), waccs.tolist(), growths.tolist(), net_debts.tolist())),
+        Benchmark(f'calculate_intrinsic_value_batch[{BATCH_SIZE}]', 'batch',
+                  lambda: dcf.calculate_intrinsic_value_batch(equity_values, shares),
+                  lambda: ref.calculate_intrinsic_value_batch(equity_values.tolist(), shares.tolist())),
+        Benchmark(f'calculate_equity_value_grid[{GRID_STEPS}x{GRID_STEPS}]', 'batch',
+                  lambda: dcf.calculate_equity_value_grid(future, grid_waccs, grid_growths, 8e10),
+                  lambda: ref.calculate_equity_value_grid(future, grid_waccs.tolist(), grid_growths.tolist(), 8e10)),
+        # Different random streams, so timed but not checked value for value
+        Benchmark(f'monte_carlo_intrinsic_value[{MONTE_CARLO_SIMULATIONS}]', 'batch',
+                  lambda: dcf.monte_carlo_intrinsic_value(mc_struct, MONTE_CARLO_SIMULATIONS, 0),
+                  lambda: ref.monte_carlo_intrinsic_value(mc_fields, MONTE_CARLO_SIMULATIONS, 0), check=False),
+
+        # Python pipeline in main.py (fundamentals already fetched)
+        Benchmark('calculate_intrinsic_value_dcf', 'pipeline', lambda: main.calculate_intrinsic_value_dcf(stock_data, fcf_by_year)),
+        Benchmark('estimate_growth_rate', 'pipeline', lambda: main.estimate_growth_rate(stock_data, fcf_by_year)),
+        Benchmark('estimate_growth_rate_statements', 'pipeline', lambda: main.estimate_growth_rate(stock_data, statements=statements)),
+        Benchmark('extract_valuation_inputs', 'pipeline', lambda: main.extract_valuation_inputs(TICKER)),
+        Benchmark('filter_stock_financials', 'pipeline', lambda: main.filter_stock_financials(TICKER)),
+        Benchmark('statement_row_lookup', 'pipeline', lambda: FINANCIALS.loc['EBIT'].iloc[0]),
+        Benchmark('extract_statements', 'pipeline', lambda: [
+            extract_table(frame, STATEMENT_FIELDS[name])
+            for name, frame in (('financials', FINANCIALS), ('balance_sheet', BALANCE_SHEET), ('cashflow', CASHFLOW))
+        ]),
+        Benchmark('build_history', 'pipeline', lambda: build_history(TICKER, main.provider)),
+        Benchmark('build_compact_history', 'pipeline', lambda: build_compact_history(TICKER, main.provider, precision='float32')),
+
+        # Response serialization
+        Benchmark('json_valuation', 'serialize', lambda: main.app.json.dumps(valuation)),
+        Benchmark('json_history', 'serialize', lambda: main.app.json.dumps(history)),
+        Benchmark('json_history_compact', 'serialize', lambda: main.app.json.dumps(compact_history)),
+        Benchmark('gzip_history', 'serialize', lambda: compress(main.app.json.dumps(history).encode(), 'gzip')),
+    ]
+
+
+def matches(native, reference) -> bool:
+    """True when two results agree to 1e-6 relative, element-wise for sequences and by field for dicts."""
+    if isinstance(reference, dict):
+        # Native structs (e.g. ValuationResult) are compared attribute by attribute
+        return all(matches(getattr(native, key) if not isinstance(native, dict) else native[key], reference[key]) for key in reference)
+    return bool(np.allclose(np.asarray(native, dtype='float64'), np.asarray(reference, dtype='float64'), rtol=1e-6, equal_nan=True))
+
+
+def measure(fn, repeat: int, min_time: float) -> dict:
+    """Per-call timings in nanoseconds over `repeat` rounds of at least `min_time` seconds each."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time:
+            break
+        number *= 2 if number < 1000 else 10
+    times = [t / number * 1e9 for t in timer.repeat(repeat, number)]
+    return {'minNs': min(times), 'medianNs': statistics.median(times), 'number': number, 'repeat': repeat}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE, stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(benchmarks: list, repeat: int, min_time: float, with_reference: bool) -> list:
+    results = []
+    for case in benchmarks:
+        result = {'name': case.name, 'group': case.group, 'native': measure(case.native, repeat, min_time)}
+        if case.reference is not None and with_reference:
+            result['reference'] = measure(case.reference, repeat, min_time)
+            result['speedup'] = result['reference']['medianNs'] / result['native']['medianNs']
+        if case.check:
+            result['check'] = matches(case.native(), case.reference())
+        results.append(result)
+        print(format_result(result), flush=True)
+    return results
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def format_result(result: dict) -> str:
+    line = f"{result['group']:<10} {result['name']:<44} {format_ns(result['native']['medianNs']):>10}"
+    if 'reference' in result:
+        line += f"   python {format_ns(result['reference']['medianNs']):>10}   x{result['speedup']:.1f}"
+    if result.get('check') is False:
+        line += "   MISMATCH"
+    return line
+
+
+def compare(results: list, baseline_path: str, threshold: float) -> int:
+    """Prints median time ratios against a previous run; returns the number of regressions."""
+    with open(baseline_path, 'r') as file:
+        baseline = {result['name']: result for result in json.load(file)['results']}
+
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    for result in results:
+        before = baseline.get(result['name'])
+        if before is None:
+            continue
+        ratio = result['native']['medianNs'] / before['native']['medianNs']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        print(f"  {result['name']:<44} {format_ns(before['native']['medianNs']):>10} -> {format_ns(result['native']['medianNs']):>10}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="DCF and valuation pipeline micro-benchmarks")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', help="Compare against a previous --output file")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Slowdown counted as a regression (default 0.10)")
+    parser.add_argument('--filter', default='', help="Only run benchmarks whose name or group contains this")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing rounds per benchmark (default 5)")
+    parser.add_argument('--min-time', type=float, default=0.05, help="Minimum seconds per round (default 0.05)")
+    parser.add_argument('--no-reference', action='store_true', help="Skip timing the pure-Python references")
+    args = parser.parse_args()
+
+    benchmarks = [b for b in build_benchmarks() if args.filter in b.name or args.filter in b.group]
+    results = run(benchmarks, args.repeat, args.min_time, not args.no_reference)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+            'dcfThreads': dcf.get_num_threads(),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    failed = [result['name'] for result in results if result.get('check') is False]
+    if failed:
+        print(f"\nNative results differ from the Python reference: {', '.join(failed)}")
+    regressions = compare(results, args.compare, args.threshold) if args.compare else 0
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,99 @@
+# Benchmarks: fixtures.py
+# Fixed, offline market data shaped like yfinance's, so benchmark runs are
+# comparable across commits and machines without network access.
+import numpy as np
+import pandas as pd
+
+from providers import MarketDataProvider
+
+FISCAL_YEARS = pd.to_datetime(['2024-09-30', '2023-09-30', '2022-09-30', '2021-09-30'])
+
+INFO = {
+    'symbol': 'BENCH',
+    'longName': 'Benchmark Corp',
+    'industry': 'Consumer Electronics',
+    'country': 'United States',
+    'currentPrice': 190.0,
+    'marketCap': 3.0e12,
+    'regularMarketOpen': 189.0,
+    'dayHigh': 192.0,
+    'dayLow': 188.5,
+    'volume': 55_000_000,
+    'dividendYield': 0.5,
+    'beta': 1.2,
+    'fiftyTwoWeekHigh': 199.6,
+    'trailingPE': 31.0,
+    'forwardPE': 28.0,
+    'sharesOutstanding': 1.5e10,
+    'effectiveTaxRate': 16.0,
+}
+
+
+def _statement(rows: dict) -> pd.DataFrame:
+    """Line item -> values for FISCAL_YEARS (newest first), padded with unused rows like Yahoo's."""
+    frame = pd.DataFrame(rows, index=FISCAL_YEARS, dtype='float64').T
+    filler = pd.DataFrame(
+        np.linspace(1e8, 9e8, 40 * len(FISCAL_YEARS)).reshape(40, len(FISCAL_YEARS)),
+        index=[f'Other Line Item {i}' for i in range(40)],
+        columns=FISCAL_YEARS,
+    )
+    return pd.concat([frame, filler])
+
+
+FINANCIALS = _statement({
+    'Interest Expense': [3.0e9, 3.9e9, 2.9e9, 2.6e9],
+    'Income Tax Expense': [2.9e10, 1.7e10, 1.9e10, 1.5e10],
+    'Pretax Income': [1.2e11, 1.14e11, 1.2e11, 1.09e11],
+    'EBIT': [1.3e11, 1.17e11, 1.22e11, 1.11e11],
+})
+
+BALANCE_SHEET = _statement({
+    'Total Debt': [1.1e11, 1.11e11, 1.2e11, 1.25e11],
+    'Cash And Cash Equivalents': [3.0e10, 3.0e10, 2.4e10, 3.4e10],
+    'Total Assets': [3.6e11, 3.5e11, 3.5e11, 3.5e11],
+    'Total Current Liabilities': [1.5e11, 1.45e11, 1.54e11, 1.25e11],
+})
+
+CASHFLOW = _statement({
+    'Operating Cash Flow': [1.18e11, 1.1e11, 1.22e11, 1.04e11],
+    'Capital Expenditure': [-9.4e9, -1.1e10, -1.07e10, -1.11e10],
+    'Change In Working Capital': [3.6e9, -6.6e9, 1.2e9, -4.9e9],
+    'Free Cash Flow': [1.08e11, 9.9e10, 1.11e11, 9.3e10],
+})
+
+
+def _bars(index: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 180 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        'Open': close * 0.999,
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1e7, 1e8, len(index)).astype('float64'),
+    }, index=index)
+
+
+DAILY = _bars(pd.bdate_range('2023-10-02', '2024-09-30', tz='America/New_York', name='Date'), seed=1)
+INTRADAY = _bars(pd.date_range('2024-09-30 09:30', '2024-09-30 15:30', freq='30min', tz='America/New_York', name='Datetime'), seed=2)
+
+
+class FixtureProvider(MarketDataProvider):
+    """Serves the fixed frames above for any ticker."""
+
+    name = 'fixture'
+
+    def get_info(self, ticker: str) -> dict:
+        return dict(INFO, symbol=ticker.upper())
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        return INTRADAY if interval.endswith('m') else DAILY
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        return FINANCIALS
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        return BALANCE_SHEET
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        return CASHFLOW
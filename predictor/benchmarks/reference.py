@@ -0,0 +1,235 @@
+# Benchmarks: reference.py
+# Pure-Python ports of the dcf_calculator functions, used as the baseline the
+# native versions are timed (and checked) against. Keep these in step with
+# main/dcf_calculator.cpp.
+import math
+import random
+
+
+def yearly_fcf(operating_cf, capital_expend):
+    return operating_cf - capital_expend
+
+
+def discount_rate(market_cap, total_debt, cost_equity, cost_debt, tax_rate):
+    return (market_cap / (market_cap + total_debt) * cost_equity) + (total_debt / (market_cap + total_debt) * cost_debt * (1 - tax_rate))
+
+
+def calculate_total_debt(short_term_debt, long_term_debt):
+    return short_term_debt + long_term_debt
+
+
+def calculate_cost_of_equity(risk_free_rate, stock_beta, market_return):
+    return risk_free_rate + stock_beta * (market_return - risk_free_rate)
+
+
+def calculate_cost_of_debt(interest_expense, total_debt):
+    return interest_expense / total_debt
+
+
+def calculate_tax_rate(income_tax_expense, pre_tax_income):
+    return income_tax_expense / pre_tax_income
+
+
+def calculate_cagr(fcf_list):
+    return (fcf_list[0] / fcf_list[-1]) ** (1.0 / (len(fcf_list) - 1)) - 1.0
+
+
+def calculate_reinvestment_x_roic(ebit, tax_rate, invested_capital, capex, change_in_working_capital):
+    return ((ebit * (1 - tax_rate)) / invested_capital) * ((capex + change_in_working_capital) / (ebit * (1 - tax_rate)))
+
+
+def estimate_future_fcf(fcf_list):
+    cagr = calculate_cagr(fcf_list)
+    latest_fcf = fcf_list[-1]
+    future_fcf_list = []
+    for _ in range(5):
+        latest_fcf *= (1 + cagr)
+        future_fcf_list.append(latest_fcf)
+    return future_fcf_list
+
+
+def calculate_tv(future_fcf_list, wacc, growth_rate):
+    return (future_fcf_list[-1] * (1 + growth_rate)) / (wacc - growth_rate)
+
+
+def calculate_pv(year_fcf, wacc, year):
+    return year_fcf / ((1 + wacc) ** year)
+
+
+def calculate_equity_value(future_fcf_list, wacc, growth_rate, net_debt):
+    tv = calculate_tv(future_fcf_list, wacc, growth_rate)
+    enterprise_value = calculate_pv(tv, wacc, len(future_fcf_list))
+    for i, fcf in enumerate(future_fcf_list):
+        enterprise_value += calculate_pv(fcf, wacc, i + 1)
+    return enterprise_value - net_debt
+
+
+def calculate_intrinsic_value(equity_value, shares_outstanding):
+    return equity_value / shares_outstanding
+
+
+# Batch variants: plain lists in, lists out, one entry per company. Rows of a
+# matrix are read up to their last non-NaN value, like the native versions.
+
+def _elementwise(function, *columns):
+    return [function(*args) for args in zip(*columns)]
+
+
+def _rows(matrix):
+    rows = []
+    for row in matrix:
+        row = list(row)
+        while row and math.isnan(row[-1]):
+            row.pop()
+        rows.append(row)
+    return rows
+
+
+def yearly_fcf_batch(operating_cf, capital_expend):
+    return _elementwise(yearly_fcf, operating_cf, capital_expend)
+
+
+def discount_rate_batch(market_cap, total_debt, cost_equity, cost_debt, tax_rate):
+    return _elementwise(discount_rate, market_cap, total_debt, cost_equity, cost_debt, tax_rate)
+
+
+def calculate_total_debt_batch(short_term_debt, long_term_debt):
+    return _elementwise(calculate_total_debt, short_term_debt, long_term_debt)
+
+
+def calculate_cost_of_equity_batch(risk_free_rate, stock_beta, market_return):
+    return _elementwise(calculate_cost_of_equity, risk_free_rate, stock_beta, market_return)
+
+
+def calculate_cost_of_debt_batch(interest_expense, total_debt):
+    return _elementwise(calculate_cost_of_debt, interest_expense, total_debt)
+
+
+def calculate_tax_rate_batch(income_tax_expense, pre_tax_income):
+    return _elementwise(calculate_tax_rate, income_tax_expense, pre_tax_income)
+
+
+def calculate_reinvestment_x_roic_batch(ebit, tax_rate, invested_capital, capex, change_in_working_capital):
+    return _elementwise(calculate_reinvestment_x_roic, ebit, tax_rate, invested_capital, capex, change_in_working_capital)
+
+
+def calculate_cagr_batch(fcf_matrix):
+    return [calculate_cagr(row) for row in _rows(fcf_matrix)]
+
+
+def estimate_future_fcf_batch(fcf_matrix):
+    return [estimate_future_fcf(row) for row in _rows(fcf_matrix)]
+
+
+def calculate_tv_batch(future_fcf_matrix, waccs, growth_rates):
+    return _elementwise(calculate_tv, _rows(future_fcf_matrix), waccs, growth_rates)
+
+
+def calculate_intrinsic_value_batch(equity_value, shares_outstanding):
+    return _elementwise(calculate_intrinsic_value, equity_value, shares_outstanding)
+
+
+def calculate_equity_value_batch(future_fcf_matrix, waccs, growth_rates, net_debts):
+    return [
+        calculate_equity_value(list(row), wacc, growth, net_debt)
+        for row, wacc, growth, net_debt in zip(future_fcf_matrix, waccs, growth_rates, net_debts)
+    ]
+
+
+def calculate_equity_value_grid(future_fcf_list, waccs, growth_rates, net_debt):
+    return [
+        [calculate_equity_value(future_fcf_list, wacc, growth, net_debt) if wacc > growth else math.nan for growth in growth_rates]
+        for wacc in waccs
+    ]
+
+
+def _clamp(value, low, high):
+    return max(min(value, high), low)
+
+
+def value_company(inputs: dict) -> dict:
+    """Port of dcf_calculator.value_company; takes and returns plain dicts."""
+    market_cap, total_debt, tax_rate = inputs['market_cap'], inputs['total_debt'], inputs['tax_rate']
+    interest_expense, ebit = inputs['interest_expense'], inputs['ebit']
+
+    cost_of_equity = _clamp(calculate_cost_of_equity(inputs['treasury_rate'], inputs['beta'], inputs['benchmark_etf_return']), 0.01, 0.5)
+    if total_debt <= 0:
+        total_debt = market_cap * 0.1
+    if interest_expense <= 0:
+        interest_expense = total_debt * 0.05
+    cost_of_debt = _clamp(calculate_cost_of_debt(interest_expense, total_debt), 0.01, 0.5)
+
+    if market_cap <= 0:
+        market_cap = 1
+    if total_debt <= 0:
+        total_debt = 1
+    if tax_rate < 0 or tax_rate > 1:
+        tax_rate = 0.21
+    wacc = _clamp(discount_rate(market_cap, total_debt, cost_of_equity, cost_of_debt, tax_rate), 0.01, 0.5)
+
+    fcf = list(inputs['fcf_values'])
+    if not fcf or all(v == 0 for v in fcf):
+        fcf = [ebit * 0.8 if ebit > 0 else market_cap * 0.05]
+    cagr = calculate_cagr(fcf) if len(fcf) >= 2 and all(v > 0 for v in fcf) else inputs['industry_rate']
+    cagr = _clamp(cagr, -0.5, 0.5)
+
+    reinvestment = 0.0
+    if inputs['invested_capital'] > 0 and ebit > 0:
+        reinvestment = calculate_reinvestment_x_roic(ebit, tax_rate, inputs['invested_capital'], inputs['capex'], inputs['change_in_working_capital'])
+    reinvestment = _clamp(reinvestment, -0.5, 0.5)
+
+    if reinvestment < 0:
+        growth = 0.8 * cagr + 0.2 * reinvestment
+    else:
+        growth = 0.7 * cagr + 0.3 * reinvestment
+    growth = _clamp(growth, 0.01, wacc - 0.01)
+
+    future_fcf = estimate_future_fcf(fcf) if fcf and fcf[-1] > 0 else [ebit * 0.8]
+    projection_growth = calculate_cagr(fcf) if fcf and fcf[-1] > 0 else 0.0
+    equity_value = market_cap
+    if future_fcf and wacc > growth:
+        equity_value = calculate_equity_value(future_fcf, wacc, growth, inputs['net_debt'])
+    equity_value = _clamp(equity_value, market_cap * 0.1, market_cap * 5)
+
+    intrinsic_value = 0.0
+    shares = inputs['shares_outstanding']
+    if shares != 0:
+        per_share = market_cap / shares
+        intrinsic_value = _clamp(calculate_intrinsic_value(equity_value, shares) if shares > 0 else 0.0, per_share * 0.1, per_share * 5)
+
+    return {
+        'wacc': wacc,
+        'cagr': cagr,
+        'reinvestment_rate': reinvestment,
+        'growth_rate': growth,
+        'projection_growth': projection_growth,
+        'equity_value': equity_value,
+        'intrinsic_value': intrinsic_value,
+    }
+
+
+def monte_carlo_intrinsic_value(inputs: dict, simulations: int, seed: int) -> list:
+    """Same model as dcf_calculator.monte_carlo_intrinsic_value (different random stream)."""
+    rng = random.Random(seed)
+    market_cap, shares = inputs['market_cap'], inputs['shares_outstanding']
+    per_share = market_cap / shares
+    samples = []
+    for _ in range(simulations):
+        beta = inputs['beta'] + inputs['beta_sd'] * rng.gauss(0, 1)
+        cost_of_equity = _clamp(calculate_cost_of_equity(inputs['risk_free_rate'], beta, inputs['market_return']), 0.01, 0.5)
+        wacc = discount_rate(inputs['market_cap'], inputs['total_debt'], cost_of_equity, inputs['cost_of_debt'], inputs['tax_rate'])
+        wacc = _clamp(wacc + inputs['wacc_sd'] * rng.gauss(0, 1), 0.01, 0.5)
+        cagr_shock = inputs['cagr_sd'] * rng.gauss(0, 1)
+        cagr = _clamp(inputs['cagr'] + cagr_shock, -0.5, 0.5)
+        reinvestment = _clamp(inputs['reinvestment'] + inputs['reinvestment_sd'] * rng.gauss(0, 1), -0.5, 0.5)
+        growth = 0.8 * cagr + 0.2 * reinvestment if reinvestment < 0 else 0.7 * cagr + 0.3 * reinvestment
+        growth = _clamp(growth, 0.01, wacc - 0.01)
+
+        fcf, future_fcf = inputs['base_fcf'], []
+        for _ in range(max(inputs['projection_years'], 1)):
+            fcf *= (1 + inputs['projection_growth'] + cagr_shock)
+            future_fcf.append(fcf)
+        equity_value = calculate_equity_value(future_fcf, wacc, growth, inputs['net_debt']) if wacc > growth else market_cap
+        equity_value = _clamp(equity_value, market_cap * 0.1, market_cap * 5)
+        samples.append(_clamp(calculate_intrinsic_value(equity_value, shares), per_share * 0.1, per_share * 5))
+    return samples
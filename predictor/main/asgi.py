@@ -0,0 +1,250 @@
+# Backend: asgi.py
+import io
+import os
+import re
+import sys
+import asyncio
+import logging
+import functools
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from history import SOURCES, fetch_source
+from snapshot import get_snapshot
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Threads available for blocking work (upstream fetches and the Flask views).
+# Requests beyond this wait on the event loop without holding a thread.
+ASGI_THREADS = int(os.getenv('ASGI_THREADS', 64))
+executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi')
+
+
+async def run_blocking(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+# ---------------------------------------------------------------------------
+# Concurrent prefetch: before a route's view runs, every upstream fetch it
+# will need is started at once on the thread pool, warming the snapshot and
+# caches the view then reads. Anything already cached is skipped; the cache
+# checks run on the pool too, since with the SQLite backend they read disk.
+# ---------------------------------------------------------------------------
+
+async def cached(cache, key) -> bool:
+    return await run_blocking(cache.__contains__, key)
+
+
+async def fetch_quote(ticker: str) -> None:
+    if await cached(main.quote_cache, ticker.upper()):
+        return
+    snapshot = get_snapshot(ticker, main.provider)
+    await run_blocking(lambda: snapshot.info)
+
+
+def quote_fetches(ticker: str) -> list:
+    return [fetch_quote(ticker)]
+
+
+async def fetch_statements(ticker: str) -> None:
+    # Statement TTLs depend on info (next earnings date), so info comes first
+    # rather than having three threads block on it
+    snapshot = get_snapshot(ticker, main.provider)
+    await run_blocking(lambda: snapshot.info)
+    await asyncio.gather(
+        run_blocking(lambda: snapshot.financials),
+        run_blocking(lambda: snapshot.balance_sheet),
+        run_blocking(lambda: snapshot.cashflow),
+    )
+
+
+async def fetch_valuation_inputs(ticker: str) -> None:
+    if await cached(main.valuation_cache, ticker.upper()):
+        return
+    await fetch_statements(ticker)
+
+
+def valuation_fetches(ticker: str) -> list:
+    return [fetch_valuation_inputs(ticker)]
+
+
+async def fetch_history_source(name: str, ticker: str) -> None:
+    cache = {'intraday': main.intraday_cache, 'daily': main.history_cache}[name]
+    config = SOURCES[name]
+    if main.price_store is None and await cached(cache, (ticker.upper(), config['period'], config['interval'])):
+        return
+    await run_blocking(fetch_source, name, ticker, main.provider, cache, main.price_store)
+
+
+def history_fetches(ticker: str) -> list:
+    return [fetch_history_source(name, ticker) for name in SOURCES]
+
+
+def batch_fetches(query: dict, fetches_for) -> list:
+    tickers = main.parse_ticker_list(','.join(query.get('tickers', [])))
+    if len(tickers) > main.MAX_BATCH_TICKERS:
+        return []
+    return [fetch for ticker in tickers for fetch in fetches_for(ticker)]
+
+
+# Path pattern -> upstream fetches to run concurrently for that route
+PREFETCH_ROUTES = [
+    (re.compile(r'^/api/stock/([^/]+)/history$'), lambda match, query: history_fetches(match[1])),
+    (re.compile(r'^/api/stock/([^/]+)/valuation$'), lambda match, query: valuation_fetches(match[1])),
+    (re.compile(r'^/api/stock/([^/]+)/valuation/(?:sensitivity|montecarlo)$'), lambda match, query: [fetch_statements(match[1])]),
+    (re.compile(r'^/api/stock/([^/]+)/full$'), lambda match, query: (
+        quote_fetches(match[1]) + history_fetches(match[1]) + valuation_fetches(match[1])
+    )),
+    (re.compile(r'^/api/stocks$'), lambda match, query: batch_fetches(query, quote_fetches)),
+    (re.compile(r'^/api/stocks/valuation$'), lambda match, query: batch_fetches(query, valuation_fetches)),
+]
+
+
+async def prefetch(path: str, query_string: bytes) -> None:
+    for pattern, fetches_for in PREFETCH_ROUTES:
+        match = pattern.match(path)
+        if match:
+            break
+    else:
+        return
+
+    fetches = fetches_for(match, parse_qs(query_string.decode('latin-1')))
+    if not fetches:
+        return
+    with timed('prefetch'):
+        results = await asyncio.gather(*fetches, return_exceptions=True)
+    # Failures aren't fatal here: the view retries the fetch and reports the error
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Prefetch for {path} failed: {str(result)}")
+
+
+# ---------------------------------------------------------------------------
+# WSGI bridge: the Flask views run on the thread pool and their response is
+# streamed back through the event loop, so NDJSON responses still stream.
+# ---------------------------------------------------------------------------
+
+def wsgi_environ(scope: dict, body: bytes) -> dict:
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope: dict, body: bytes, send) -> None:
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def put(message):
+        loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    def run():
+        def start_response(status, headers, exc_info=None):
+            put(('start', int(status.split(' ', 1)[0]), headers))
+            return lambda data: put(('body', data))
+
+        try:
+            result = main.app(wsgi_environ(scope, body), start_response)
+            try:
+                for chunk in result:
+                    if chunk:
+                        put(('body', chunk))
+            finally:
+                if hasattr(result, 'close'):
+                    result.close()
+        except Exception as e:
+            logger.error(f"Error serving {scope['path']}: {str(e)}")
+            put(('error', e))
+        finally:
+            put(('end',))
+
+    worker = loop.run_in_executor(executor, run)
+    started = False
+    while True:
+        message = await queue.get()
+        if message[0] == 'start':
+            started = True
+            await send({
+                'type': 'http.response.start',
+                'status': message[1],
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in message[2]],
+            })
+        elif message[0] == 'body':
+            await send({'type': 'http.response.body', 'body': message[1], 'more_body': True})
+        elif message[0] == 'error' and not started:
+            started = True
+            await send({'type': 'http.response.start', 'status': 500, 'headers': [(b'content-type', b'text/plain')]})
+            await send({'type': 'http.response.body', 'body': b'Internal Server Error', 'more_body': True})
+        elif message[0] == 'end':
+            break
+    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    await worker
+
+
+async def app(scope, receive, send):
+    """
+    ASGI application serving the same routes as the Flask app.
+
+    Upstream fetches a route needs are started concurrently before its view
+    runs, and a request waiting on upstream holds no thread of its own while
+    queued, so one process can keep hundreds of requests in flight.
+    """
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            break
+
+    if scope['method'] == 'GET':
+        await prefetch(scope['path'], scope.get('query_string', b''))
+    await call_flask(scope, body, send)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("ASGI mode needs uvicorn: pip install uvicorn")
+    uvicorn.run(app, host=os.getenv('HOST', '127.0.0.1'), port=int(os.getenv('PORT', 8000)))
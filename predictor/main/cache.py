@@ -0,0 +1,412 @@
+# Backend: cache.py
+import os
+import time
+import pickle
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Default location of the shared on-disk cache
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'cache.sqlite3')
+
+# Seconds a SQLite entry's recorded access time may lag before a read updates it
+ACCESS_RESOLUTION = 60.0
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at', 'stale_until')
+
+    def __init__(self, value, expires_at, stale_until):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+class _BaseCache:
+    """
+    Shared TTL, stale-while-revalidate and stats logic for cache backends.
+
+    Subclasses store entries and implement `_lookup(key, now)`, `set`,
+    `expires_at`, `invalidate`, `clear` and `__len__`.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, stale_ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._stats = {'hits': 0, 'staleHits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0, 'refreshErrors': 0}
+
+    def _lookup(self, key, now):
+        """Returns (entry, state) where state is 'fresh', 'stale' or 'miss'."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl: float = None) -> None:
+        raise NotImplementedError
+
+    def expires_at(self, key):
+        """Epoch seconds when `key` stops being fresh, or None if not cached. Changes whenever `key` is set."""
+        raise NotImplementedError
+
+    def expires_in(self, key):
+        """Seconds until `key` stops being fresh (negative once stale), or None if not cached."""
+        expires_at = self.expires_at(key)
+        return expires_at - time.time() if expires_at is not None else None
+
+    def __contains__(self, key):
+        with self._lock:
+            _, state = self._lookup(key, time.time())
+            return state == 'fresh'
+
+    def get(self, key, default=None):
+        """Returns the fresh value for `key`, or `default` when absent or expired."""
+        with self._lock:
+            entry, state = self._lookup(key, time.time())
+            if state == 'fresh':
+                self._stats['hits'] += 1
+                return entry.value
+            self._stats['misses'] += 1
+            return default
+
+    def get_or_load(self, key, loader, ttl: float = None):
+        """
+        Returns the cached value for `key`, calling `loader()` on a miss.
+
+        A stale entry is returned as-is and refreshed in the background. A
+        loader result of None is returned but never cached, so failed
+        lookups are retried on the next call.
+
+        Args:
+            key: Cache key
+            loader (callable): Zero-argument function producing the value
+            ttl (float): Overrides the cache's default TTL for this entry
+
+        Returns:
+            The cached or freshly loaded value.
+        """
+        with self._lock:
+            entry, state = self._lookup(key, time.time())
+            if state == 'fresh':
+                self._stats['hits'] += 1
+                return entry.value
+            if state == 'stale':
+                self._stats['staleHits'] += 1
+                self._schedule_refresh(key, loader, ttl)
+                return entry.value
+            self._stats['misses'] += 1
+
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def _schedule_refresh(self, key, loader, ttl) -> None:
+        # Caller holds the lock
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        thread = threading.Thread(
+            target=self._refresh, args=(key, loader, ttl),
+            name=f"{self.name}-refresh", daemon=True,
+        )
+        thread.start()
+
+    def _refresh(self, key, loader, ttl) -> None:
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value, ttl)
+            with self._lock:
+                self._stats['refreshes'] += 1
+        except Exception as e:
+            logger.error(f"Background refresh of {key} in {self.name} cache failed: {str(e)}")
+            with self._lock:
+                self._stats['refreshErrors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        """Returns hit/miss/eviction counters along with the current size."""
+        size = len(self)
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['staleHits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'size': size,
+                'maxsize': self.maxsize,
+                'hitRate': (self._stats['hits'] + self._stats['staleHits']) / lookups if lookups else 0.0,
+            }
+
+
+class TTLCache(_BaseCache):
+    """
+    Thread-safe, size-bounded LRU cache with per-entry TTL.
+
+    Entries past their TTL but still inside the stale window are served
+    immediately by `get_or_load` while a background thread reloads them
+    (stale-while-revalidate). Entries past the stale window are treated as
+    misses and reloaded synchronously.
+
+    Args:
+        name (str): Label used in logs and stats
+        maxsize (int): Maximum number of entries before LRU eviction
+        ttl (float): Default seconds an entry stays fresh
+        stale_ttl (float): Extra seconds an expired entry may be served stale
+    """
+
+    def __init__(self, name: str = 'cache', maxsize: int = 1024, ttl: float = 300, stale_ttl: float = 0):
+        super().__init__(name, maxsize, ttl, stale_ttl)
+        self._data = OrderedDict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _lookup(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None, 'miss'
+        if now < entry.expires_at:
+            state = 'fresh'
+        elif now < entry.stale_until:
+            state = 'stale'
+        else:
+            del self._data[key]
+            return None, 'miss'
+        self._data.move_to_end(key)
+        return entry, state
+
+    def set(self, key, value, ttl: float = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        with self._lock:
+            self._data[key] = _Entry(value, now + ttl, now + ttl + self.stale_ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted_key, _ = self._data.popitem(last=False)
+                self._stats['evictions'] += 1
+                logger.info(f"Evicted {evicted_key} from {self.name} cache")
+
+    def expires_at(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry.expires_at if entry is not None else None
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteCache(_BaseCache):
+    """
+    Cache stored in a local SQLite file, shared by every worker process on
+    the host and kept across restarts.
+
+    Behaves like `TTLCache`: entries carry their own expiry and stale-until
+    times, the least recently read entries (to within ACCESS_RESOLUTION
+    seconds) are evicted past `maxsize`, and expired entries are served
+    stale while refreshing. Values are pickled, so anything stored must be
+    picklable. Hit/miss counters are per process.
+
+    Args:
+        name (str): Namespace inside the database file, one per data class
+        path (str): Database file, created on first use (not at construction,
+            so pre-fork servers don't share a connection across workers)
+        maxsize (int): Maximum number of entries in this namespace
+        ttl (float): Default seconds an entry stays fresh
+        stale_ttl (float): Extra seconds an expired entry may be served stale
+    """
+
+    def __init__(self, name: str = 'cache', path: str = DEFAULT_CACHE_PATH, maxsize: int = 1024,
+                 ttl: float = 300, stale_ttl: float = 0):
+        super().__init__(name, maxsize, ttl, stale_ttl)
+        self.path = path
+        self._local = threading.local()
+        self._schema_pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, opened on first use; a forked worker
+        # opens its own instead of sharing the parent's. WAL lets readers run
+        # alongside a writer.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._create_schema(conn)
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        # Once per process
+        with self._lock:
+            if self._schema_pid == os.getpid():
+                return
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+                " expires_at REAL NOT NULL, stale_until REAL NOT NULL, accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)")
+            # Drop whatever expired while no worker was running
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND stale_until <= ?", (self.name, time.time()))
+            self._schema_pid = os.getpid()
+
+    def __len__(self):
+        row = self._connection().execute(
+            "SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.name,)
+        ).fetchone()
+        return row[0]
+
+    def _lookup(self, key, now):
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, stale_until, accessed_at FROM cache WHERE namespace = ? AND key = ?",
+            (self.name, repr(key)),
+        ).fetchone()
+        if row is None:
+            return None, 'miss'
+        value, expires_at, stale_until, accessed_at = row
+        if now >= stale_until:
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, repr(key)))
+            return None, 'miss'
+        try:
+            entry = _Entry(pickle.loads(value), expires_at, stale_until)
+        except Exception as e:
+            logger.error(f"Dropping unreadable entry {key} from {self.name} cache: {str(e)}")
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, repr(key)))
+            return None, 'miss'
+        # A hit stays a plain read unless its access time is ACCESS_RESOLUTION
+        # out of date, so workers don't queue on the write lock to read; LRU
+        # order is approximate to that resolution
+        if now - accessed_at >= ACCESS_RESOLUTION:
+            conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?", (now, self.name, repr(key))
+            )
+        return entry, 'fresh' if now < expires_at else 'stale'
+
+    def set(self, key, value, ttl: float = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        conn = self._connection()
+        with self._lock:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, stale_until, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.name, repr(key), blob, now + ttl, now + ttl + self.stale_ttl, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                " SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.name, self.name, self.maxsize),
+            ).rowcount
+            if evicted > 0:
+                self._stats['evictions'] += evicted
+                logger.info(f"Evicted {evicted} entries from {self.name} cache")
+
+    def expires_at(self, key):
+        row = self._connection().execute(
+            "SELECT expires_at FROM cache WHERE namespace = ? AND key = ?", (self.name, repr(key))
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def invalidate(self, key) -> None:
+        self._connection().execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.name, repr(key)))
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM cache WHERE namespace = ?", (self.name,))
+
+
+# Caching policy per data class: how long entries stay fresh, how long they
+# may then be served stale while refreshing, and how many tickers to hold.
+# Each TTL can be overridden with <NAME>_CACHE_TTL in the environment.
+CACHE_POLICIES = {
+    'quote': {'ttl': 300, 'stale_ttl': 600, 'maxsize': 512},                 # intraday quote/info
+    'intraday': {'ttl': 300, 'stale_ttl': 600, 'maxsize': 256},              # 1D intraday bars
+    'history': {'ttl': 4 * 3600, 'stale_ttl': 8 * 3600, 'maxsize': 1024},    # daily/weekly/monthly bars
+    'fundamentals': {'ttl': 24 * 3600, 'stale_ttl': 24 * 3600, 'maxsize': 512},  # annual statements
+    'valuation': {'ttl': 3600, 'stale_ttl': 6 * 3600, 'maxsize': 512},       # computed DCF output
+}
+
+# Never cache statements for less than this, even right before earnings
+MIN_FUNDAMENTALS_TTL = 15 * 60
+
+
+def _policy_ttl(name: str, policy: dict) -> float:
+    return float(os.getenv(f"{name.upper()}_CACHE_TTL", policy['ttl']))
+
+
+def create_cache(name: str, maxsize: int, ttl: float, stale_ttl: float = 0, backend: str = None):
+    """
+    Builds a cache for one data class on the configured backend.
+
+    Args:
+        name (str): Data class name, used as the cache label/namespace
+        maxsize (int): Maximum number of entries
+        ttl (float): Default seconds an entry stays fresh
+        stale_ttl (float): Extra seconds an expired entry may be served stale
+        backend (str): 'memory' (per-process, default) or 'sqlite' (shared
+            on-disk file at CACHE_PATH). Falls back to CACHE_BACKEND.
+
+    Returns:
+        TTLCache or SQLiteCache
+    """
+    backend = (backend or os.getenv('CACHE_BACKEND', 'memory')).lower()
+    if backend == 'memory':
+        return TTLCache(name=name, maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl)
+    if backend == 'sqlite':
+        return SQLiteCache(
+            name=name, path=os.getenv('CACHE_PATH', DEFAULT_CACHE_PATH),
+            maxsize=maxsize, ttl=ttl, stale_ttl=stale_ttl,
+        )
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+
+caches = {
+    name: create_cache(name, maxsize=policy['maxsize'], ttl=_policy_ttl(name, policy), stale_ttl=policy['stale_ttl'])
+    for name, policy in CACHE_POLICIES.items()
+}
+
+
+def fundamentals_ttl(info: dict, now: float = None) -> float:
+    """
+    Returns how long financial statements may be cached: the fundamentals
+    TTL, shortened so the entry expires at the company's next earnings date.
+
+    Args:
+        info (dict): Stock info, read for 'earningsTimestamp' /
+            'earningsTimestampStart' (epoch seconds)
+        now (float): Current epoch time, defaults to time.time()
+
+    Returns:
+        float: TTL in seconds, never below MIN_FUNDAMENTALS_TTL.
+    """
+    now = time.time() if now is None else now
+    ttl = caches['fundamentals'].ttl
+    for key in ('earningsTimestampStart', 'earningsTimestamp'):
+        try:
+            earnings_at = float((info or {}).get(key) or 0)
+        except (TypeError, ValueError):
+            continue
+        if earnings_at > now:
+            ttl = min(ttl, earnings_at - now)
+    return max(ttl, MIN_FUNDAMENTALS_TTL)
+
+
+def cache_stats() -> dict:
+    """Returns the stats of every tiered cache, keyed by data class."""
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -4,6 +4,14 @@
 #include <cmath>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <pybind11/numpy.h>
+#include <stdexcept>
+#include <algorithm>
+#include <string>
+#include <random>
+#include <thread>
+#include <atomic>
+#include <cstdint>
 
 namespace py = pybind11;
 
@@ -94,6 +102,504 @@ double calculate_intrinsic_value(double equity_value, double shares_outstanding)
     return equity_value / shares_outstanding; // instrinc value = equity_value / shares_outstanding
 }
 
+// ---------------------------------------------------------------------------
+// Batch (cross-sectional) variants: one call values N companies at once.
+// Inputs are float64 NumPy arrays read in place (other dtypes/layouts are
+// converted once); a length-1 array is broadcast against the others.
+// ---------------------------------------------------------------------------
+
+typedef py::array_t<double, py::array::c_style | py::array::forcecast> darray;
+
+// Read-only view of a 1-D input, broadcasting length-1 inputs
+struct Column {
+    const double* data;
+    py::ssize_t size;
+    double operator[](py::ssize_t i) const { return size == 1 ? data[0] : data[i]; }
+};
+
+static Column column(const darray& a, const char* name) {
+    if (a.ndim() > 1) {
+        throw std::invalid_argument(std::string(name) + " must be a 1-D array");
+    }
+    Column c = {a.data(), a.size()};
+    return c;
+}
+
+// Length of the batch: every input must have this length or length 1
+static py::ssize_t batch_size(const std::vector<Column>& columns) {
+    py::ssize_t n = 1;
+    for (size_t i = 0; i < columns.size(); ++i) {
+        if (columns[i].size != 1) {
+            if (n != 1 && columns[i].size != n) {
+                throw std::invalid_argument("batch inputs must all have the same length (or length 1)");
+            }
+            n = columns[i].size;
+        }
+    }
+    return n;
+}
+
+// Read-only view of an N x years matrix. Each row is used up to its last
+// non-NaN value, so companies with fewer years can be NaN-padded on the right.
+// A single-row matrix is broadcast like a length-1 column.
+struct Rows {
+    const double* data;
+    py::ssize_t rows;
+    py::ssize_t cols;
+    const double* row(py::ssize_t i) const { return data + (rows == 1 ? 0 : i) * cols; }
+    py::ssize_t length(py::ssize_t i) const {
+        const double* r = row(i);
+        py::ssize_t len = cols;
+        while (len > 0 && std::isnan(r[len - 1])) --len;
+        return len;
+    }
+};
+
+static Rows rows(const darray& a, const char* name) {
+    if (a.ndim() != 2) {
+        throw std::invalid_argument(std::string(name) + " must be a 2-D array (companies x years)");
+    }
+    Rows r = {a.data(), a.shape(0), a.shape(1)};
+    return r;
+}
+
+// ---------------------------------------------------------------------------
+// Threading: large inputs are split across worker threads with the GIL
+// released, so other Python threads (e.g. request handlers waiting on I/O)
+// keep running. Small inputs stay on the calling thread and keep the GIL,
+// since a release/reacquire would cost more than the arithmetic.
+// ---------------------------------------------------------------------------
+
+static std::atomic<int> configured_threads(0);  // 0 = one per hardware thread
+
+// Items below which a batch runs on one thread, and below which it keeps the GIL
+static const py::ssize_t PARALLEL_MIN_ITEMS = 16384;
+static const py::ssize_t GIL_RELEASE_MIN_ITEMS = 1024;
+
+void set_num_threads(int threads) {
+    configured_threads = std::max(threads, 0);
+}
+
+int get_num_threads() {
+    int threads = configured_threads;
+    return threads > 0 ? threads : static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+}
+
+// Releases the GIL for the lifetime of the object when `release` is true
+class OptionalGilRelease {
+public:
+    explicit OptionalGilRelease(bool release) : state(release ? PyEval_SaveThread() : nullptr) {}
+    ~OptionalGilRelease() { if (state) PyEval_RestoreThread(state); }
+private:
+    PyThreadState* state;
+    OptionalGilRelease(const OptionalGilRelease&);
+    OptionalGilRelease& operator=(const OptionalGilRelease&);
+};
+
+// Runs body(begin, end) over [0, n) in contiguous chunks, one per thread,
+// using at most one thread per `min_items` items. Bodies must not touch Python.
+template <typename Body>
+static void parallel_for(py::ssize_t n, const Body& body, py::ssize_t min_items = PARALLEL_MIN_ITEMS) {
+    py::ssize_t threads = std::min<py::ssize_t>(get_num_threads(), std::max<py::ssize_t>(1, n / std::max<py::ssize_t>(min_items, 1)));
+    if (threads <= 1) {
+        body(0, n);
+        return;
+    }
+    py::ssize_t chunk = (n + threads - 1) / threads;
+    std::vector<std::thread> pool;
+    for (py::ssize_t begin = chunk; begin < n; begin += chunk) {
+        pool.emplace_back([&body, begin, chunk, n]() { body(begin, std::min(begin + chunk, n)); });
+    }
+    body(0, std::min(chunk, n));
+    for (size_t t = 0; t < pool.size(); ++t) pool[t].join();
+}
+
+// Fills a new length-n array with value(i), in parallel and without the GIL for large n
+template <typename Value>
+static py::array_t<double> map_batch(py::ssize_t n, const Value& value) {
+    py::array_t<double> out(n);
+    double* o = out.mutable_data();
+    {
+        OptionalGilRelease release(n >= GIL_RELEASE_MIN_ITEMS);
+        parallel_for(n, [&](py::ssize_t begin, py::ssize_t end) {
+            for (py::ssize_t i = begin; i < end; ++i) o[i] = value(i);
+        });
+    }
+    return out;
+}
+
+py::array_t<double> yearly_fcf_batch(darray operating_cf, darray capital_expend) {
+    Column ocf = column(operating_cf, "operating_cf"), capex = column(capital_expend, "capital_expend");
+    py::ssize_t n = batch_size({ocf, capex});
+    return map_batch(n, [&](py::ssize_t i) { return yearly_fcf(ocf[i], capex[i]); });
+}
+
+py::array_t<double> discount_rate_batch(darray market_cap, darray total_debt, darray cost_equity, darray cost_debt, darray tax_rate) {
+    Column mc = column(market_cap, "market_cap"), td = column(total_debt, "total_debt");
+    Column ce = column(cost_equity, "cost_equity"), cd = column(cost_debt, "cost_debt"), tr = column(tax_rate, "tax_rate");
+    py::ssize_t n = batch_size({mc, td, ce, cd, tr});
+    return map_batch(n, [&](py::ssize_t i) { return discount_rate(mc[i], td[i], ce[i], cd[i], tr[i]); });
+}
+
+py::array_t<double> calculate_total_debt_batch(darray short_term_debt, darray long_term_debt) {
+    Column st = column(short_term_debt, "short_term_debt"), lt = column(long_term_debt, "long_term_debt");
+    py::ssize_t n = batch_size({st, lt});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_total_debt(st[i], lt[i]); });
+}
+
+py::array_t<double> calculate_cost_of_equity_batch(darray risk_free_rate, darray stock_beta, darray market_return) {
+    Column rf = column(risk_free_rate, "risk_free_rate"), beta = column(stock_beta, "stock_beta"), mr = column(market_return, "market_return");
+    py::ssize_t n = batch_size({rf, beta, mr});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_cost_of_equity(rf[i], beta[i], mr[i]); });
+}
+
+py::array_t<double> calculate_cost_of_debt_batch(darray interest_expense, darray total_debt) {
+    Column ie = column(interest_expense, "interest_expense"), td = column(total_debt, "total_debt");
+    py::ssize_t n = batch_size({ie, td});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_cost_of_debt(ie[i], td[i]); });
+}
+
+py::array_t<double> calculate_tax_rate_batch(darray income_tax_expense, darray pre_tax_income) {
+    Column ite = column(income_tax_expense, "income_tax_expense"), pti = column(pre_tax_income, "pre_tax_income");
+    py::ssize_t n = batch_size({ite, pti});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_tax_rate(ite[i], pti[i]); });
+}
+
+py::array_t<double> calculate_reinvestment_x_roic_batch(darray ebit, darray tax_rate, darray invested_capital, darray capex, darray change_in_working_capital) {
+    Column e = column(ebit, "ebit"), tr = column(tax_rate, "tax_rate"), ic = column(invested_capital, "invested_capital");
+    Column cx = column(capex, "capex"), wc = column(change_in_working_capital, "change_in_working_capital");
+    py::ssize_t n = batch_size({e, tr, ic, cx, wc});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_reinvestment_x_roic(e[i], tr[i], ic[i], cx[i], wc[i]); });
+}
+
+// Same as calculate_cagr on one row: row[0] is the latest FCF, the last value the earliest
+static double cagr_of(const double* fcf, py::ssize_t len) {
+    if (len == 0) return std::nan("");
+    double exponent = 1.0f / (len - 1);
+    return std::pow(fcf[0] / fcf[len - 1], exponent) - 1.0f;
+}
+
+py::array_t<double> calculate_cagr_batch(darray fcf_matrix) {
+    Rows fcf = rows(fcf_matrix, "fcf_matrix");
+    return map_batch(fcf.rows, [&](py::ssize_t i) { return cagr_of(fcf.row(i), fcf.length(i)); });
+}
+
+// Same as estimate_future_fcf on each row: N x 5 projected FCFs
+py::array_t<double> estimate_future_fcf_batch(darray fcf_matrix) {
+    Rows fcf = rows(fcf_matrix, "fcf_matrix");
+    py::array_t<double> out({fcf.rows, static_cast<py::ssize_t>(5)});
+    double* o = out.mutable_data();
+    {
+        OptionalGilRelease release(fcf.rows >= GIL_RELEASE_MIN_ITEMS);
+        parallel_for(fcf.rows, [&](py::ssize_t begin, py::ssize_t end) {
+            for (py::ssize_t i = begin; i < end; ++i) {
+                py::ssize_t len = fcf.length(i);
+                double cagr = cagr_of(fcf.row(i), len);
+                double latest_fcf = len > 0 ? fcf.row(i)[len - 1] : std::nan("");
+                for (int year = 0; year < 5; ++year) {
+                    latest_fcf *= (1 + cagr);
+                    o[i * 5 + year] = latest_fcf;
+                }
+            }
+        });
+    }
+    return out;
+}
+
+py::array_t<double> calculate_tv_batch(darray future_fcf_matrix, darray wacc, darray growth_rate) {
+    Rows fcf = rows(future_fcf_matrix, "future_fcf_matrix");
+    Column w = column(wacc, "wacc"), g = column(growth_rate, "growth_rate");
+    py::ssize_t n = batch_size({Column{nullptr, fcf.rows}, w, g});
+    return map_batch(n, [&](py::ssize_t i) {
+        py::ssize_t len = fcf.length(i);
+        double last_future_fcf = len > 0 ? fcf.row(i)[len - 1] : std::nan("");
+        return (last_future_fcf * (1 + g[i])) / (w[i] - g[i]);
+    });
+}
+
+// Same as calculate_equity_value on each row of projected FCFs
+py::array_t<double> calculate_equity_value_batch(darray future_fcf_matrix, darray wacc, darray growth_rate, darray net_debt) {
+    Rows fcf = rows(future_fcf_matrix, "future_fcf_matrix");
+    Column w = column(wacc, "wacc"), g = column(growth_rate, "growth_rate"), nd = column(net_debt, "net_debt");
+    py::ssize_t n = batch_size({Column{nullptr, fcf.rows}, w, g, nd});
+    return map_batch(n, [&](py::ssize_t i) {
+        const double* row = fcf.row(i);
+        py::ssize_t len = fcf.length(i);
+        if (len == 0) {
+            return std::nan("");
+        }
+        double tv = (row[len - 1] * (1 + g[i])) / (w[i] - g[i]);
+        double enterprise_value = calculate_pv(tv, w[i], static_cast<double>(len));
+        for (py::ssize_t year = 0; year < len; ++year) {
+            enterprise_value += calculate_pv(row[year], w[i], static_cast<double>(year + 1));
+        }
+        return enterprise_value - nd[i];
+    });
+}
+
+py::array_t<double> calculate_intrinsic_value_batch(darray equity_value, darray shares_outstanding) {
+    Column ev = column(equity_value, "equity_value"), so = column(shares_outstanding, "shares_outstanding");
+    py::ssize_t n = batch_size({ev, so});
+    return map_batch(n, [&](py::ssize_t i) { return calculate_intrinsic_value(ev[i], so[i]); });
+}
+
+// Feature: Sensitivity grid of equity value over WACC x terminal growth for one
+// company. Cells where wacc <= growth (no finite terminal value) are NaN.
+py::array_t<double> calculate_equity_value_grid(const std::vector<double>& future_fcf_list, darray waccs, darray growth_rates, double net_debt) {
+    Column w = column(waccs, "waccs"), g = column(growth_rates, "growth_rates");
+    py::array_t<double> out({w.size, g.size});
+    double* o = out.mutable_data();
+    if (future_fcf_list.empty()) {
+        std::fill(o, o + w.size * g.size, std::nan(""));
+        return out;
+    }
+    size_t years = future_fcf_list.size();
+    double last_future_fcf = future_fcf_list.back();
+
+    {
+        OptionalGilRelease release(w.size * g.size >= GIL_RELEASE_MIN_ITEMS);
+        parallel_for(w.size, [&](py::ssize_t begin, py::ssize_t end) {
+            for (py::ssize_t i = begin; i < end; ++i) {
+                // Everything but the terminal value depends on WACC only
+                double sum_of_discounted_pv = 0;
+                for (size_t year = 0; year < years; ++year) {
+                    sum_of_discounted_pv += calculate_pv(future_fcf_list[year], w[i], static_cast<double>(year + 1));
+                }
+                double tv_discount = std::pow(1 + w[i], static_cast<double>(years));
+
+                for (py::ssize_t j = 0; j < g.size; ++j) {
+                    if (!(w[i] > g[j])) {
+                        o[i * g.size + j] = std::nan("");
+                        continue;
+                    }
+                    double tv = (last_future_fcf * (1 + g[j])) / (w[i] - g[j]);
+                    o[i * g.size + j] = sum_of_discounted_pv + tv / tv_discount - net_debt;
+                }
+            }
+        }, std::max<py::ssize_t>(1, PARALLEL_MIN_ITEMS / std::max<py::ssize_t>(g.size, 1)));
+    }
+    return out;
+}
+
+// ---------------------------------------------------------------------------
+// Fused valuation: the whole calculate_intrinsic_value_dcf pipeline from
+// main.py in one call, including its fallbacks and clamps.
+// ---------------------------------------------------------------------------
+
+// Same as Python's max(min(value, high), low), including NaN passing through
+static double clamp(double value, double low, double high) {
+    return std::max(std::min(value, high), low);
+}
+
+struct ValuationInputs {
+    double market_cap = 0;
+    double total_debt = 0;
+    double ebit = 0;
+    double tax_rate = 0.21;
+    double net_debt = 0;
+    double shares_outstanding = 0;
+    double invested_capital = 0;
+    double capex = 0;
+    double change_in_working_capital = 0;
+    double treasury_rate = 0.04497;
+    double benchmark_etf_return = 0.075;
+    double industry_rate = 0.05;
+    double beta = 1.0;
+    double interest_expense = 0;
+    std::vector<double> fcf_values;  // historical FCF in statement order
+};
+
+struct ValuationResult {
+    // Inputs after the pipeline's fallbacks were applied
+    double market_cap = 0;
+    double total_debt = 0;
+    double interest_expense = 0;
+    double tax_rate = 0;
+    std::vector<double> fcf_values;
+    // Intermediates and outputs
+    double cost_of_equity = 0;
+    double cost_of_debt = 0;
+    double wacc = 0;
+    double cagr = 0;
+    double reinvestment_rate = 0;
+    double growth_rate = 0;
+    double projection_growth = 0;  // rate future_fcf was projected at (0 for the EBIT fallback)
+    std::vector<double> future_fcf;
+    double equity_value = 0;
+    double intrinsic_value = 0;
+};
+
+// Feature: Value a company in one call, returning every intermediate
+ValuationResult value_company(const ValuationInputs& in) {
+    ValuationResult r;
+    double market_cap = in.market_cap, total_debt = in.total_debt, tax_rate = in.tax_rate;
+    double interest_expense = in.interest_expense, ebit = in.ebit;
+
+    // Cost of equity (CAPM), constrained between 1% and 50%
+    r.cost_of_equity = clamp(calculate_cost_of_equity(in.treasury_rate, in.beta, in.benchmark_etf_return), 0.01, 0.5);
+
+    // Cost of debt, estimating debt as 10% of market cap and interest as 5% of debt when missing
+    if (total_debt <= 0) total_debt = market_cap * 0.1;
+    if (interest_expense <= 0) interest_expense = total_debt * 0.05;
+    r.cost_of_debt = clamp(calculate_cost_of_debt(interest_expense, total_debt), 0.01, 0.5);
+
+    // WACC
+    if (market_cap <= 0) market_cap = 1;
+    if (total_debt <= 0) total_debt = 1;
+    if (tax_rate < 0 || tax_rate > 1) tax_rate = 0.21;
+    r.wacc = clamp(discount_rate(market_cap, total_debt, r.cost_of_equity, r.cost_of_debt, tax_rate), 0.01, 0.5);
+
+    // FCF: 80% of EBIT, else 5% of market cap, when there is no usable history
+    std::vector<double> fcf = in.fcf_values;
+    bool all_zero = true, all_positive = true;
+    for (size_t i = 0; i < fcf.size(); ++i) {
+        all_zero = all_zero && fcf[i] == 0;
+        all_positive = all_positive && fcf[i] > 0;
+    }
+    if (fcf.empty() || all_zero) {
+        fcf.assign(1, ebit > 0 ? ebit * 0.8 : market_cap * 0.05);
+        all_positive = fcf[0] > 0;
+    }
+
+    // CAGR, falling back to the industry rate
+    double cagr = (fcf.size() >= 2 && all_positive) ? calculate_cagr(fcf) : in.industry_rate;
+    r.cagr = clamp(cagr, -0.5, 0.5);
+
+    // Reinvestment x ROIC
+    double reinvestment = 0.0;
+    if (in.invested_capital > 0 && ebit > 0) {
+        reinvestment = calculate_reinvestment_x_roic(ebit, tax_rate, in.invested_capital, in.capex, in.change_in_working_capital);
+    }
+    r.reinvestment_rate = clamp(reinvestment, -0.5, 0.5);
+
+    // Growth: weighted CAGR and reinvestment, leaning on CAGR when reinvestment is negative
+    double growth = r.reinvestment_rate < 0
+        ? (0.8 * r.cagr) + (0.2 * r.reinvestment_rate)
+        : (0.7 * r.cagr) + (0.3 * r.reinvestment_rate);
+    r.growth_rate = clamp(growth, 0.01, r.wacc - 0.01);
+
+    // Future FCF
+    if (!fcf.empty() && fcf.back() > 0) {
+        r.future_fcf = estimate_future_fcf(fcf);
+        r.projection_growth = calculate_cagr(fcf);
+    } else {
+        r.future_fcf.assign(1, ebit * 0.8);
+    }
+
+    // Equity value, constrained between 10% and 500% of market cap
+    double equity_value = market_cap;
+    if (!r.future_fcf.empty() && r.wacc > r.growth_rate) {
+        equity_value = calculate_equity_value(r.future_fcf, r.wacc, r.growth_rate, in.net_debt);
+    }
+    r.equity_value = clamp(equity_value, market_cap * 0.1, market_cap * 5);
+
+    // Intrinsic value per share, within the same bounds per share (0 without a share count)
+    if (in.shares_outstanding != 0) {
+        double intrinsic_value = in.shares_outstanding > 0 ? calculate_intrinsic_value(r.equity_value, in.shares_outstanding) : 0.0;
+        double per_share = market_cap / in.shares_outstanding;
+        r.intrinsic_value = clamp(intrinsic_value, per_share * 0.1, per_share * 5);
+    }
+
+    r.market_cap = market_cap;
+    r.total_debt = total_debt;
+    r.interest_expense = interest_expense;
+    r.tax_rate = tax_rate;
+    r.fcf_values = fcf;
+    return r;
+}
+
+// ---------------------------------------------------------------------------
+// Monte Carlo valuation: samples the uncertain DCF inputs and values each
+// draw the way value_company does (same projection, growth blend and
+// clamps), so with every spread at 0 each sample equals its intrinsic value.
+// ---------------------------------------------------------------------------
+
+struct MonteCarloInputs {
+    double base_fcf = 0;  // FCF the projection starts from
+    double projection_growth = 0;  // rate value_company projected base_fcf at
+    int projection_years = 5;  // years projected (1 for the EBIT fallback)
+    double shares_outstanding = 0;
+    double net_debt = 0;
+    double market_cap = 0;
+    double total_debt = 0;
+    double cost_of_debt = 0;
+    double tax_rate = 0;
+    double risk_free_rate = 0;
+    double market_return = 0;
+    double beta = 0, beta_sd = 0;
+    double cagr = 0, cagr_sd = 0;
+    double reinvestment = 0, reinvestment_sd = 0;
+    double wacc_sd = 0;  // extra noise on WACC beyond what beta explains
+};
+
+// Samples are drawn in fixed-size blocks, each with its own generator seeded
+// from (seed, block), so results don't depend on how many threads ran them.
+static const std::int64_t MC_BLOCK = 4096;
+
+static void simulate_block(const MonteCarloInputs& in, std::uint64_t seed, std::int64_t block, std::int64_t end, double* out) {
+    std::seed_seq seq{static_cast<std::uint32_t>(seed), static_cast<std::uint32_t>(seed >> 32),
+                      static_cast<std::uint32_t>(block), static_cast<std::uint32_t>(block >> 32)};
+    std::mt19937_64 rng(seq);
+    std::normal_distribution<double> normal(0.0, 1.0);
+    std::vector<double> future_fcf(static_cast<size_t>(std::max(in.projection_years, 1)));
+    double per_share = in.market_cap / in.shares_outstanding;
+
+    for (std::int64_t i = block * MC_BLOCK; i < end; ++i) {
+        double beta = in.beta + in.beta_sd * normal(rng);
+        double cost_of_equity = clamp(calculate_cost_of_equity(in.risk_free_rate, beta, in.market_return), 0.01, 0.5);
+        double wacc = discount_rate(in.market_cap, in.total_debt, cost_of_equity, in.cost_of_debt, in.tax_rate);
+        wacc = clamp(wacc + in.wacc_sd * normal(rng), 0.01, 0.5);
+
+        // One CAGR shock moves both the growth blend and the projection rate
+        double cagr_shock = in.cagr_sd * normal(rng);
+        double cagr = clamp(in.cagr + cagr_shock, -0.5, 0.5);
+        double reinvestment = clamp(in.reinvestment + in.reinvestment_sd * normal(rng), -0.5, 0.5);
+        double growth = reinvestment < 0 ? 0.8 * cagr + 0.2 * reinvestment : 0.7 * cagr + 0.3 * reinvestment;
+        growth = clamp(growth, 0.01, wacc - 0.01);
+
+        // Project as estimate_future_fcf did for the point estimate, then value
+        // and clamp as value_company does
+        double fcf = in.base_fcf;
+        for (size_t year = 0; year < future_fcf.size(); ++year) {
+            fcf *= (1 + in.projection_growth + cagr_shock);
+            future_fcf[year] = fcf;
+        }
+        double equity_value = wacc > growth ? calculate_equity_value(future_fcf, wacc, growth, in.net_debt) : in.market_cap;
+        equity_value = clamp(equity_value, in.market_cap * 0.1, in.market_cap * 5);
+        out[i] = clamp(calculate_intrinsic_value(equity_value, in.shares_outstanding), per_share * 0.1, per_share * 5);
+    }
+}
+
+// Feature: Monte Carlo distribution of intrinsic value per share, one entry per simulation
+py::array_t<double> monte_carlo_intrinsic_value(const MonteCarloInputs& inputs, std::int64_t simulations, std::uint64_t seed, int threads) {
+    if (simulations <= 0) {
+        throw std::invalid_argument("simulations must be positive");
+    }
+    py::array_t<double> out(static_cast<py::ssize_t>(simulations));
+    double* o = out.mutable_data();
+    std::int64_t blocks = (simulations + MC_BLOCK - 1) / MC_BLOCK;
+
+    if (threads <= 0) {
+        threads = get_num_threads();
+    }
+    threads = static_cast<int>(std::min<std::int64_t>(threads, blocks));
+
+    {
+        py::gil_scoped_release release;
+        std::atomic<std::int64_t> next(0);
+        auto work = [&]() {
+            for (std::int64_t block = next++; block < blocks; block = next++) {
+                simulate_block(inputs, seed, block, std::min(simulations, (block + 1) * MC_BLOCK), o);
+            }
+        };
+        std::vector<std::thread> pool;
+        for (int t = 1; t < threads; ++t) pool.emplace_back(work);
+        work();
+        for (size_t t = 0; t < pool.size(); ++t) pool[t].join();
+    }
+    return out;
+}
+
 PYBIND11_MODULE(dcf_calculator, m) {
     m.def("yearly_fcf", &yearly_fcf, "Feature: calculate yearly FCF for my main.py. Usage: double yearly_fcf(double operating_cf, double capital_expend)");
     m.def("discount_rate", &discount_rate, "Feature: Calculate Discount Rate/WACC: Usage: double discount_rate(double market_cap, double total_debt, double cost_equity, double cost_debt, double tax_rate)");
@@ -108,4 +614,84 @@ PYBIND11_MODULE(dcf_calculator, m) {
     m.def("calculate_tv", &calculate_tv, "Usage: double calculate_tv(const std::vector<double>& future_fcf_list, double wacc, double cagr)");
     m.def("calculate_pv", &calculate_pv, "Usage: double calculate_pv(double year_fcf, double wacc, double year)");
     m.def("calculate_intrinsic_value", &calculate_intrinsic_value, "// Feature: Calculate Intrinsic Value Per Share. Usage: double calculate_intrinsic_value(double equity_value, double shares_outstanding)");
+
+    // Worker threads used by the batch, grid and Monte Carlo functions
+    m.def("set_num_threads", &set_num_threads, "Sets the worker threads for large batch/grid/Monte Carlo calls (0 = one per hardware thread). Usage: set_num_threads(int threads)");
+    m.def("get_num_threads", &get_num_threads, "Usage: int get_num_threads()");
+
+    // Batch variants over NumPy arrays (one entry per company)
+    m.def("yearly_fcf_batch", &yearly_fcf_batch, "Batch yearly_fcf. Usage: ndarray yearly_fcf_batch(ndarray operating_cf, ndarray capital_expend)");
+    m.def("discount_rate_batch", &discount_rate_batch, "Batch discount_rate/WACC. Usage: ndarray discount_rate_batch(ndarray market_cap, ndarray total_debt, ndarray cost_equity, ndarray cost_debt, ndarray tax_rate)");
+    m.def("calculate_total_debt_batch", &calculate_total_debt_batch, "Batch calculate_total_debt. Usage: ndarray calculate_total_debt_batch(ndarray short_term_debt, ndarray long_term_debt)");
+    m.def("calculate_cost_of_equity_batch", &calculate_cost_of_equity_batch, "Batch calculate_cost_of_equity. Usage: ndarray calculate_cost_of_equity_batch(ndarray risk_free_rate, ndarray stock_beta, ndarray market_return)");
+    m.def("calculate_cost_of_debt_batch", &calculate_cost_of_debt_batch, "Batch calculate_cost_of_debt. Usage: ndarray calculate_cost_of_debt_batch(ndarray interest_expense, ndarray total_debt)");
+    m.def("calculate_tax_rate_batch", &calculate_tax_rate_batch, "Batch calculate_tax_rate. Usage: ndarray calculate_tax_rate_batch(ndarray income_tax_expense, ndarray pre_tax_income)");
+    m.def("calculate_reinvestment_x_roic_batch", &calculate_reinvestment_x_roic_batch, "Batch calculate_reinvestment_x_roic. Usage: ndarray calculate_reinvestment_x_roic_batch(ndarray ebit, ndarray tax_rate, ndarray invested_capital, ndarray capex, ndarray change_in_working_capital)");
+    m.def("calculate_cagr_batch", &calculate_cagr_batch, "Batch calculate_cagr, one row of FCFs (latest first, NaN-padded) per company. Usage: ndarray calculate_cagr_batch(ndarray fcf_matrix)");
+    m.def("estimate_future_fcf_batch", &estimate_future_fcf_batch, "Batch estimate_future_fcf, returns companies x 5. Usage: ndarray estimate_future_fcf_batch(ndarray fcf_matrix)");
+    m.def("calculate_tv_batch", &calculate_tv_batch, "Batch calculate_tv. Usage: ndarray calculate_tv_batch(ndarray future_fcf_matrix, ndarray wacc, ndarray growth_rate)");
+    m.def("calculate_equity_value_batch", &calculate_equity_value_batch, "Batch calculate_equity_value. Usage: ndarray calculate_equity_value_batch(ndarray future_fcf_matrix, ndarray wacc, ndarray growth_rate, ndarray net_debt)");
+    m.def("calculate_equity_value_grid", &calculate_equity_value_grid, "Feature: Equity value sensitivity grid, waccs x growth_rates (NaN where wacc <= growth). Usage: ndarray calculate_equity_value_grid(const std::vector<double>& future_fcf_list, ndarray waccs, ndarray growth_rates, double net_debt)");
+    m.def("calculate_intrinsic_value_batch", &calculate_intrinsic_value_batch, "Batch calculate_intrinsic_value. Usage: ndarray calculate_intrinsic_value_batch(ndarray equity_value, ndarray shares_outstanding)");
+
+    // Fused valuation
+    py::class_<ValuationInputs>(m, "ValuationInputs", "Inputs for value_company; defaults match calculate_intrinsic_value_dcf")
+        .def(py::init<>())
+        .def_readwrite("market_cap", &ValuationInputs::market_cap)
+        .def_readwrite("total_debt", &ValuationInputs::total_debt)
+        .def_readwrite("ebit", &ValuationInputs::ebit)
+        .def_readwrite("tax_rate", &ValuationInputs::tax_rate)
+        .def_readwrite("net_debt", &ValuationInputs::net_debt)
+        .def_readwrite("shares_outstanding", &ValuationInputs::shares_outstanding)
+        .def_readwrite("invested_capital", &ValuationInputs::invested_capital)
+        .def_readwrite("capex", &ValuationInputs::capex)
+        .def_readwrite("change_in_working_capital", &ValuationInputs::change_in_working_capital)
+        .def_readwrite("treasury_rate", &ValuationInputs::treasury_rate)
+        .def_readwrite("benchmark_etf_return", &ValuationInputs::benchmark_etf_return)
+        .def_readwrite("industry_rate", &ValuationInputs::industry_rate)
+        .def_readwrite("beta", &ValuationInputs::beta)
+        .def_readwrite("interest_expense", &ValuationInputs::interest_expense)
+        .def_readwrite("fcf_values", &ValuationInputs::fcf_values);
+    py::class_<ValuationResult>(m, "ValuationResult", "Every intermediate of value_company, plus the inputs after fallbacks")
+        .def_readonly("market_cap", &ValuationResult::market_cap)
+        .def_readonly("total_debt", &ValuationResult::total_debt)
+        .def_readonly("interest_expense", &ValuationResult::interest_expense)
+        .def_readonly("tax_rate", &ValuationResult::tax_rate)
+        .def_readonly("fcf_values", &ValuationResult::fcf_values)
+        .def_readonly("cost_of_equity", &ValuationResult::cost_of_equity)
+        .def_readonly("cost_of_debt", &ValuationResult::cost_of_debt)
+        .def_readonly("wacc", &ValuationResult::wacc)
+        .def_readonly("cagr", &ValuationResult::cagr)
+        .def_readonly("reinvestment_rate", &ValuationResult::reinvestment_rate)
+        .def_readonly("growth_rate", &ValuationResult::growth_rate)
+        .def_readonly("projection_growth", &ValuationResult::projection_growth)
+        .def_readonly("future_fcf", &ValuationResult::future_fcf)
+        .def_readonly("equity_value", &ValuationResult::equity_value)
+        .def_readonly("intrinsic_value", &ValuationResult::intrinsic_value);
+    m.def("value_company", &value_company, "Feature: Whole DCF valuation (cost of capital, growth, projected FCF, equity and intrinsic value) in one call. Usage: ValuationResult value_company(ValuationInputs inputs)");
+
+    // Monte Carlo valuation
+    py::class_<MonteCarloInputs>(m, "MonteCarloInputs", "Point estimates and standard deviations for monte_carlo_intrinsic_value")
+        .def(py::init<>())
+        .def_readwrite("base_fcf", &MonteCarloInputs::base_fcf)
+        .def_readwrite("projection_growth", &MonteCarloInputs::projection_growth)
+        .def_readwrite("projection_years", &MonteCarloInputs::projection_years)
+        .def_readwrite("shares_outstanding", &MonteCarloInputs::shares_outstanding)
+        .def_readwrite("net_debt", &MonteCarloInputs::net_debt)
+        .def_readwrite("market_cap", &MonteCarloInputs::market_cap)
+        .def_readwrite("total_debt", &MonteCarloInputs::total_debt)
+        .def_readwrite("cost_of_debt", &MonteCarloInputs::cost_of_debt)
+        .def_readwrite("tax_rate", &MonteCarloInputs::tax_rate)
+        .def_readwrite("risk_free_rate", &MonteCarloInputs::risk_free_rate)
+        .def_readwrite("market_return", &MonteCarloInputs::market_return)
+        .def_readwrite("beta", &MonteCarloInputs::beta)
+        .def_readwrite("beta_sd", &MonteCarloInputs::beta_sd)
+        .def_readwrite("cagr", &MonteCarloInputs::cagr)
+        .def_readwrite("cagr_sd", &MonteCarloInputs::cagr_sd)
+        .def_readwrite("reinvestment", &MonteCarloInputs::reinvestment)
+        .def_readwrite("reinvestment_sd", &MonteCarloInputs::reinvestment_sd)
+        .def_readwrite("wacc_sd", &MonteCarloInputs::wacc_sd);
+    m.def("monte_carlo_intrinsic_value", &monte_carlo_intrinsic_value,
+          "Feature: Monte Carlo intrinsic value per share, sampling beta, WACC, CAGR and reinvestment rate. Usage: ndarray monte_carlo_intrinsic_value(MonteCarloInputs inputs, int simulations, int seed, int threads=0 (get_num_threads()))",
+          py::arg("inputs"), py::arg("simulations"), py::arg("seed"), py::arg("threads") = 0);
 }
\ No newline at end of file
@@ -0,0 +1,90 @@
+# Backend: encoding.py
+import gzip
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Optional speedups: orjson for JSON, msgpack for the binary history format,
+# brotli for compression. Each falls back (to the stdlib json encoder, JSON
+# and gzip respectively) when it isn't installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Response types worth compressing
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/msgpack', 'text/html', 'text/plain')
+
+
+def array_to_list(array) -> list:
+    """
+    A numpy array as a list of Python numbers. float32 values are written at
+    their shortest float32 repr (189.13, not 189.1300048828125).
+    """
+    if array.dtype.kind == 'f' and array.dtype.itemsize == 4:
+        return [float(value) for value in array.astype(str)]
+    return array.tolist()
+
+
+def dumps_json(obj, default=None, sort_keys: bool = False, indent=None, ensure_ascii: bool = True) -> str:
+    """
+    Encodes `obj` as JSON with orjson when it is installed (numpy arrays are
+    written directly), else with the stdlib encoder. `default` handles types
+    neither encoder knows; NaN and infinity become null under orjson.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+    separators = None if indent else (',', ':')
+    return json.dumps(obj, default=default, sort_keys=sort_keys, indent=indent,
+                      separators=separators, ensure_ascii=ensure_ascii)
+
+
+def wants_msgpack(accept) -> bool:
+    """Whether a request's Accept header (werkzeug MIMEAccept) prefers MessagePack over JSON."""
+    if msgpack is None:
+        return False
+    # JSON is listed first so it wins ties, e.g. for `*/*`
+    best = accept.best_match(('application/json',) + MSGPACK_MIMETYPES, default='application/json')
+    return best in MSGPACK_MIMETYPES
+
+
+def dumps_msgpack(obj, single_float: bool = False) -> bytes:
+    """
+    Encodes `obj` as MessagePack; numpy arrays become arrays of numbers, and
+    with `single_float` floats are packed as float32 (4 bytes instead of 8).
+    """
+    def default(value):
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+    return msgpack.packb(obj, default=default, use_single_float=single_float)
+
+
+def choose_encoding(accept_encodings) -> str:
+    """The best content coding this server supports from an Accept-Encoding header, or None."""
+    supported = ['br', 'gzip'] if brotli is not None else ['gzip']
+    return accept_encodings.best_match(supported)
+
+
+def compress(body: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compresses `body` with 'br' or 'gzip'; `level` is the gzip level (brotli runs at quality 5)."""
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=level)
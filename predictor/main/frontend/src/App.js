@@ -106,39 +106,28 @@ function App() {
     }
 
     try {
-      // Fetch stock data
-      const stockUrl = `${apiUrl}/api/stock/${ticker.toUpperCase()}`;
-      console.log(`Fetching stock data from: ${stockUrl}`);
+      // Fetch quote, price history and valuation in one round trip; the
+      // backend loads the three sections concurrently
+      const fullUrl = `${apiUrl}/api/stock/${ticker.toUpperCase()}/full`;
+      console.log(`Fetching stock data from: ${fullUrl}`);
       
-      const response = await fetchWithRetry(stockUrl);
+      const response = await fetchWithRetry(fullUrl);
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.error || 'Failed to fetch stock data');
       }
-      const data = await response.json();
-      console.log("Stock data received:", data);
+      const fullData = await response.json();
+      console.log("Stock data received:", fullData);
 
-      // Fetch all price history at once
-      const historyUrl = `${apiUrl}/api/stock/${ticker.toUpperCase()}/history`;
-      console.log(`Fetching price history from: ${historyUrl}`);
-      const historyResponse = await fetchWithRetry(historyUrl);
-      if (!historyResponse.ok) {
-        const errorData = await historyResponse.json();
-        throw new Error(errorData.error || 'Failed to fetch price history');
+      const data = fullData.stock;
+      const historyData = fullData.history;
+      const valuationData = fullData.valuation;
+      if (historyData.error) {
+        throw new Error(historyData.error);
       }
-      const historyData = await historyResponse.json();
-      console.log("History data received:", historyData);
-
-      // Fetch valuation data
-      const valuationUrl = `${apiUrl}/api/stock/${ticker.toUpperCase()}/valuation`;
-      console.log(`Fetching valuation data from: ${valuationUrl}`);
-      const valuationResponse = await fetchWithRetry(valuationUrl);
-      if (!valuationResponse.ok) {
-        const errorData = await valuationResponse.json();
-        throw new Error(errorData.error || 'Failed to fetch valuation data');
+      if (valuationData.error) {
+        throw new Error(valuationData.error);
       }
-      const valuationData = await valuationResponse.json();
-      console.log("Valuation data received:", valuationData);
 
       // Update state
       setStockData(data);
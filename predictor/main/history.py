@@ -0,0 +1,177 @@
+# Backend: history.py
+from __future__ import annotations
+
+import logging
+from metrics import timed
+from startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# The only series downloaded from upstream; every timeframe is cut from one
+SOURCES = {
+    'intraday': {'period': '1d', 'interval': '30m'},
+    'daily': {'period': '1y', 'interval': '1d'},
+}
+
+# How each chart timeframe is derived: which source, how far back from the
+# latest bar (pd.DateOffset arguments), and the resampling rule (None keeps
+# the source bars). Weekly and monthly bars are labelled by period start like
+# yfinance's own.
+TIMEFRAMES = {
+    '1D': {'source': 'intraday', 'window': None, 'rule': None},
+    '1W': {'source': 'daily', 'window': {'weeks': 1}, 'rule': None},
+    '1M': {'source': 'daily', 'window': {'months': 1}, 'rule': None},
+    '3M': {'source': 'daily', 'window': {'months': 3}, 'rule': 'W-MON'},
+    '1Y': {'source': 'daily', 'window': {'years': 1}, 'rule': 'MS'},
+}
+
+
+def fetch_source(name: str, ticker: str, provider, cache=None, store=None, refresh: bool = False) -> pd.DataFrame:
+    """
+    Downloads (or reads from cache) one source series.
+
+    Args:
+        name (str): Key of SOURCES, 'intraday' or 'daily'
+        ticker (str): Stock ticker symbol
+        provider (MarketDataProvider): Upstream source
+        cache: Optional cache for this source
+        store (PriceStore): Optional on-disk bar store; when given it replaces
+            the cache, updating incrementally once the source is older than
+            the cache's TTL
+        refresh (bool): Download even if the cached copy is still fresh
+
+    Returns:
+        pd.DataFrame: OHLCV bars (empty when upstream had none).
+    """
+    config = SOURCES[name]
+
+    def load():
+        hist = provider.get_history(ticker, period=config['period'], interval=config['interval'])
+        return None if hist.empty else hist
+
+    key = (ticker.upper(), config['period'], config['interval'])
+    if store is not None:
+        max_age = cache.ttl if cache is not None and not refresh else 0
+        hist = store.get(ticker, config['period'], config['interval'], provider, max_age)
+    elif cache is not None and refresh:
+        hist = load()
+        if hist is not None:
+            cache.set(key, hist)
+    elif cache is not None:
+        hist = cache.get_or_load(key, load)
+    else:
+        hist = load()
+    return hist if hist is not None else pd.DataFrame()
+
+
+def fetch_sources(ticker: str, provider, intraday_cache=None, daily_cache=None, store=None) -> dict:
+    """
+    Downloads (or reads from cache) the intraday and daily source series.
+
+    Returns:
+        dict: Source name -> OHLCV DataFrame (empty when upstream had none).
+    """
+    return {
+        name: fetch_source(name, ticker, provider, intraday_cache if name == 'intraday' else daily_cache, store)
+        for name in SOURCES
+    }
+
+
+def derive_close(source: pd.DataFrame, window, rule) -> pd.Series:
+    """Cuts the trailing `window` from a source frame and resamples its closes."""
+    close = source['Close']
+    if window is not None:
+        start = close.index[-1].normalize() - pd.DateOffset(**window)
+        close = close[close.index >= start]
+    if rule is not None:
+        close = close.resample(rule, label='left', closed='left').last()
+    return close.dropna()
+
+
+def derive_timeframes(ticker: str, provider, intraday_cache=None, daily_cache=None, store=None) -> dict:
+    """
+    Cuts every chart timeframe's closes out of the two source series.
+
+    Returns:
+        dict: Timeframe -> close pd.Series (empty when there is no data).
+    """
+    sources = fetch_sources(ticker, provider, intraday_cache, daily_cache, store)
+
+    closes = {}
+    with timed('resample'):
+        for timeframe, config in TIMEFRAMES.items():
+            source = sources[config['source']]
+            close = derive_close(source, config['window'], config['rule']) if not source.empty else pd.Series(dtype='float64')
+            if close.empty:
+                logger.warning(f"No historical data found for {ticker} with timeframe {timeframe}")
+            closes[timeframe] = close
+    return closes
+
+
+def format_timestamps(index: pd.DatetimeIndex) -> list:
+    """Bar times as 'YYYY-MM-DD HH:MM:SS' in the exchange's local time."""
+    # Same text as index.strftime('%Y-%m-%d %H:%M:%S'), formatted by numpy in
+    # one pass instead of one Timestamp at a time
+    local = index.tz_localize(None) if index.tz is not None else index
+    text = np.datetime_as_string(local.values, unit='s')
+    return np.char.replace(text, 'T', ' ').tolist()
+
+
+def build_history(ticker: str, provider, intraday_cache=None, daily_cache=None, store=None) -> dict:
+    """
+    Builds every chart timeframe for a ticker from two upstream series.
+
+    Returns:
+        dict: Timeframe -> {"prices": [...], "timestamps": [...]}, or
+            {"error": ...} for timeframes with no data.
+    """
+    all_history_data = {}
+    for timeframe, close in derive_timeframes(ticker, provider, intraday_cache, daily_cache, store).items():
+        if close.empty:
+            all_history_data[timeframe] = {"error": "No historical data available"}
+            continue
+
+        # Format data for the frontend
+        all_history_data[timeframe] = {
+            "prices": close.tolist(),
+            "timestamps": format_timestamps(close.index)
+        }
+    return all_history_data
+
+
+def build_compact_history(ticker: str, provider, intraday_cache=None, daily_cache=None, store=None,
+                          delta: bool = True, precision: str = 'float64') -> dict:
+    """
+    Builds every chart timeframe in the compact encoding: timestamps are
+    epoch seconds (UTC) and prices plain arrays, both left as numpy arrays
+    for the encoder to write directly.
+
+    Args:
+        delta (bool): Store the time axis as the first timestamp followed by
+            the gap to each next one (mostly a repeated 1800 or 86400), which
+            packs far smaller; clients recover it with a running sum
+        precision (str): 'float64', or 'float32' for half-size prices
+
+    Returns:
+        dict: Timeframe -> {"timestamps": [...], "prices": [...], "timezone":
+            ..., "delta": bool}, or {"error": ...} for timeframes with no data.
+    """
+    all_history_data = {}
+    for timeframe, close in derive_timeframes(ticker, provider, intraday_cache, daily_cache, store).items():
+        if close.empty:
+            all_history_data[timeframe] = {"error": "No historical data available"}
+            continue
+
+        timestamps = close.index.as_unit('s').asi8
+        if delta:
+            timestamps = np.diff(timestamps, prepend=0)
+        all_history_data[timeframe] = {
+            "timestamps": timestamps,
+            "prices": close.to_numpy(dtype=precision),
+            "timezone": str(close.index.tz) if close.index.tz is not None else 'UTC',
+            "delta": delta,
+        }
+    return all_history_data
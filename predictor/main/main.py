@@ -1,52 +1,365 @@
 # Backend: main.py
+import time
+IMPORT_STARTED = time.perf_counter()
+
 from flask_cors import CORS
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, g, request, render_template, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 import os
-import yfinance as yf
-import pandas as pd
-import dcf_calculator as dcf
-import numpy as np
 import json
-import time
+import math
+import hashlib
 import logging
+import threading
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from providers import create_provider, TimedProvider
+from snapshot import get_snapshot, refresh_snapshot, snapshot_cache, snapshot_cache_stats
+from cache import DEFAULT_CACHE_PATH, TTLCache, caches, cache_stats
+from singleflight import SingleFlight
+from providers import yf
+from history import SOURCES, build_history, build_compact_history, fetch_source
+from encoding import (dumps_json, array_to_list, wants_msgpack, dumps_msgpack, choose_encoding, compress,
+                      COMPRESSIBLE_MIMETYPES)
+from reference_data import get_reference_data, start_reference_data_watcher
+from prefetcher import DecayingCounter, PrefetchScheduler, RefreshJob
+from screener import Screener, DEFAULT_UNIVERSE_FILE, NUMERIC_FIELDS as SCREENER_FIELDS
+from metrics import timed, render_metrics, render_family, REQUEST_SECONDS
+from startup import lazy_import, preload, start_warmup, IMPORT_SECONDS, STARTUP_SECONDS
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (LOG_LEVEL=DEBUG adds per-valuation input/result detail)
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
+# Heavy modules are imported on first use (or by the warm-up below) so a cold
+# instance answers `/` quickly. Threads the dcf_calculator extension uses for
+# large batch, grid and Monte Carlo calls (0 = one per core); those calls
+# also release the GIL.
+DCF_THREADS = int(os.getenv('DCF_THREADS', 0))
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+dcf = lazy_import('dcf_calculator', on_load=[lambda module: module.set_num_threads(DCF_THREADS)])
+
 app = Flask(__name__, template_folder=os.path.join(os.path.dirname(__file__), '..', 'templates'))
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'default_secret_key')
 
 # Configure CORS properly
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-# Simple cache to store stock data
-cache = {}
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON encoding (orjson when installed, see encoding.py), timed as the 'serialize' stage."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, np.ndarray):
+            return array_to_list(o)
+        if isinstance(o, np.generic):
+            return o.item()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        with timed('serialize'):
+            return dumps_json(
+                obj, default=kwargs.get('default', self.default), sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                indent=kwargs.get('indent'), ensure_ascii=kwargs.get('ensure_ascii', self.ensure_ascii),
+            )
+
+app.json = TimedJSONProvider(app)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    if 'request_started' in g:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - g.request_started,
+            endpoint=endpoint, method=request.method, status=response.status_code,
+        )
+    return response
+
+# Responses of at least COMPRESS_MIN_BYTES are brotli- or gzip-compressed
+# for clients that accept it (COMPRESS=0 leaves that to a proxy)
+COMPRESS = os.getenv('COMPRESS', '1') != '0'
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+
+@app.after_request
+def compress_response(response):
+    if (not COMPRESS or response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+    with timed('compress'):
+        response.set_data(compress(body, encoding, COMPRESS_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+# Request counts per ticker, decaying by half every PREFETCH_HALF_LIFE seconds;
+# the prefetch scheduler keeps the hottest tickers' caches warm
+popularity = DecayingCounter(half_life=float(os.getenv('PREFETCH_HALF_LIFE', 600)))
+
+@app.before_request
+def track_popularity():
+    if request.view_args and 'ticker' in request.view_args:
+        popularity.hit(request.view_args['ticker'].upper())
+    elif request.path.startswith('/api/stocks'):
+        for ticker in parse_ticker_list(request.args.get('tickers'))[:MAX_BATCH_TICKERS]:
+            popularity.hit(ticker)
+
+# Upstream market data source (live yfinance, record or replay), with each call timed
+provider = TimedProvider(create_provider())
+
+# Tiered caches keyed by data class (see CACHE_POLICIES in cache.py)
+quote_cache = caches['quote']
+history_cache = caches['history']
+intraday_cache = caches['intraday']
+valuation_cache = caches['valuation']
+
+# Optional on-disk bar store; history then only fetches bars since the last visit
+price_store = None
+if os.getenv('PRICE_STORE_DIR'):
+    from price_store import PriceStore
+    price_store = PriceStore(os.getenv('PRICE_STORE_DIR'))
+
+# Country/industry data is loaded once at import; optionally re-read when the
+# file changes so treasury rates can be updated without a restart
+if float(os.getenv('REFERENCE_DATA_RELOAD_INTERVAL', 0)) > 0:
+    start_reference_data_watcher(float(os.getenv('REFERENCE_DATA_RELOAD_INTERVAL')))
+
+# Concurrent requests for the same (ticker, endpoint) share one upstream fetch
+flights = {
+    'quote': SingleFlight('quote'),
+    'history': SingleFlight('history'),
+    'valuation': SingleFlight('valuation'),
+}
+
+# Batch endpoints: most tickers per request and parallel upstream fetches
+MAX_BATCH_TICKERS = int(os.getenv('MAX_BATCH_TICKERS', 50))
+BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 8))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix='batch')
+
+# Valuation sensitivity grid: default and largest number of steps per axis
+SENSITIVITY_DEFAULT_STEPS = 9
+SENSITIVITY_MAX_STEPS = int(os.getenv('SENSITIVITY_MAX_STEPS', 200))
+
+# Monte Carlo valuation: default/largest sample count and native threads (0 = DCF_THREADS)
+MONTE_CARLO_DEFAULT_SIMULATIONS = 100_000
+MONTE_CARLO_MAX_SIMULATIONS = int(os.getenv('MONTE_CARLO_MAX_SIMULATIONS', 1_000_000))
+MONTE_CARLO_THREADS = int(os.getenv('MONTE_CARLO_THREADS', 0))
+MONTE_CARLO_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Runs the quote, history and valuation sections of /full side by side: one
+# thread per section for each of the REQUEST_THREADS requests a worker serves
+# at once. When every thread is busy a section runs on the request's own
+# thread instead of queueing behind other requests.
+FULL_SECTIONS = ('stock', 'history', 'valuation')
+SECTION_MAX_WORKERS = int(os.getenv('SECTION_MAX_WORKERS', int(os.getenv('REQUEST_THREADS', 4)) * len(FULL_SECTIONS)))
+section_executor = ThreadPoolExecutor(max_workers=SECTION_MAX_WORKERS, thread_name_prefix='section')
+section_slots = threading.BoundedSemaphore(SECTION_MAX_WORKERS)
+
+def get_cached_quote(ticker):
+    """Quote for a ticker from the quote cache, fetched once on a miss (None if unknown)."""
+    key = ticker.upper()
+    return flights['quote'].do(
+        key, lambda: quote_cache.get_or_load(key, lambda: fetch_stock_data(ticker))
+    )
+
+def get_cached_history(ticker):
+    """All chart timeframes for a ticker, resampled from one intraday and one daily download."""
+    return flights['history'].do(
+        ticker.upper(), lambda: build_history(ticker, provider, intraday_cache, history_cache, price_store)
+    )
+
+def get_compact_history(ticker, delta=True, precision='float64'):
+    """Chart timeframes in the compact encoding (see history.build_compact_history)."""
+    return flights['history'].do(
+        (ticker.upper(), 'compact', delta, precision),
+        lambda: build_compact_history(ticker, provider, intraday_cache, history_cache, price_store, delta, precision),
+    )
+
+def get_cached_valuation(ticker):
+    """Valuation for a ticker from the valuation cache, computed once on a miss."""
+    key = ticker.upper()
+    return flights['valuation'].do(
+        key, lambda: valuation_cache.get_or_load(key, lambda: filter_stock_financials(ticker))
+    )
+
+def parse_ticker_list(raw):
+    """Splits a comma-separated ticker list into unique upper-cased symbols, keeping order."""
+    tickers = []
+    for ticker in (raw or '').split(','):
+        ticker = ticker.strip().upper()
+        if ticker and ticker not in tickers:
+            tickers.append(ticker)
+    return tickers
+
+# HTTP caching of /api/stock/* responses: the caches each route's data comes
+# from. A response is fresh (max-age) until the first of them expires, and
+# may be served stale while revalidating as long as they may be. The
+# sensitivity and Monte Carlo routes compute from the ticker's snapshot and
+# statements rather than the cached valuation.
+ROUTE_CACHES = {
+    '/api/stock/<ticker>': ('quote',),
+    '/api/stock/<ticker>/history': ('intraday', 'history'),
+    '/api/stock/<ticker>/full': ('quote', 'intraday', 'history', 'valuation'),
+    '/api/stock/<ticker>/valuation': ('valuation',),
+    '/api/stock/<ticker>/valuation/sensitivity': ('snapshot', 'fundamentals'),
+    '/api/stock/<ticker>/valuation/montecarlo': ('snapshot', 'fundamentals'),
+}
+# Bar caches are keyed by source series rather than ticker
+CACHE_SOURCES = {'intraday': 'intraday', 'history': 'daily'}
+# Statements are cached one entry per (ticker, statement)
+STATEMENT_NAMES = ('financials', 'balance_sheet', 'cashflow')
+
+def route_entries(rule, ticker):
+    """(cache, key) of every cache entry a route's response about `ticker` is built from."""
+    key = ticker.upper()
+    entries = []
+    for name in ROUTE_CACHES[rule]:
+        if name == 'snapshot':
+            entries.append((snapshot_cache(), key))
+        elif name == 'fundamentals':
+            entries.extend((caches[name], (key, statement)) for statement in STATEMENT_NAMES)
+        elif name in CACHE_SOURCES:
+            source = SOURCES[CACHE_SOURCES[name]]
+            entries.append((caches[name], (key, source['period'], source['interval'])))
+        else:
+            entries.append((caches[name], key))
+    return entries
+
+def data_version(entries):
+    """
+    When each of `entries` expires (None where not cached). Setting an entry
+    moves its expiry, so this changes whenever the prefetcher or a
+    stale-while-revalidate refresh replaces the data, in this process or,
+    with the SQLite backend, another.
+    """
+    return tuple(cache.expires_at(key) for cache, key in entries)
+
+def route_freshness(entries, version):
+    """(max-age, stale-while-revalidate) in whole seconds for a response built from `entries` at `version`."""
+    now = time.time()
+    max_age, stale = float('inf'), float('inf')
+    for (cache, _), expires_at in zip(entries, version):
+        # Not cached (e.g. bars kept in the price store): no freshness to promise
+        max_age = min(max_age, expires_at - now if expires_at is not None else 0)
+        stale = min(stale, cache.stale_ttl)
+    return max(int(max_age), 0), int(stale)
+
+# (ETag, data version) of each recent response per path and negotiated format,
+# kept while its data is fresh so a matching If-None-Match is answered before
+# the view runs. The ETag only stands while the data version is unchanged.
+etag_cache = TTLCache(name='etag', maxsize=int(os.getenv('ETAG_CACHE_SIZE', 4096)), ttl=0)
+
+def etag_key():
+    return request.full_path, wants_msgpack(request.accept_mimetypes)
+
+@app.before_request
+def answer_not_modified():
+    rule = request.url_rule.rule if request.url_rule else None
+    if rule not in ROUTE_CACHES:
+        return None
+    g.data_version = data_version(route_entries(rule, request.view_args['ticker']))
+    memo = etag_cache.get(etag_key()) if request.if_none_match else None
+    if memo is None:
+        return None
+    etag, version = memo
+    if version != g.data_version or not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    return response
+
+@app.after_request
+def set_cache_headers(response):
+    """Content-hash ETag, 304 on a matching If-None-Match, and Cache-Control from the data's freshness."""
+    rule = request.url_rule.rule if request.url_rule else None
+    if rule not in ROUTE_CACHES or response.status_code not in (200, 304) or response.is_streamed:
+        return response
+    entries = route_entries(rule, request.view_args['ticker'])
+    version = data_version(entries)
+    max_age, stale = route_freshness(entries, version)
+    response.headers['Cache-Control'] = f"public, max-age={max_age}, stale-while-revalidate={stale}"
+    if response.status_code == 200:
+        # Weak, so it still matches once the body is compressed
+        etag = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+        response.set_etag(etag, weak=True)
+        # Only memoize a body built from one version: if the data was replaced
+        # while the view ran, the body may predate the version now cached
+        if max_age > 0 and g.get('data_version') == version:
+            etag_cache.set(etag_key(), (etag, version), ttl=max_age)
+        response.make_conditional(request)
+    return response
 
 @app.route('/', methods=['GET'])
 def index():
     logger.info("Root endpoint accessed")
     return {"message": "Flask backend is running"}
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        **cache_stats(),
+        'snapshot': snapshot_cache_stats(),
+        'singleflight': {name: flight.stats() for name, flight in flights.items()},
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Stage/request latency histograms plus cache and singleflight counters, in Prometheus text format."""
+    stats = {**cache_stats(), 'snapshot': snapshot_cache_stats()}
+    flight_stats = {name: flight.stats() for name, flight in flights.items()}
+
+    lines = []
+    for field, metric, kind, help in (
+        ('hits', 'cache_hits_total', 'counter', 'Fresh cache hits'),
+        ('staleHits', 'cache_stale_hits_total', 'counter', 'Stale entries served while refreshing'),
+        ('misses', 'cache_misses_total', 'counter', 'Cache misses'),
+        ('evictions', 'cache_evictions_total', 'counter', 'Entries evicted for space'),
+        ('refreshErrors', 'cache_refresh_errors_total', 'counter', 'Background refreshes that failed'),
+        ('size', 'cache_entries', 'gauge', 'Entries currently cached'),
+        ('hitRate', 'cache_hit_ratio', 'gauge', 'Share of lookups served from cache'),
+    ):
+        values = {name: cache.get(field) for name, cache in stats.items()}
+        lines.extend(render_family(f'stock_analyzer_{metric}', help, kind, 'cache', values))
+    for field, metric, kind, help in (
+        ('calls', 'singleflight_calls_total', 'counter', 'Calls made through singleflight'),
+        ('coalesced', 'singleflight_coalesced_total', 'counter', 'Calls that shared an in-flight result'),
+        ('inFlight', 'singleflight_in_flight', 'gauge', 'Calls currently executing'),
+    ):
+        values = {name: flight.get(field) for name, flight in flight_stats.items()}
+        lines.extend(render_family(f'stock_analyzer_{metric}', help, kind, 'flight', values))
+    screener_status = screener.status()
+    lines.extend(render_family('stock_analyzer_screener_tickers', 'Screener universe size and tickers valued/failed in the latest refresh', 'gauge', 'state', {
+        key: screener_status[key] for key in ('universe', 'valued', 'failed', 'rows')
+    }))
+    lines.extend(render_family('stock_analyzer_startup_seconds', 'Time spent importing main.py and warming up', 'gauge', 'phase', STARTUP_SECONDS))
+    lines.extend(render_family('stock_analyzer_module_import_seconds', 'Time spent importing each lazily loaded module', 'gauge', 'module', IMPORT_SECONDS))
+
+    return Response(render_metrics(lines), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/stock/<ticker>', methods=['GET'])
 def get_stock_details(ticker):
     logger.info(f"Stock details requested for ticker: {ticker}")
     try:
-        # Check if the data is already in the cache
-        if ticker in cache and (time.time() - cache[ticker]['timestamp']) < 300:  # 5 minutes cache
-            logger.info(f"Returning cached data for {ticker}")
-            return jsonify(cache[ticker]['data'])
-
-        # Fetch data from yfinance
-        stock_data = fetch_stock_data(ticker)
+        # Served from the quote cache, fetched from upstream on a miss
+        stock_data = get_cached_quote(ticker)
 
         # Error handling
         if stock_data is None:
             logger.error(f"No stock data found for ticker: {ticker}")
             return jsonify({"error": "Stock data not found"}), 404
 
-        return stock_data
+        return jsonify(stock_data)
 
     except Exception as e:
         logger.error(f"Error in get_stock_details for {ticker}: {str(e)}")
@@ -54,8 +367,7 @@ def get_stock_details(ticker):
 
 def fetch_stock_data(ticker):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        info = get_snapshot(ticker, provider).info
         
         if not info or 'symbol' not in info:
             logger.error(f"No data found for ticker: {ticker}")
@@ -77,14 +389,8 @@ def fetch_stock_data(ticker):
             "fiftyTwoWeekHigh": info.get('fiftyTwoWeekHigh', 0)
         }
         
-        # Store in cache with timestamp
-        cache[ticker] = {
-            'data': stock_data,
-            'timestamp': time.time()
-        }
-        
         logger.info(f"Successfully fetched and returning data for {ticker}")
-        return jsonify(stock_data)
+        return stock_data
         
     except Exception as e:
         logger.error(f"Error fetching stock data for {ticker}: {str(e)}")
@@ -92,52 +398,105 @@ def fetch_stock_data(ticker):
 
 @app.route('/api/stock/<ticker>/history', methods=['GET'])
 def get_stock_history(ticker):
+    """
+    Every chart timeframe. ?format=compact switches to epoch-second,
+    delta-encoded timestamps (?delta=0 for absolute ones) and ?precision=float32
+    halves the prices; `Accept: application/msgpack` returns MessagePack
+    instead of JSON (when msgpack is installed).
+    """
     logger.info(f"Stock history requested for ticker: {ticker}")
-    
-    # Define all timeframes and their corresponding yfinance parameters
-    timeframe_configs = {
-        '1D': {'period': '1d', 'interval': '30m'},
-        '1W': {'period': '1wk', 'interval': '1d'},
-        '1M': {'period': '1mo', 'interval': '1d'},
-        '3M': {'period': '3mo', 'interval': '1wk'},
-        '1Y': {'period': '1y', 'interval': '1mo'}
-    }
-    
+
+    compact = request.args.get('format') == 'compact'
+    precision = request.args.get('precision', 'float64')
+    if precision not in ('float32', 'float64'):
+        return jsonify({"error": "precision must be float32 or float64"}), 400
+
     try:
-        stock = yf.Ticker(ticker)
-        all_history_data = {}
-        
-        for timeframe, config in timeframe_configs.items():
-            hist = stock.history(period=config['period'], interval=config['interval'])
-            
-            if hist.empty:
-                logger.warning(f"No historical data found for {ticker} with timeframe {timeframe}")
-                all_history_data[timeframe] = {"error": "No historical data available"}
-                continue
-            
-            # Format data for the frontend
-            prices = hist['Close'].tolist()
-            timestamps = hist.index.strftime('%Y-%m-%d %H:%M:%S').tolist()
-            
-            all_history_data[timeframe] = {
-                "prices": prices,
-                "timestamps": timestamps
-            }
-        
+        if compact:
+            all_history_data = get_compact_history(ticker, request.args.get('delta') not in ('0', 'false'), precision)
+        else:
+            all_history_data = get_cached_history(ticker)
+
         logger.info(f"Successfully fetched all timeframes for {ticker}")
-        return jsonify(all_history_data)
+        if wants_msgpack(request.accept_mimetypes):
+            with timed('serialize'):
+                body = dumps_msgpack(all_history_data, single_float=compact and precision == 'float32')
+            response = Response(body, mimetype='application/msgpack')
+        else:
+            response = jsonify(all_history_data)
+        response.vary.add('Accept')
+        return response
         
     except Exception as e:
         logger.error(f"Error fetching stock history for {ticker}: {str(e)}")
         return jsonify({"error": f"Failed to fetch stock history: {str(e)}"}), 500
 
+def submit_section(load, ticker):
+    """Runs `load(ticker)` on a free section thread, or inline when none is free; returns its Future."""
+    if section_slots.acquire(blocking=False):
+        future = section_executor.submit(load, ticker)
+        future.add_done_callback(lambda _: section_slots.release())
+        return future
+    future = Future()
+    try:
+        future.set_result(load(ticker))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def submit_sections(ticker):
+    """Starts the quote, history and valuation loads concurrently; returns {future: section}."""
+    # Warm the shared snapshot so the quote and valuation reuse one .info fetch
+    get_snapshot(ticker, provider)
+    loaders = {
+        'stock': get_cached_quote,
+        'history': get_cached_history,
+        'valuation': get_cached_valuation,
+    }
+    return {submit_section(load, ticker): section for section, load in loaders.items()}
+
+def section_result(future, section, ticker):
+    try:
+        result = future.result()
+        if not result:
+            return {"error": f"No {section} data found"}
+        return result
+    except Exception as e:
+        logger.error(f"Error loading {section} for {ticker}: {str(e)}")
+        return {"error": str(e)}
+
+# Frontend: get_stock_full
+@app.route('/api/stock/<ticker>/full', methods=['GET'])
+def get_stock_full(ticker):
+    """
+    Quote, history and valuation in one response, loaded concurrently.
+
+    With ?stream=1 the response is newline-delimited JSON, one
+    {"section": ..., "data": ...} line per section as soon as it completes.
+    """
+    logger.info(f"Full stock data requested for ticker: {ticker}")
+    futures = submit_sections(ticker)
+
+    if request.args.get('stream') in ('1', 'true'):
+        def generate():
+            for future in as_completed(futures):
+                section = futures[future]
+                yield app.json.dumps({"section": section, "data": section_result(future, section, ticker)}) + "\n"
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    payload = {section: section_result(future, section, ticker) for future, section in futures.items()}
+    if 'error' in payload['stock']:
+        logger.error(f"No stock data found for ticker: {ticker}")
+        return jsonify({"error": "Stock data not found"}), 404
+    return jsonify(payload)
+
 # Frontend: get_stock_valuation
 @app.route('/api/stock/<ticker>/valuation', methods=['GET'])
 def get_stock_valuation(ticker):
     logger.info(f"Stock valuation requested for ticker: {ticker}")
 
     try:
-        stock_financials = filter_stock_financials(ticker)
+        stock_financials = get_cached_valuation(ticker)
         if not stock_financials:
             logger.error(f"No financial data found for ticker: {ticker}")
             return jsonify({"error": "Failed to fetch stock financials"}), 500
@@ -149,12 +508,244 @@ def get_stock_valuation(ticker):
         logger.error(f"Error fetching stock valuation for {ticker}: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-def scrape_country_industry_data(ticker):
+def parse_range(prefix, center, spread):
+    """Reads ?<prefix>Min/Max/Steps into an evenly spaced float64 array around `center` by default."""
+    low = float(request.args.get(f'{prefix}Min', center - spread))
+    high = float(request.args.get(f'{prefix}Max', center + spread))
+    if not (math.isfinite(low) and math.isfinite(high)):
+        raise ValueError(f"{prefix}Min and {prefix}Max must be finite numbers")
+    steps = int(request.args.get(f'{prefix}Steps', SENSITIVITY_DEFAULT_STEPS))
+    if not 1 <= steps <= SENSITIVITY_MAX_STEPS:
+        raise ValueError(f"{prefix}Steps must be between 1 and {SENSITIVITY_MAX_STEPS}")
+    if low > high:
+        raise ValueError(f"{prefix}Min must not exceed {prefix}Max")
+    return np.linspace(low, high, steps)
+
+@app.route('/api/stock/<ticker>/valuation/sensitivity', methods=['GET'])
+def get_stock_valuation_sensitivity(ticker):
+    logger.info(f"Valuation sensitivity requested for ticker: {ticker}")
+
+    try:
+        stock_data, fcf = extract_valuation_inputs(ticker)
+        details = {}
+        base = calculate_intrinsic_value_dcf(stock_data, fcf, details)
+
+        try:
+            waccs = parse_range('wacc', base['wacc'], 0.03)
+            growth_rates = parse_range('growth', base['chosenGrowthRate'], 0.02)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # One native pass over the whole grid; the clamps mirror the point estimate
+        market_cap = details['marketCap']
+        shares = details['sharesOutstanding']
+        with timed('sensitivity_grid'):
+            equity = dcf.calculate_equity_value_grid(details['futureFcf'], waccs, growth_rates, details['netDebt'])
+        equity = np.clip(equity, market_cap * 0.1, market_cap * 5)
+        intrinsic = equity / shares if shares > 0 else np.where(np.isnan(equity), np.nan, 0.0)
+
+        return jsonify({
+            "ticker": ticker.upper(),
+            "waccs": waccs.tolist(),
+            "growthRates": growth_rates.tolist(),
+            # Rows follow waccs, columns follow growthRates; null where wacc <= growth
+            "intrinsicValues": [[None if np.isnan(v) else v for v in row] for row in intrinsic.tolist()],
+            "base": {
+                "wacc": base['wacc'],
+                "growthRate": base['chosenGrowthRate'],
+                "intrinsicValue": base['intrinsicValue'],
+            },
+        })
+
+    except Exception as e:
+        logger.error(f"Error computing valuation sensitivity for {ticker}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def query_param(name, default, cast, low, high):
+    """Reads ?<name> with `cast`, raising ValueError outside [low, high]."""
+    value = cast(request.args.get(name, default))
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+@app.route('/api/stock/<ticker>/valuation/montecarlo', methods=['GET'])
+def get_stock_valuation_monte_carlo(ticker):
+    logger.info(f"Monte Carlo valuation requested for ticker: {ticker}")
+
+    try:
+        try:
+            simulations = query_param('simulations', MONTE_CARLO_DEFAULT_SIMULATIONS, int, 1, MONTE_CARLO_MAX_SIMULATIONS)
+            seed = query_param('seed', 0, int, 0, 2**63 - 1)
+            bins = query_param('bins', 50, int, 1, 1000)
+            spreads = {
+                'beta_sd': query_param('betaSd', 0.2, float, 0, 5),
+                'wacc_sd': query_param('waccSd', 0.01, float, 0, 1),
+                'cagr_sd': query_param('cagrSd', 0.05, float, 0, 1),
+                'reinvestment_sd': query_param('reinvestmentSd', 0.05, float, 0, 1),
+            }
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        stock_data, fcf = extract_valuation_inputs(ticker)
+        details = {}
+        base = calculate_intrinsic_value_dcf(stock_data, fcf, details)
+        if details['sharesOutstanding'] <= 0:
+            return jsonify({"error": "Shares outstanding not available"}), 500
+
+        # Centre every distribution on the point estimate's own inputs, so
+        # with every spread at 0 each sample is the point estimate
+        inputs = dcf.MonteCarloInputs()
+        inputs.base_fcf = details['baseFcf']
+        inputs.projection_growth = details['projectionGrowth']
+        inputs.projection_years = len(details['futureFcf'])
+        inputs.shares_outstanding = details['sharesOutstanding']
+        inputs.net_debt = details['netDebt']
+        inputs.market_cap = details['marketCap']
+        inputs.total_debt = details['totalDebt']
+        inputs.cost_of_debt = details['costOfDebt']
+        inputs.tax_rate = details['taxRate']
+        inputs.risk_free_rate = details['treasuryRate']
+        inputs.market_return = details['benchmarkEtfReturn']
+        inputs.beta = details['beta']
+        inputs.cagr = base['cagr']
+        inputs.reinvestment = base['reinvestmentRate']
+        for name, value in spreads.items():
+            setattr(inputs, name, value)
+
+        with timed('monte_carlo'):
+            samples = dcf.monte_carlo_intrinsic_value(inputs, simulations, seed, MONTE_CARLO_THREADS)
+        samples = samples[np.isfinite(samples)]
+        if not len(samples):
+            return jsonify({"error": "Simulation produced no finite values"}), 500
+
+        percentiles = np.percentile(samples, MONTE_CARLO_PERCENTILES)
+        # Histogram over the central 99% so a few extreme draws don't flatten it
+        counts, edges = np.histogram(samples, bins=bins, range=tuple(np.percentile(samples, (0.5, 99.5))))
+
+        return jsonify({
+            "ticker": ticker.upper(),
+            "simulations": simulations,
+            "seed": seed,
+            "base": {
+                "wacc": base['wacc'],
+                "growthRate": base['chosenGrowthRate'],
+                "intrinsicValue": base['intrinsicValue'],
+            },
+            "mean": float(samples.mean()),
+            "std": float(samples.std()),
+            "percentiles": {f"p{p}": float(v) for p, v in zip(MONTE_CARLO_PERCENTILES, percentiles)},
+            "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+        })
+
+    except Exception as e:
+        logger.error(f"Error running Monte Carlo valuation for {ticker}: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+def fetch_batch(tickers, load):
+    """
+    Runs `load(ticker)` for every ticker on the bounded batch pool.
+
+    Returns:
+        dict: Ticker -> result, or {"error": ...} for tickers that failed.
+    """
+    def load_one(ticker):
+        try:
+            result = load(ticker)
+            return result if result else {"error": "Stock data not found"}
+        except Exception as e:
+            logger.error(f"Error in batch fetch for {ticker}: {str(e)}")
+            return {"error": str(e)}
+
+    return dict(zip(tickers, batch_executor.map(load_one, tickers)))
+
+def parse_batch_request():
+    """Reads ?tickers=A,B,C; returns (tickers, None) or (None, error response)."""
+    tickers = parse_ticker_list(request.args.get('tickers'))
+    if not tickers:
+        return None, (jsonify({"error": "Provide tickers as ?tickers=AAPL,MSFT"}), 400)
+    if len(tickers) > MAX_BATCH_TICKERS:
+        return None, (jsonify({"error": f"At most {MAX_BATCH_TICKERS} tickers per request"}), 400)
+    return tickers, None
+
+# Screener: largest page size per request
+SCREENER_MAX_LIMIT = 500
+
+@app.route('/api/screener', methods=['GET'])
+def get_screener():
+    """
+    Queries the precomputed valuations of the screener universe.
+
+    ?industry=/?country= take comma-separated names (aliases resolve like
+    the valuation's own lookup), ?min<Field>/?max<Field> bound any numeric
+    field (e.g. minDiscount=0.2, maxPeRatio=25), ?sort=<field> sorts
+    smallest first and ?sort=-<field> largest first (default -discount),
+    and ?limit/?offset page through the matches.
+    """
+    try:
+        try:
+            sort = request.args.get('sort', '-discount')
+            descending = sort.startswith('-')
+            sort = sort[1:] if descending else sort
+            if sort not in SCREENER_FIELDS:
+                raise ValueError(f"sort must be one of {', '.join(SCREENER_FIELDS)}")
+            ranges = {}
+            for field in SCREENER_FIELDS:
+                suffix = field[0].upper() + field[1:]
+                low, high = request.args.get(f'min{suffix}'), request.args.get(f'max{suffix}')
+                if low is not None or high is not None:
+                    ranges[field] = (float(low) if low is not None else None, float(high) if high is not None else None)
+            limit = query_param('limit', 50, int, 1, SCREENER_MAX_LIMIT)
+            offset = query_param('offset', 0, int, 0, 1_000_000)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        data = get_reference_data()
+        industries = [
+            (data.find_industry(name) or (name,))[0]
+            for name in request.args.get('industry', '').split(',') if name.strip()
+        ]
+        countries = [
+            (data.find_country(name) or (name,))[0]
+            for name in request.args.get('country', '').split(',') if name.strip()
+        ]
+
+        table = screener.table
+        total, rows = table.query(industries, countries, ranges, sort, descending, offset, limit)
+        return jsonify({
+            "total": total,
+            "offset": offset,
+            "results": rows,
+            "status": screener.status(),
+        })
+
+    except Exception as e:
+        logger.error(f"Error querying screener: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/stocks', methods=['GET'])
+def get_stocks_batch():
+    tickers, error = parse_batch_request()
+    if error:
+        return error
+    logger.info(f"Batch stock details requested for {len(tickers)} tickers")
+    return jsonify(fetch_batch(tickers, get_cached_quote))
+
+@app.route('/api/stocks/valuation', methods=['GET'])
+def get_stocks_valuation_batch():
+    tickers, error = parse_batch_request()
+    if error:
+        return error
+    logger.info(f"Batch stock valuation requested for {len(tickers)} tickers")
+    return jsonify(fetch_batch(tickers, get_cached_valuation))
+
+def scrape_country_industry_data(ticker, info=None):
     """
     Scrapes country and industry data for a given ticker.
     
     Args:
         ticker (str): Stock ticker symbol
+        info (dict): Already fetched stock info; looked up from the shared
+            ticker snapshot when omitted
         
     Returns:
         dict: Dictionary containing:
@@ -166,52 +757,32 @@ def scrape_country_industry_data(ticker):
             - industryRate (float): Expected growth rate for the industry
     """
     try:
-        # Get the directory of the current script
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        data_file = os.path.join(current_dir, 'country_industry_data.json')
-        
-        with open(data_file, 'r') as file:
-            data = json.load(file)
+        # Preloaded, pre-indexed country/industry data (rates already decimals)
+        data = get_reference_data()
             
         # Get stock info to determine country and industry
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        # Get country and industry from stock info
-        country = info.get('country', 'United States')  # Default to US if not found
-        industry = info.get('industry', 'Technology')   # Default to Technology if not found
-        
-        # Validate country and industry against our data
-        if country not in data['countries']:
-            country = 'United States'  # Default to US if country not in our data
-        if industry not in data['industries']:
-            industry = 'Technology'    # Default to Technology if industry not in our data
-            
-        # Get country-specific data
-        country_data = data['countries'].get(country, data['countries']['United States'])
-        industry_data = data['industries'].get(industry, data['industries']['Technology'])
+        if info is None:
+            info = get_snapshot(ticker, provider).info
         
-        # Convert percentage values to decimals
-        treasury_rate = country_data.get('10y_treasury_rate', 4.4970) / 100
-        benchmark_etf_return = country_data.get('benchmark_etf_return', 7.5) / 100
-        industry_rate = industry_data.get('growth_rate', 5.0) / 100
+        # Resolve country and industry, including aliases; unknown values
+        # default to United States and Technology
+        country_data = data.country(info.get('country'))
+        industry_data = data.industry(info.get('industry'))
+        
+        treasury_rate = country_data.treasury_rate
+        benchmark_etf_return = country_data.benchmark_etf_return
+        industry_rate = industry_data.growth_rate
         
         result = {
-            'country': country,
-            'industry': industry,
+            'country': country_data.name,
+            'industry': industry_data.name,
             'treasuryRate': treasury_rate,
-            'benchmarkEtf': country_data.get('benchmark_etf', 'SPY'),
+            'benchmarkEtf': country_data.benchmark_etf,
             'benchmarkEtfReturn': benchmark_etf_return,
             'industryRate': industry_rate
         }
         
-        logger.info(f"Country/Industry data for {ticker}:")
-        logger.info(f"  Country: {country}")
-        logger.info(f"  Industry: {industry}")
-        logger.info(f"  Treasury Rate: {treasury_rate:.4f}")
-        logger.info(f"  Benchmark ETF: {result['benchmarkEtf']}")
-        logger.info(f"  Benchmark Return: {benchmark_etf_return:.4f}")
-        logger.info(f"  Industry Rate: {industry_rate:.4f}")
+        logger.debug("Country/industry data for %s: %s", ticker, result)
         
         return result
         
@@ -227,6 +798,195 @@ def scrape_country_industry_data(ticker):
             'industryRate': 0.05  # 5%
         }
 
+# Helper function to safely convert values to float
+def safe_float(value, default=0.0):
+    try:
+        if pd.isna(value) or np.isinf(value):
+            return default
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+@timed('extract')
+def free_cash_flows(cash_flow) -> dict:
+    """
+    Positive free cash flows (operating cash flow - capex) by fiscal year,
+    newest first, computed for every year at once from a cashflow
+    StatementTable (missing values count as 0).
+    """
+    operating_cash_flow = np.nan_to_num(cash_flow.series('operatingCashFlow'), nan=0.0, posinf=0.0, neginf=0.0)
+    capital_expenditure = np.nan_to_num(cash_flow.series('capex'), nan=0.0, posinf=0.0, neginf=0.0)
+    free_cash_flow = operating_cash_flow - capital_expenditure
+    return {
+        int(year): float(value)
+        for year, value in zip(cash_flow.years, free_cash_flow) if value > 0
+    }
+
+def extract_valuation_inputs(ticker: str) -> tuple:
+    """
+    Collects every DCF input for a ticker from its snapshot: basic info,
+    country/industry rates, statement line items, cost of equity/debt and
+    the historical free cash flows.
+    
+    Args:
+        ticker (str): Stock ticker symbol (e.g., 'AAPL').
+        
+    Returns:
+        tuple: (stock_data dict, fcf dict of free cash flow by year)
+        
+    Raises:
+        Exception: If stock information is not available.
+    """
+    snapshot = get_snapshot(ticker, provider)
+    info = snapshot.info
+    
+    if not info:
+        raise Exception("No stock information available")
+        
+    # Create initial stock data with basic info
+    stock_data = {
+        "ticker": ticker,
+        "marketCap": safe_float(info.get('marketCap', 0)),
+        "beta": safe_float(info.get('beta', 0)) or 0,
+        "industry": info.get('industry', 'Technology'),
+        "country": info.get('country', 'US'),
+        "peRatio": safe_float(info.get('trailingPE', 0)) or 0,
+        "peRatioForward": safe_float(info.get('forwardPE', 0)) or 0,
+    }
+    
+    # Get country and industry data
+    country_data = scrape_country_industry_data(ticker, info)
+    
+    # Update stock data with country/industry data
+    stock_data.update({
+        "country": country_data['country'],
+        "industry": country_data['industry'],
+        "treasuryRate": safe_float(country_data['treasuryRate']),
+        "benchmarkEtf": country_data['benchmarkEtf'],
+        "benchmarkEtfReturn": safe_float(country_data['benchmarkEtfReturn']),
+        "industryRate": safe_float(country_data['industryRate'])
+    })
+    
+    # Get financial statements, as years x line items arrays
+    try:
+        statements = snapshot.statements
+
+        # Income statement
+        income_stmt = statements['financials']
+        if not income_stmt.empty:
+            # Get raw values first
+            interest_expense = income_stmt.latest('interestExpense')
+            tax_provision = income_stmt.latest('taxProvision')
+            pretax_income = income_stmt.latest('pretaxIncome')
+            ebit = income_stmt.latest('ebit')
+
+            # Calculate tax rate with fallback
+            if pretax_income > 0:
+                tax_rate = tax_provision / pretax_income
+            else:
+                # Use effective tax rate from info if available
+                tax_rate = safe_float(info.get('effectiveTaxRate', 0.21)) / 100
+                if tax_rate <= 0:
+                    tax_rate = 0.21  # Default corporate tax rate
+
+            # Calculate interest expense with fallback
+            if interest_expense <= 0 and pretax_income > 0:
+                # Estimate interest expense as 2% of pretax income
+                interest_expense = pretax_income * 0.02
+
+            stock_data.update({
+                "interestExpense": interest_expense,
+                "taxProvision": tax_provision,
+                "pretaxIncome": pretax_income,
+                "ebit": ebit,
+                "taxRate": tax_rate
+            })
+        
+        # Balance sheet
+        balance_sheet = statements['balance_sheet']
+        if not balance_sheet.empty:
+            total_debt = balance_sheet.latest('totalDebt')
+            cash = balance_sheet.latest('cashAndCashEquivalents')
+            total_assets = balance_sheet.latest('totalAssets')
+            current_liabilities = balance_sheet.latest('currentLiabilities')
+
+            # Calculate invested capital with fallback
+            invested_capital = total_assets - current_liabilities
+            if invested_capital <= 0:
+                # Estimate invested capital as 80% of total assets
+                invested_capital = total_assets * 0.8
+
+            stock_data.update({
+                "totalDebt": total_debt,
+                "cashAndCashEquivalents": cash,
+                "investedCapital": invested_capital,
+                "dilutedAverageShares": safe_float(info.get('sharesOutstanding', 0)),
+            })
+        
+        # Cash flow statement
+        cash_flow = statements['cashflow']
+        if not cash_flow.empty:
+            capex = cash_flow.latest('capex')
+            change_in_wc = cash_flow.latest('changeInWorkingCapital')
+
+            stock_data.update({
+                "capex": capex,
+                "changeInWorkingCapital": change_in_wc,
+            })
+            
+            fcf = free_cash_flows(cash_flow)
+                    
+            # Ensure we have at least one FCF value
+            if not fcf:
+                # Estimate FCF as 80% of EBIT if no FCF data
+                fcf = {datetime.now().year: stock_data.get('ebit', 0) * 0.8}
+                
+    except Exception as e:
+        logger.error(f"Error processing financial statements: {str(e)}")
+        # Set default values if financial statements can't be processed
+        stock_data.update({
+            "interestExpense": 0,
+            "taxProvision": 0,
+            "pretaxIncome": 0,
+            "ebit": 0,
+            "totalDebt": 0,
+            "cashAndCashEquivalents": 0,
+            "investedCapital": 0,
+            "dilutedAverageShares": safe_float(info.get('sharesOutstanding', 0)),
+            "capex": 0,
+            "changeInWorkingCapital": 0,
+            "taxRate": 0.21  # Default corporate tax rate
+        })
+        fcf = {datetime.now().year: stock_data.get('marketCap', 0) * 0.05}  # Estimate FCF as 5% of market cap if no data
+
+    # Calculate financial metrics
+    try:
+        # Ensure we have valid values for calculations
+        if stock_data['totalDebt'] <= 0:
+            stock_data['totalDebt'] = stock_data['marketCap'] * 0.1  # Estimate debt as 10% of market cap
+        if stock_data['interestExpense'] <= 0:
+            stock_data['interestExpense'] = stock_data['totalDebt'] * 0.05  # Estimate interest as 5% of debt
+
+        stock_data['equityCost'] = safe_float(dcf.calculate_cost_of_equity(
+            stock_data['treasuryRate'], 
+            stock_data['beta'], 
+            stock_data['benchmarkEtfReturn']
+        ))
+        stock_data['debtCost'] = safe_float(dcf.calculate_cost_of_debt(
+            stock_data['interestExpense'], 
+            stock_data['totalDebt']
+        ))
+        stock_data['netDebt'] = safe_float(stock_data['totalDebt'] - stock_data['cashAndCashEquivalents'])
+    except Exception as e:
+        logger.error(f"Error calculating financial metrics: {str(e)}")
+        stock_data.update({
+            'equityCost': 0.1,
+            'debtCost': 0.05,
+            'netDebt': 0
+        })
+
+    return stock_data, fcf
+
 def filter_stock_financials(ticker: str) -> dict:
     """
     Retrieves and processes financial data for a given stock ticker.
@@ -245,167 +1005,7 @@ def filter_stock_financials(ticker: str) -> dict:
         Exception: If stock information is not available or if there's an error processing the data.
     """
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-        
-        if not info:
-            raise Exception("No stock information available")
-            
-        # Helper function to safely convert values to float
-        def safe_float(value, default=0.0):
-            try:
-                if pd.isna(value) or np.isinf(value):
-                    return default
-                return float(value)
-            except (ValueError, TypeError):
-                return default
-
-        # Create initial stock data with basic info
-        stock_data = {
-            "ticker": ticker,
-            "marketCap": safe_float(info.get('marketCap', 0)),
-            "beta": safe_float(info.get('beta', 0)) or 0,
-            "industry": info.get('industry', 'Technology'),
-            "country": info.get('country', 'US'),
-            "peRatio": safe_float(info.get('trailingPE', 0)) or 0,
-            "peRatioForward": safe_float(info.get('forwardPE', 0)) or 0,
-        }
-        
-        # Get country and industry data
-        country_data = scrape_country_industry_data(ticker)
-        
-        # Update stock data with country/industry data
-        stock_data.update({
-            "country": country_data['country'],
-            "industry": country_data['industry'],
-            "treasuryRate": safe_float(country_data['treasuryRate']),
-            "benchmarkEtf": country_data['benchmarkEtf'],
-            "benchmarkEtfReturn": safe_float(country_data['benchmarkEtfReturn']),
-            "industryRate": safe_float(country_data['industryRate'])
-        })
-        
-        # Get financial statements
-        try:
-            # Get income statement
-            income_stmt = stock.financials
-            if not income_stmt.empty:
-                # Get raw values first
-                interest_expense = safe_float(income_stmt.loc['Interest Expense'].iloc[0]) if 'Interest Expense' in income_stmt.index else 0
-                tax_provision = safe_float(income_stmt.loc['Income Tax Expense'].iloc[0]) if 'Income Tax Expense' in income_stmt.index else 0
-                pretax_income = safe_float(income_stmt.loc['Pretax Income'].iloc[0]) if 'Pretax Income' in income_stmt.index else 0
-                ebit = safe_float(income_stmt.loc['EBIT'].iloc[0]) if 'EBIT' in income_stmt.index else 0
-
-                # Calculate tax rate with fallback
-                if pretax_income > 0:
-                    tax_rate = tax_provision / pretax_income
-                else:
-                    # Use effective tax rate from info if available
-                    tax_rate = safe_float(info.get('effectiveTaxRate', 0.21)) / 100
-                    if tax_rate <= 0:
-                        tax_rate = 0.21  # Default corporate tax rate
-
-                # Calculate interest expense with fallback
-                if interest_expense <= 0 and pretax_income > 0:
-                    # Estimate interest expense as 2% of pretax income
-                    interest_expense = pretax_income * 0.02
-
-                stock_data.update({
-                    "interestExpense": interest_expense,
-                    "taxProvision": tax_provision,
-                    "pretaxIncome": pretax_income,
-                    "ebit": ebit,
-                    "taxRate": tax_rate
-                })
-            
-            # Get balance sheet
-            balance_sheet = stock.balance_sheet
-            if not balance_sheet.empty:
-                total_debt = safe_float(balance_sheet.loc['Total Debt'].iloc[0]) if 'Total Debt' in balance_sheet.index else 0
-                cash = safe_float(balance_sheet.loc['Cash And Cash Equivalents'].iloc[0]) if 'Cash And Cash Equivalents' in balance_sheet.index else 0
-                total_assets = safe_float(balance_sheet.loc['Total Assets'].iloc[0]) if 'Total Assets' in balance_sheet.index else 0
-                current_liabilities = safe_float(balance_sheet.loc['Total Current Liabilities'].iloc[0]) if 'Total Current Liabilities' in balance_sheet.index else 0
-
-                # Calculate invested capital with fallback
-                invested_capital = total_assets - current_liabilities
-                if invested_capital <= 0:
-                    # Estimate invested capital as 80% of total assets
-                    invested_capital = total_assets * 0.8
-
-                stock_data.update({
-                    "totalDebt": total_debt,
-                    "cashAndCashEquivalents": cash,
-                    "investedCapital": invested_capital,
-                    "dilutedAverageShares": safe_float(info.get('sharesOutstanding', 0)),
-                })
-            
-            # Get cash flow statement
-            cash_flow = stock.cashflow
-            if not cash_flow.empty:
-                capex = safe_float(cash_flow.loc['Capital Expenditure'].iloc[0]) if 'Capital Expenditure' in cash_flow.index else 0
-                change_in_wc = safe_float(cash_flow.loc['Change In Working Capital'].iloc[0]) if 'Change In Working Capital' in cash_flow.index else 0
-
-                stock_data.update({
-                    "capex": capex,
-                    "changeInWorkingCapital": change_in_wc,
-                })
-                
-                # Calculate FCF
-                fcf = {}
-                for year in cash_flow.columns:
-                    operating_cash_flow = safe_float(cash_flow.loc['Operating Cash Flow', year]) if 'Operating Cash Flow' in cash_flow.index else 0
-                    capital_expenditure = safe_float(cash_flow.loc['Capital Expenditure', year]) if 'Capital Expenditure' in cash_flow.index else 0
-                    free_cash_flow = operating_cash_flow - capital_expenditure
-                    if not pd.isna(free_cash_flow) and free_cash_flow > 0:
-                        fcf[year.year] = free_cash_flow
-                        
-                # Ensure we have at least one FCF value
-                if not fcf:
-                    # Estimate FCF as 80% of EBIT if no FCF data
-                    fcf = {datetime.now().year: stock_data.get('ebit', 0) * 0.8}
-                    
-        except Exception as e:
-            logger.error(f"Error processing financial statements: {str(e)}")
-            # Set default values if financial statements can't be processed
-            stock_data.update({
-                "interestExpense": 0,
-                "taxProvision": 0,
-                "pretaxIncome": 0,
-                "ebit": 0,
-                "totalDebt": 0,
-                "cashAndCashEquivalents": 0,
-                "investedCapital": 0,
-                "dilutedAverageShares": safe_float(info.get('sharesOutstanding', 0)),
-                "capex": 0,
-                "changeInWorkingCapital": 0,
-                "taxRate": 0.21  # Default corporate tax rate
-            })
-            fcf = {datetime.now().year: stock_data.get('marketCap', 0) * 0.05}  # Estimate FCF as 5% of market cap if no data
-
-        # Calculate financial metrics
-        try:
-            # Ensure we have valid values for calculations
-            if stock_data['totalDebt'] <= 0:
-                stock_data['totalDebt'] = stock_data['marketCap'] * 0.1  # Estimate debt as 10% of market cap
-            if stock_data['interestExpense'] <= 0:
-                stock_data['interestExpense'] = stock_data['totalDebt'] * 0.05  # Estimate interest as 5% of debt
-
-            stock_data['equityCost'] = safe_float(dcf.calculate_cost_of_equity(
-                stock_data['treasuryRate'], 
-                stock_data['beta'], 
-                stock_data['benchmarkEtfReturn']
-            ))
-            stock_data['debtCost'] = safe_float(dcf.calculate_cost_of_debt(
-                stock_data['interestExpense'], 
-                stock_data['totalDebt']
-            ))
-            stock_data['netDebt'] = safe_float(stock_data['totalDebt'] - stock_data['cashAndCashEquivalents'])
-        except Exception as e:
-            logger.error(f"Error calculating financial metrics: {str(e)}")
-            stock_data.update({
-                'equityCost': 0.1,
-                'debtCost': 0.05,
-                'netDebt': 0
-            })
+        stock_data, fcf = extract_valuation_inputs(ticker)
 
         # Calculate intrinsic value
         try:
@@ -437,13 +1037,16 @@ def filter_stock_financials(ticker: str) -> dict:
         logger.error(f"Error fetching stock financials for {ticker}: {str(e)}")
         raise Exception(f"Failed to fetch stock financials: {str(e)}")
 
-def calculate_intrinsic_value_dcf(data_source: dict, fcf_list: dict) -> dict:
+@timed('dcf')
+def calculate_intrinsic_value_dcf(data_source: dict, fcf_list: dict, details: dict = None) -> dict:
     """
     Calculates the intrinsic value of a stock using the Discounted Cash Flow (DCF) method.
     
     Args:
         data_source (dict): Dictionary containing financial data
         fcf_list (dict): Dictionary of free cash flows by year
+        details (dict): Optional dict filled with the intermediates the result
+            was built from (projected FCF, net debt, shares, adjusted inputs)
         
     Returns:
         dict: Dictionary containing calculated values including:
@@ -478,61 +1081,23 @@ def calculate_intrinsic_value_dcf(data_source: dict, fcf_list: dict) -> dict:
         beta = safe_get('beta', 1.0)
         interest_expense = safe_get('interestExpense')
 
-        # Log input values for debugging
-        logger.info("Input Values:")
-        logger.info(f"  Market Cap: {market_cap:.2f}")
-        logger.info(f"  Total Debt: {total_debt:.2f}")
-        logger.info(f"  EBIT: {ebit:.2f}")
-        logger.info(f"  Tax Rate: {tax_rate:.4f}")
-        logger.info(f"  Net Debt: {net_debt:.2f}")
-        logger.info(f"  Shares Outstanding: {shares_outstanding:.2f}")
-        logger.info(f"  Invested Capital: {invested_capital:.2f}")
-        logger.info(f"  Capex: {capex:.2f}")
-        logger.info(f"  Change in WC: {change_in_working_capital:.2f}")
-        logger.info(f"  Treasury Rate: {treasury_rate:.4f}")
-        logger.info(f"  Benchmark Return: {benchmark_etf_return:.4f}")
-        logger.info(f"  Industry Rate: {industry_rate:.4f}")
-        logger.info(f"  Beta: {beta:.2f}")
-        logger.info(f"  Interest Expense: {interest_expense:.2f}")
-
-        # Calculate cost of equity using CAPM
-        try:
-            cost_of_equity = dcf.calculate_cost_of_equity(treasury_rate, beta, benchmark_etf_return)
-            cost_of_equity = max(min(cost_of_equity, 0.5), 0.01)  # Constrain between 1% and 50%
-            logger.info(f"Cost of Equity: {cost_of_equity:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating cost of equity: {str(e)}")
-            cost_of_equity = 0.1  # Default cost of equity
-
-        # Calculate cost of debt
-        try:
-            if total_debt <= 0:
-                total_debt = market_cap * 0.1  # Estimate debt as 10% of market cap
-            if interest_expense <= 0:
-                interest_expense = total_debt * 0.05  # Estimate interest as 5% of debt
-            
-            cost_of_debt = dcf.calculate_cost_of_debt(interest_expense, total_debt)
-            cost_of_debt = max(min(cost_of_debt, 0.5), 0.01)  # Constrain between 1% and 50%
-            logger.info(f"Cost of Debt: {cost_of_debt:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating cost of debt: {str(e)}")
-            cost_of_debt = 0.05  # Default cost of debt
-
-        # Calculate WACC
-        try:
-            if market_cap <= 0:
-                market_cap = 1
-            if total_debt <= 0:
-                total_debt = 1
-            if tax_rate < 0 or tax_rate > 1:
-                tax_rate = 0.21
-                
-            wacc = dcf.discount_rate(market_cap, total_debt, cost_of_equity, cost_of_debt, tax_rate)
-            wacc = max(min(wacc, 0.5), 0.01)  # Constrain between 1% and 50%
-            logger.info(f"WACC: {wacc:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating WACC: {str(e)}")
-            wacc = 0.1  # Default WACC
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DCF inputs for %s: %s", data_source.get('ticker'), json.dumps({
+                'marketCap': market_cap,
+                'totalDebt': total_debt,
+                'ebit': ebit,
+                'taxRate': tax_rate,
+                'netDebt': net_debt,
+                'sharesOutstanding': shares_outstanding,
+                'investedCapital': invested_capital,
+                'capex': capex,
+                'changeInWorkingCapital': change_in_working_capital,
+                'treasuryRate': treasury_rate,
+                'benchmarkEtfReturn': benchmark_etf_return,
+                'industryRate': industry_rate,
+                'beta': beta,
+                'interestExpense': interest_expense,
+            }))
 
         # Handle FCF data
         fcf_values = []
@@ -541,107 +1106,61 @@ def calculate_intrinsic_value_dcf(data_source: dict, fcf_list: dict) -> dict:
         elif isinstance(fcf_list, list):
             fcf_values = [safe_get(v) for v in fcf_list]
 
-        # Ensure we have valid FCF values
-        if not fcf_values or all(v == 0 for v in fcf_values):
-            if ebit > 0:
-                fcf_values = [ebit * 0.8]  # Estimate FCF as 80% of EBIT if no FCF data
-            else:
-                fcf_values = [market_cap * 0.05]  # Estimate FCF as 5% of market cap if no EBIT
-        logger.info(f"FCF Values: {fcf_values}")
-
-        # Calculate CAGR
-        try:
-            if len(fcf_values) >= 2 and all(v > 0 for v in fcf_values):
-                estimated_cagr = dcf.calculate_cagr(fcf_values)
-            else:
-                estimated_cagr = industry_rate
-            estimated_cagr = max(min(estimated_cagr, 0.5), -0.5)  # Constrain between -50% and 50%
-            logger.info(f"CAGR: {estimated_cagr:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating CAGR: {str(e)}")
-            estimated_cagr = industry_rate
+        # One native call runs cost of capital, growth, FCF projection and
+        # equity/intrinsic value, with the fallbacks and clamps applied in C++
+        inputs = dcf.ValuationInputs()
+        inputs.market_cap = market_cap
+        inputs.total_debt = total_debt
+        inputs.ebit = ebit
+        inputs.tax_rate = tax_rate
+        inputs.net_debt = net_debt
+        inputs.shares_outstanding = shares_outstanding
+        inputs.invested_capital = invested_capital
+        inputs.capex = capex
+        inputs.change_in_working_capital = change_in_working_capital
+        inputs.treasury_rate = treasury_rate
+        inputs.benchmark_etf_return = benchmark_etf_return
+        inputs.industry_rate = industry_rate
+        inputs.beta = beta
+        inputs.interest_expense = interest_expense
+        inputs.fcf_values = fcf_values
+        result = dcf.value_company(inputs)
 
-        # Calculate reinvestment rate
-        try:
-            if invested_capital > 0 and ebit > 0:
-                estimated_reinvestment_x_roic = dcf.calculate_reinvestment_x_roic(
-                    ebit, tax_rate, invested_capital, capex, change_in_working_capital
-                )
-            else:
-                estimated_reinvestment_x_roic = 0.0
-            estimated_reinvestment_x_roic = max(min(estimated_reinvestment_x_roic, 0.5), -0.5)
-            logger.info(f"Reinvestment Rate: {estimated_reinvestment_x_roic:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating reinvestment rate: {str(e)}")
-            estimated_reinvestment_x_roic = 0.0
-
-        # Calculate growth rate
-        try:
-            # Weighted average of CAGR and reinvestment rate
-            if estimated_reinvestment_x_roic < 0:
-                # If reinvestment rate is negative, rely more on CAGR
-                estimated_growth_rate = (0.8 * estimated_cagr) + (0.2 * estimated_reinvestment_x_roic)
-            else:
-                # Normal weighting
-                estimated_growth_rate = (0.7 * estimated_cagr) + (0.3 * estimated_reinvestment_x_roic)
-            
-            # Ensure growth rate is reasonable
-            estimated_growth_rate = max(min(estimated_growth_rate, wacc - 0.01), 0.01)
-            logger.info(f"Growth Rate: {estimated_growth_rate:.4f}")
-        except Exception as e:
-            logger.error(f"Error calculating growth rate: {str(e)}")
-            estimated_growth_rate = min(wacc - 0.01, 0.03)
-
-        # Calculate future FCF
-        try:
-            if fcf_values and fcf_values[-1] > 0:
-                future_fcf_list = dcf.estimate_future_fcf(fcf_values)
-            else:
-                future_fcf_list = [ebit * 0.8]  # Estimate FCF as 80% of EBIT if no FCF data
-            logger.info(f"Future FCF List: {future_fcf_list}")
-        except Exception as e:
-            logger.error(f"Error calculating future FCF: {str(e)}")
-            future_fcf_list = [ebit * 0.8]
-
-        # Calculate equity value
-        try:
-            if future_fcf_list and wacc > estimated_growth_rate:
-                equity_value = dcf.calculate_equity_value(future_fcf_list, wacc, estimated_growth_rate, net_debt)
-            else:
-                equity_value = market_cap
-            equity_value = max(min(equity_value, market_cap * 5), market_cap * 0.1)  # Constrain between 10% and 500% of market cap
-            logger.info(f"Equity Value: {equity_value:.2f}")
-        except Exception as e:
-            logger.error(f"Error calculating equity value: {str(e)}")
-            equity_value = market_cap
-
-        # Calculate intrinsic value
-        try:
-            if shares_outstanding > 0:
-                intrinsic_value = dcf.calculate_intrinsic_value(equity_value, shares_outstanding)
-            else:
-                intrinsic_value = 0.0
-            intrinsic_value = max(min(intrinsic_value, market_cap / shares_outstanding * 5), market_cap / shares_outstanding * 0.1)
-            logger.info(f"Intrinsic Value: {intrinsic_value:.2f}")
-        except Exception as e:
-            logger.error(f"Error calculating intrinsic value: {str(e)}")
-            intrinsic_value = 0.0
+        if details is not None:
+            details.update({
+                'futureFcf': list(result.future_fcf),
+                'baseFcf': result.fcf_values[-1] if result.fcf_values[-1] > 0 else ebit * 0.8,
+                'projectionGrowth': result.projection_growth,
+                'netDebt': net_debt,
+                'sharesOutstanding': shares_outstanding,
+                'marketCap': result.market_cap,
+                'totalDebt': result.total_debt,
+                'costOfDebt': result.cost_of_debt,
+                'taxRate': result.tax_rate,
+                'beta': beta,
+                'treasuryRate': treasury_rate,
+                'benchmarkEtfReturn': benchmark_etf_return,
+            })
 
         # Prepare response
         data = {
-            'wacc': wacc,
+            'wacc': result.wacc,
             'industryRate': industry_rate,
-            'reinvestmentRate': estimated_reinvestment_x_roic,
-            'cagr': estimated_cagr,
-            'chosenGrowthRate': estimated_growth_rate,
-            'intrinsicValue': intrinsic_value,
-            'equityValue': equity_value,
+            'reinvestmentRate': result.reinvestment_rate,
+            'cagr': result.cagr,
+            'chosenGrowthRate': result.growth_rate,
+            'intrinsicValue': result.intrinsic_value,
+            'equityValue': result.equity_value,
         }
 
-        # Log results
-        logger.info("DCF Calculation Results:")
-        for key, value in data.items():
-            logger.info(f"  {key}: {value:.4f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DCF results for %s: %s", data_source.get('ticker'), json.dumps({
+                **data,
+                'costOfEquity': result.cost_of_equity,
+                'costOfDebt': result.cost_of_debt,
+                'fcfValues': list(result.fcf_values),
+                'futureFcf': list(result.future_fcf),
+            }))
 
         return data
 
@@ -657,13 +1176,16 @@ def calculate_intrinsic_value_dcf(data_source: dict, fcf_list: dict) -> dict:
             'equityValue': 0.0,
         }
 
-def estimate_growth_rate(data_source: dict, fcf_list: dict) -> float:
+def estimate_growth_rate(data_source: dict, fcf_list: dict = None, statements: dict = None) -> float:
     """
     Estimates the growth rate for a company using multiple factors.
     
     Args:
         data_source (dict): Dictionary containing company financial data.
         fcf_list (dict): Dictionary of historical free cash flows by year.
+        statements (dict): Optional StatementTables (TickerSnapshot.statements);
+            when given, EBIT, capex, working capital and the FCF history are
+            read from them instead of `data_source` and `fcf_list`.
         
     Returns:
         float: Estimated growth rate as a decimal (e.g., 0.05 for 5%).
@@ -692,6 +1214,19 @@ def estimate_growth_rate(data_source: dict, fcf_list: dict) -> float:
         
         # Calculate WACC for reference
         wacc = dcf.discount_rate(market_cap, total_debt, cost_of_equity, cost_of_debt, tax_rate)
+
+        # Statement line items, from the columnar tables when given
+        if statements is not None:
+            cash_flow = statements['cashflow']
+            fcf_list = free_cash_flows(cash_flow)
+            ebit = statements['financials'].latest('ebit')
+            capex = cash_flow.latest('capex')
+            change_in_working_capital = cash_flow.latest('changeInWorkingCapital')
+        else:
+            ebit = data_source.get('ebit', 0)
+            capex = data_source.get('capex', 0)
+            change_in_working_capital = data_source.get('changeInWorkingCapital', 0)
+        invested_capital = data_source.get('investedCapital', 0)
         
         # Handle FCF data - convert to list if it's a dictionary
         if isinstance(fcf_list, dict):
@@ -706,11 +1241,6 @@ def estimate_growth_rate(data_source: dict, fcf_list: dict) -> float:
             estimated_cagr = industry_rate * 0.8  # Conservative estimate if not enough data
             
         # Calculate Reinvestment x ROIC
-        ebit = data_source.get('ebit', 0)
-        invested_capital = data_source.get('investedCapital', 0)
-        capex = data_source.get('capex', 0)
-        change_in_working_capital = data_source.get('changeInWorkingCapital', 0)
-        
         estimated_reinvestment_x_roic = dcf.calculate_reinvestment_x_roic(
             ebit, tax_rate, invested_capital, capex, change_in_working_capital
         )
@@ -744,12 +1274,15 @@ def estimate_growth_rate(data_source: dict, fcf_list: dict) -> float:
         # Final growth rate with constraints
         final_growth = min(max(weighted_growth, min_growth), max_growth)
         
-        logger.info(f"Growth rate estimation:")
-        logger.info(f"  - CAGR: {estimated_cagr:.2%}")
-        logger.info(f"  - Reinvestment x ROIC: {estimated_reinvestment_x_roic:.2%}")
-        logger.info(f"  - Industry Rate: {industry_rate:.2%}")
-        logger.info(f"  - WACC: {wacc:.2%}")
-        logger.info(f"  - Final Growth Rate: {final_growth:.2%}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Growth rate estimate for %s: %s", data_source.get('ticker'), json.dumps({
+                'cagr': estimated_cagr,
+                'reinvestmentXRoic': estimated_reinvestment_x_roic,
+                'industryRate': industry_rate,
+                'wacc': wacc,
+                'weights': weights,
+                'finalGrowthRate': final_growth,
+            }))
         
         return final_growth
         
@@ -758,6 +1291,108 @@ def estimate_growth_rate(data_source: dict, fcf_list: dict) -> float:
         # Fallback to conservative estimate
         return min(wacc - 0.015, 0.03)  # 3% or WACC-1.5%, whichever is lower
 
+def screen_ticker(ticker):
+    """Quote and valuation for the screener, through the same caches as the API."""
+    return get_cached_quote(ticker), get_cached_valuation(ticker)
+
+# Background valuation of the screener universe; opt-in with SCREENER=1, since
+# every worker that starts it values the whole universe
+screener = Screener(
+    screen_ticker,
+    universe_path=os.getenv('SCREENER_UNIVERSE_FILE', DEFAULT_UNIVERSE_FILE),
+    max_workers=int(os.getenv('SCREENER_MAX_WORKERS', 4)),
+    interval=float(os.getenv('SCREENER_REFRESH_INTERVAL', 3600)),
+)
+if os.getenv('SCREENER', '0') == '1':
+    screener.start(delay=float(os.getenv('SCREENER_DELAY', 30)))
+
+def refresh_quote(ticker):
+    """Refetches a ticker's info and quote, replacing the cached quote."""
+    key = ticker.upper()
+
+    def load():
+        refresh_snapshot(ticker, provider)
+        quote = fetch_stock_data(ticker)
+        if quote is not None:
+            quote_cache.set(key, quote)
+        return quote
+    # Requests arriving meanwhile share this fetch instead of starting their own
+    quote = flights['quote'].do(key, load)
+    if quote is None:
+        raise ValueError("No quote available")
+    return quote
+
+def refresh_history(ticker):
+    """Redownloads a ticker's intraday and daily bars and returns the rebuilt history."""
+    def load():
+        for name, cache in (('intraday', intraday_cache), ('daily', history_cache)):
+            fetch_source(name, ticker, provider, cache, price_store, refresh=True)
+        return build_history(ticker, provider, intraday_cache, history_cache, price_store)
+    return flights['history'].do(ticker.upper(), load)
+
+def history_expires_in(ticker):
+    remaining = [
+        cache.expires_in((ticker.upper(), SOURCES[name]['period'], SOURCES[name]['interval']))
+        for name, cache in (('intraday', intraday_cache), ('daily', history_cache))
+    ]
+    return None if None in remaining else min(remaining)
+
+def refresh_valuation(ticker):
+    """Recomputes a ticker's valuation, replacing the cached one."""
+    key = ticker.upper()
+
+    def load():
+        valuation = filter_stock_financials(ticker)
+        valuation_cache.set(key, valuation)
+        return valuation
+    return flights['valuation'].do(key, load)
+
+# Keeps the most requested tickers' quote, history and valuation fresh; opt-in
+# with PREFETCH=1. Only the worker holding PREFETCH_LOCK_FILE runs it, since
+# its budget is per process. With PRICE_STORE_DIR set, history is already
+# updated incrementally and is left out.
+prefetch_jobs = [RefreshJob('quote', lambda ticker: quote_cache.expires_in(ticker.upper()), refresh_quote)]
+if price_store is None:
+    prefetch_jobs.append(RefreshJob('history', history_expires_in, refresh_history))
+prefetch_jobs.append(RefreshJob('valuation', lambda ticker: valuation_cache.expires_in(ticker.upper()), refresh_valuation))
+prefetch_scheduler = PrefetchScheduler(
+    prefetch_jobs,
+    popularity,
+    top_n=int(os.getenv('PREFETCH_TOP_N', 25)),
+    min_score=float(os.getenv('PREFETCH_MIN_SCORE', 1.5)),
+    lead=float(os.getenv('PREFETCH_LEAD', 60)),
+    budget=float(os.getenv('PREFETCH_BUDGET', 30)),
+    interval=float(os.getenv('PREFETCH_INTERVAL', 15)),
+    max_workers=int(os.getenv('PREFETCH_MAX_WORKERS', 4)),
+)
+if os.getenv('PREFETCH', '0') == '1':
+    prefetch_scheduler.start(lock_path=os.getenv(
+        'PREFETCH_LOCK_FILE', os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), 'prefetch.lock')
+    ))
+
+def warm_ticker(ticker):
+    """Loads a ticker's quote, history and valuation into the caches."""
+    get_cached_quote(ticker)
+    get_cached_history(ticker)
+    get_cached_valuation(ticker)
+
+STARTUP_SECONDS['import'] = time.perf_counter() - IMPORT_STARTED
+logger.info(f"main.py imported in {STARTUP_SECONDS['import']:.2f}s")
+
+# Background warm-up once the app is importable (WARMUP=0 disables it): reference
+# data, the heavy modules, then the caches for WARMUP_TICKERS
+if os.getenv('WARMUP', '1') != '0':
+    start_warmup(
+        [
+            ('reference_data', get_reference_data),
+            ('numpy', lambda: preload(np)),
+            ('pandas', lambda: preload(pd)),
+            ('dcf_calculator', lambda: preload(dcf)),
+            ('yfinance', lambda: preload(yf)),
+        ] + [(f'ticker_{ticker}', lambda ticker=ticker: warm_ticker(ticker)) for ticker in parse_ticker_list(os.getenv('WARMUP_TICKERS', ''))],
+        delay=float(os.getenv('WARMUP_DELAY', 0)),
+    )
+
 if __name__ == '__main__':
     # For testing purposes
     if os.getenv('FLASK_ENV') == 'development':
@@ -767,7 +1402,7 @@ if __name__ == '__main__':
         print("2. get_stock_history(ticker)")
         print("3. get_stock_valuation(ticker)")
         print("4. filter_stock_financials(ticker)")
-        print("5. estimate_growth_rate(data_source, fcf_list)")
+        print("5. estimate_growth_rate(data_source, statements=...)")
         print("\nType 'exit' to quit")
         
         while True:
@@ -791,26 +1426,7 @@ if __name__ == '__main__':
                 
                 elif choice == '2':
                     # Test get_stock_history
-                    timeframe_configs = {
-                        '1D': {'period': '1d', 'interval': '30m'},
-                        '1W': {'period': '1wk', 'interval': '1d'},
-                        '1M': {'period': '1mo', 'interval': '1d'},
-                        '3M': {'period': '3mo', 'interval': '1wk'},
-                        '1Y': {'period': '1y', 'interval': '1mo'}
-                    }
-                    
-                    stock = yf.Ticker(ticker)
-                    all_history_data = {}
-                    
-                    for timeframe, config in timeframe_configs.items():
-                        hist = stock.history(period=config['period'], interval=config['interval'])
-                        if not hist.empty:
-                            prices = hist['Close'].tolist()
-                            timestamps = hist.index.strftime('%Y-%m-%d %H:%M:%S').tolist()
-                            all_history_data[timeframe] = {
-                                "prices": prices,
-                                "timestamps": timestamps
-                            }
+                    all_history_data = build_history(ticker, provider)
                     
                     print("\nStock History:")
                     print(json.dumps(all_history_data, indent=2))
@@ -828,21 +1444,11 @@ if __name__ == '__main__':
                     print(json.dumps(result, indent=2))
                 
                 elif choice == '5':
-                    # Test estimate_growth_rate
-                    stock_data = filter_stock_financials(ticker)
-                    if stock_data:
-                        stock = yf.Ticker(ticker)
-                        cash_flow = stock.get_cashflow(as_dict=True, freq='yearly')
-                        fcf = {}
-                        for timestamp, data in cash_flow.items():
-                            free_cash_flow = data.get('FreeCashFlow', None)
-                            if free_cash_flow and not pd.isna(free_cash_flow):
-                                year = timestamp.year
-                                fcf[year] = data['FreeCashFlow']
-                        
-                        growth_rate = estimate_growth_rate(stock_data, fcf)
-                        print("\nEstimated Growth Rate:")
-                        print(f"{growth_rate:.2%}")
+                    # Test estimate_growth_rate on the snapshot's statement tables
+                    stock_data, _ = extract_valuation_inputs(ticker)
+                    growth_rate = estimate_growth_rate(stock_data, statements=get_snapshot(ticker, provider).statements)
+                    print("\nEstimated Growth Rate:")
+                    print(f"{growth_rate:.2%}")
                 
             except Exception as e:
                 print(f"Error: {str(e)}")
@@ -0,0 +1,157 @@
+# Backend: metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Latency histogram with one series per label combination, rendered in
+    the Prometheus text format (cumulative buckets, sum and count).
+
+    Args:
+        name (str): Metric name
+        help (str): Description shown in the # HELP line
+        labels (tuple): Label names, given as keyword arguments to observe()
+        buckets (tuple): Ascending bucket upper bounds
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels[name] for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            series['counts'][index] += 1
+            series['sum'] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: (list(s['counts']), s['sum']) for key, s in self._series.items()}
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+def render_family(name: str, help: str, kind: str, label: str, values: dict) -> list:
+    """Renders point-in-time values (e.g. cache stats) as one gauge or counter family keyed by `label`."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for key, value in sorted(values.items()):
+        if value is not None:
+            lines.append(f"{name}{_format_labels((label,), (key,))} {_format_value(value)}")
+    return lines
+
+
+# Metrics recorded by the request pipeline
+STAGE_SECONDS = Histogram(
+    'stock_analyzer_stage_duration_seconds',
+    'Time spent in each stage of the request pipeline',
+    labels=('stage',),
+)
+REQUEST_SECONDS = Histogram(
+    'stock_analyzer_request_duration_seconds',
+    'HTTP request latency by route',
+    labels=('endpoint', 'method', 'status'),
+)
+STAGE_ERRORS = Counter(
+    'stock_analyzer_stage_errors_total',
+    'Pipeline stages that raised',
+    labels=('stage',),
+)
+PREFETCHES = Counter(
+    'stock_analyzer_prefetch_total',
+    'Proactive cache refreshes by the popularity scheduler, by outcome',
+    labels=('job', 'outcome'),
+)
+
+REGISTRY = [STAGE_SECONDS, REQUEST_SECONDS, STAGE_ERRORS, PREFETCHES]
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Records the time spent in the block (or decorated function) under
+    `stage`, counting an error when it raises.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def render_metrics(extra: list = None) -> str:
+    """Renders every registered metric, plus any pre-rendered `extra` lines, in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra or [])
+    return '\n'.join(lines) + '\n'
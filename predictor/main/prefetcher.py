@@ -0,0 +1,215 @@
+# Backend: prefetcher.py
+import os
+import math
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import PREFETCHES, timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, every process may run it
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class DecayingCounter:
+    """
+    Per-key request counts that halve every `half_life` seconds, so the
+    score tracks recent popularity. Only the `max_keys` highest-scoring keys
+    are kept.
+
+    Args:
+        half_life (float): Seconds for a score to decay to half
+        max_keys (int): Keys tracked before the coldest are dropped
+    """
+
+    def __init__(self, half_life: float = 600, max_keys: int = 2048):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._scores = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, score: float, at: float, now: float) -> float:
+        return score * math.pow(2.0, -(now - at) / self.half_life)
+
+    def hit(self, key, amount: float = 1.0) -> None:
+        now = time.time()
+        with self._lock:
+            score, at = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, at, now) + amount, now)
+            if len(self._scores) > self.max_keys:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        # Caller holds the lock; keeps the hottest half
+        ranked = sorted(self._scores.items(), key=lambda item: self._decayed(item[1][0], item[1][1], now), reverse=True)
+        self._scores = dict(ranked[:self.max_keys // 2])
+
+    def top(self, n: int, min_score: float = 0.0) -> list:
+        """The `n` highest-scoring keys as (key, score), hottest first, skipping scores below `min_score`."""
+        now = time.time()
+        with self._lock:
+            scores = [(key, self._decayed(score, at, now)) for key, (score, at) in self._scores.items()]
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return [(key, score) for key, score in scores[:n] if score >= min_score]
+
+
+class RefreshJob:
+    """
+    One kind of cached data the scheduler keeps warm.
+
+    Args:
+        name (str): Label for logs and metrics, e.g. 'quote'
+        expires_in (callable): ticker -> seconds until the cached entry goes
+            stale (negative once it has), or None when it isn't cached
+        refresh (callable): ticker -> None; reloads the entry from upstream,
+            raising if it could not
+    """
+
+    def __init__(self, name: str, expires_in, refresh):
+        self.name = name
+        self.expires_in = expires_in
+        self.refresh = refresh
+
+
+class PrefetchScheduler:
+    """
+    Refreshes the cached data of the most requested tickers shortly before
+    it expires, so popular symbols are always served from cache.
+
+    Every `interval` seconds the `top_n` hottest tickers (by decayed request
+    count) are checked, hottest first, and each job whose entry is missing or
+    expires within `lead` seconds is refreshed. Refreshes draw from a token
+    bucket of `budget` upstream refreshes per minute; once it is empty the
+    remaining work waits for the next tick. A refresh that fails is not
+    retried for `retry_after` seconds.
+
+    The budget and the popularity counts belong to the process, so with N
+    workers each running a scheduler upstream would see N times the budget.
+    `start(lock_path)` therefore runs it only in the process that holds an
+    exclusive lock on `lock_path`; the other processes leave it stopped.
+
+    Args:
+        jobs (list): RefreshJobs, run in order for each ticker
+        counter (DecayingCounter): Request popularity, fed by the API
+        top_n (int): Tickers kept warm
+        min_score (float): Ignore tickers less popular than this
+        lead (float): Seconds before expiry to refresh
+        budget (float): Refreshes allowed per minute
+        interval (float): Seconds between checks
+        max_workers (int): Refreshes run concurrently
+        retry_after (float): Seconds to skip a (ticker, job) after it fails
+    """
+
+    def __init__(self, jobs: list, counter: DecayingCounter, top_n: int = 25, min_score: float = 1.5,
+                 lead: float = 60, budget: float = 30, interval: float = 15, max_workers: int = 4,
+                 retry_after: float = 300):
+        self.jobs = jobs
+        self.counter = counter
+        self.top_n = top_n
+        self.min_score = min_score
+        self.lead = lead
+        self.budget = budget
+        self.interval = interval
+        self.max_workers = max_workers
+        self.retry_after = retry_after
+        self._failed_at = {}
+        self._tokens = budget
+        self._refilled_at = time.monotonic()
+        self._thread = None
+        self._lock_file = None
+
+    def _take_token(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.budget, self._tokens + (now - self._refilled_at) * self.budget / 60.0)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def due(self) -> list:
+        """(ticker, job) pairs whose cached entry is missing or about to expire, hottest ticker first."""
+        work = []
+        now = time.monotonic()
+        for ticker, _ in self.counter.top(self.top_n, self.min_score):
+            for job in self.jobs:
+                if now - self._failed_at.get((ticker, job.name), -math.inf) < self.retry_after:
+                    continue
+                remaining = job.expires_in(ticker)
+                if remaining is None or remaining < self.lead:
+                    work.append((ticker, job))
+        return work
+
+    def _run(self, ticker: str, job: RefreshJob) -> None:
+        try:
+            with timed(f'prefetch_{job.name}'):
+                job.refresh(ticker)
+            PREFETCHES.inc(job=job.name, outcome='refreshed')
+            self._failed_at.pop((ticker, job.name), None)
+        except Exception as e:
+            logger.warning(f"Prefetch of {job.name} for {ticker} failed: {str(e)}")
+            PREFETCHES.inc(job=job.name, outcome='failed')
+            self._failed_at[ticker, job.name] = time.monotonic()
+
+    def tick(self, pool) -> None:
+        """Checks the hottest tickers once and refreshes what is due, within budget."""
+        work = []
+        for ticker, job in self.due():
+            if not self._take_token():
+                PREFETCHES.inc(job=job.name, outcome='over_budget')
+                continue
+            work.append((ticker, job))
+        # A ticker's jobs run in order (the quote refresh fetches the info the
+        # valuation reads); different tickers run side by side
+        by_ticker = {}
+        for ticker, job in work:
+            by_ticker.setdefault(ticker, []).append(job)
+        futures = [
+            pool.submit(lambda ticker, jobs: [self._run(ticker, job) for job in jobs], ticker, jobs)
+            for ticker, jobs in by_ticker.items()
+        ]
+        for future in futures:
+            future.result()
+
+    def _acquire(self, lock_path: str) -> bool:
+        """Takes the exclusive lock on `lock_path` without waiting; held until the process exits."""
+        if fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+        lock_file = open(lock_path, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def start(self, lock_path: str = None) -> bool:
+        """
+        Starts the scheduler on a daemon thread. With `lock_path`, only if no
+        other process holds that lock. Returns whether it is running here.
+        """
+        if self._thread is not None:
+            return True
+        if lock_path is not None and not self._acquire(lock_path):
+            logger.info(f"Prefetch scheduler already runs in another process ({lock_path})")
+            return False
+
+        def run():
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='prefetch') as pool:
+                while True:
+                    time.sleep(self.interval)
+                    try:
+                        self.tick(pool)
+                    except Exception as e:
+                        logger.error(f"Prefetch scheduler tick failed: {str(e)}")
+
+        self._thread = threading.Thread(target=run, name='prefetch-scheduler', daemon=True)
+        self._thread.start()
+        return True
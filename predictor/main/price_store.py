@@ -0,0 +1,258 @@
+# Backend: price_store.py
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One fixed-width record per bar; timestamps are UTC epoch nanoseconds
+BAR_DTYPE = np.dtype([
+    ('ts', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+# Beyond this gap an incremental fetch isn't possible (Yahoo keeps ~60 days
+# of intraday bars), so the full period is downloaded again
+MAX_DELTA_DAYS = {'1m': 6, '2m': 50, '5m': 50, '15m': 50, '30m': 50, '60m': 600, '90m': 50, '1h': 600}
+
+
+class PriceStore:
+    """
+    Local columnar store of OHLCV bars, one memory-mapped file per
+    ticker/interval.
+
+    Each `<root>/<TICKER>/<interval>.bars` file is an array of BAR_DTYPE
+    records in time order, with a small JSON sidecar holding the exchange
+    timezone, the last fetch time and the published record count. Reads map
+    only the published records and slice the window a request needs before
+    building its DataFrame.
+
+    Updates fetch only the bars since the last stored one, which includes
+    that bar again (daily bars are refetched from the start of their day).
+    When the refetched copy of the last bar is the only stored bar that
+    differs, it is overwritten in place and newer bars are appended past the
+    published count, then the count is published, so a reader never maps a
+    half-written new record. An update that changes earlier bars (revised
+    history) or trims old intraday bars past the fetched period writes a new
+    file and swaps it in atomically, which keeps concurrent readers'
+    mappings valid.
+
+    Args:
+        root (str): Directory holding the store
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, ticker: str, interval: str):
+        directory = os.path.join(self.root, ticker.upper())
+        return os.path.join(directory, f"{interval}.bars"), os.path.join(directory, f"{interval}.json")
+
+    def _thread_lock(self, path: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def _read_meta(self, meta_path: str) -> dict:
+        try:
+            with open(meta_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, meta_path: str, meta: dict) -> None:
+        tmp_path = f"{meta_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w') as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, meta_path)
+
+    def bars(self, ticker: str, interval: str) -> np.ndarray:
+        """Returns a read-only memory-mapped view of every published bar (empty if none)."""
+        bars_path, meta_path = self._paths(ticker, interval)
+        # The count is read before the file is opened: records past it may
+        # still be being written
+        published = self._read_meta(meta_path).get('count')
+        if not os.path.exists(bars_path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        count = os.path.getsize(bars_path) // BAR_DTYPE.itemsize
+        if published is not None:
+            count = min(count, published)
+        if count < 1:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(bars_path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def to_frame(self, bars: np.ndarray, tz: str = None) -> pd.DataFrame:
+        """Wraps stored bars in a yfinance-shaped DataFrame."""
+        index = pd.DatetimeIndex(pd.to_datetime(bars['ts'], unit='ns', utc=True))
+        if tz:
+            index = index.tz_convert(tz)
+        return pd.DataFrame(
+            {column: pd.Series(bars[field], index=index, copy=False) for field, column in _COLUMNS.items()},
+            copy=False,
+        )
+
+    def _encode(self, hist: pd.DataFrame) -> np.ndarray:
+        index = hist.index if hist.index.tz is not None else hist.index.tz_localize('UTC')
+        records = np.empty(len(hist), dtype=BAR_DTYPE)
+        records['ts'] = index.tz_convert('UTC').as_unit('ns').asi8
+        for field, column in _COLUMNS.items():
+            records[field] = hist[column].to_numpy(dtype='float64') if column in hist else np.nan
+        return records
+
+    def _write(self, bars_path: str, records: np.ndarray, write_from: int = None) -> None:
+        if write_from is None:
+            tmp_path = f"{bars_path}.tmp.{os.getpid()}"
+            records.tofile(tmp_path)
+            os.replace(tmp_path, bars_path)
+            return
+        # Writes from the last published record (the still-forming bar) on;
+        # everything past it is unpublished, so readers don't map it yet
+        with open(bars_path, 'r+b') as file:
+            file.seek(write_from * BAR_DTYPE.itemsize)
+            file.write(records[write_from:].tobytes())
+
+    def _first_change(self, stored: np.ndarray, records: np.ndarray, position: int):
+        """
+        Index of the first record that differs from `stored` when `records`
+        keeps stored[:position] and only the last stored bar may differ
+        after it; None when an earlier bar changed or went missing.
+        """
+        last = len(stored) - 1
+        if len(records) <= last or records['ts'][last] != stored['ts'][last]:
+            return None
+        if records[position:last].tobytes() != np.asarray(stored[position:last]).tobytes():
+            return None
+        return last if records[last].tobytes() != stored[last].tobytes() else last + 1
+
+    def _retention_start(self, records: np.ndarray, period: str, tz: str) -> int:
+        """Epoch nanoseconds of the oldest bar `period` covers, counted back from the latest record."""
+        end = pd.Timestamp(int(records['ts'][-1]), tz='UTC').tz_convert(tz or 'UTC')
+        return (end.normalize() - _period_offset(period)).value
+
+    def update(self, ticker: str, interval: str, period: str, provider) -> None:
+        """
+        Brings the stored bars up to date, fetching the full `period` when the
+        store is empty and only the bars since the last stored one otherwise.
+        """
+        bars_path, meta_path = self._paths(ticker, interval)
+        os.makedirs(os.path.dirname(bars_path), exist_ok=True)
+
+        with self._thread_lock(bars_path), open(f"{bars_path}.lock", 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            stored = self.bars(ticker, interval)
+            meta = self._read_meta(meta_path)
+            last_ts = int(stored['ts'][-1]) if len(stored) else None
+            max_delta = pd.Timedelta(days=MAX_DELTA_DAYS.get(interval, 3650))
+
+            if last_ts is None or pd.Timestamp.now(tz='UTC') - pd.Timestamp(last_ts, tz='UTC') > max_delta:
+                hist = provider.get_history(ticker, period=period, interval=interval)
+                incremental = False
+            else:
+                start = pd.Timestamp(last_ts, tz='UTC')
+                if meta.get('tz'):
+                    start = start.tz_convert(meta['tz'])
+                # Daily and coarser bars are requested from the start of their day
+                if not interval.endswith(('m', 'h')):
+                    start = start.normalize()
+                hist = provider.get_history(ticker, period=period, interval=interval, start=start)
+                incremental = True
+
+            if hist is None or hist.empty:
+                meta['fetchedAt'] = time.time()
+                self._write_meta(meta_path, meta)
+                return
+
+            tz = str(hist.index.tz) if hist.index.tz is not None else None
+            records = self._encode(hist.sort_index())
+            write_from = None
+            if incremental:
+                # Refetched bars replace everything stored from the first of
+                # them on; a refetch that ends early means upstream revised history
+                position = int(np.searchsorted(stored['ts'], records['ts'][0], side='left'))
+                records = np.concatenate([np.asarray(stored[:position]), records])
+                write_from = self._first_change(stored, records, position)
+            if interval.endswith(('m', 'h')):
+                # Intraday bars are only kept for the period they are fetched for
+                trimmed = int(np.searchsorted(records['ts'], self._retention_start(records, period, tz), side='left'))
+                if trimmed:
+                    records = records[trimmed:]
+                    write_from = None
+
+            if write_from is not None:
+                self._write(bars_path, records, write_from=write_from)
+                logger.info(f"Updated {len(records) - write_from} {interval} bars for {ticker} in place")
+            else:
+                self._write(bars_path, records)
+                logger.info(f"Stored {len(records)} {interval} bars for {ticker}")
+
+            # Publishing the count makes the new bars visible to readers
+            meta.update({'tz': tz, 'fetchedAt': time.time(), 'count': len(records)})
+            self._write_meta(meta_path, meta)
+
+    def get(self, ticker: str, period: str, interval: str, provider, max_age: float) -> pd.DataFrame:
+        """
+        Returns the bars covering `period`, updating from upstream first if the
+        last fetch is older than `max_age` seconds.
+
+        Args:
+            ticker (str): Stock ticker symbol
+            period (str): yfinance period the caller needs, e.g. '1y'
+            interval (str): Bar interval, e.g. '1d'
+            provider (MarketDataProvider): Upstream source for updates
+            max_age (float): Seconds a previous fetch stays current
+
+        Returns:
+            pd.DataFrame: OHLCV bars backed by the memory-mapped file.
+        """
+        _, meta_path = self._paths(ticker, interval)
+        meta = self._read_meta(meta_path)
+        if time.time() - meta.get('fetchedAt', 0) >= max_age:
+            self.update(ticker, interval, period, provider)
+            meta = self._read_meta(meta_path)
+
+        bars = self.bars(ticker, interval)
+        if not len(bars):
+            return pd.DataFrame()
+
+        # Slice of the trailing window the period asks for, measured in
+        # exchange-local calendar days from the latest bar
+        end = pd.Timestamp(int(bars['ts'][-1]), tz='UTC').tz_convert(meta.get('tz') or 'UTC')
+        start = end.normalize() - _period_offset(period)
+        position = int(np.searchsorted(bars['ts'], start.value, side='left'))
+        return self.to_frame(bars[position:], meta.get('tz'))
+
+
+def _period_offset(period: str):
+    """Converts a yfinance period ('1d', '5d', '1wk', '3mo', '1y', 'max') into a lookback offset."""
+    if period == 'max':
+        return pd.DateOffset(years=100)
+    if period == 'ytd':
+        return pd.DateOffset(years=1)
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        count = period[:-len(suffix)]
+        if period.endswith(suffix) and count.isdigit():
+            # 'Nd' covers the latest N sessions including the latest bar's day
+            if unit == 'days':
+                return pd.DateOffset(days=int(count) - 1)
+            return pd.DateOffset(**{unit: int(count)})
+    raise ValueError(f"Unsupported period: {period}")
@@ -0,0 +1,262 @@
+# Backend: providers.py
+from __future__ import annotations
+
+import os
+import json
+import logging
+import threading
+from metrics import timed
+from startup import lazy_import
+
+# Imported on first use: yfinance alone takes a few hundred ms to load
+yf = lazy_import('yfinance')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Default location for recorded upstream responses
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class MarketDataProvider:
+    """
+    Interface for every upstream market data source used by the backend.
+
+    A provider returns the same shapes yfinance does: `get_info` returns the
+    `.info` dictionary, `get_history` returns an OHLCV DataFrame indexed by
+    timestamp (covering `period`, or everything from `start` when given),
+    and the statement methods return DataFrames indexed by line item with
+    one column per fiscal year (newest first).
+    """
+
+    name = 'base'
+
+    def get_info(self, ticker: str) -> dict:
+        raise NotImplementedError
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live Yahoo Finance backend."""
+
+    name = 'yfinance'
+
+    def get_info(self, ticker: str) -> dict:
+        return yf.Ticker(ticker).info
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        if start is not None:
+            return yf.Ticker(ticker).history(start=start, interval=interval)
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).financials
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).balance_sheet
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        return yf.Ticker(ticker).cashflow
+
+
+def _fixture_path(fixtures_dir: str, ticker: str, kind: str) -> str:
+    return os.path.join(fixtures_dir, ticker.upper(), f"{kind}.json")
+
+
+def _frame_to_fixture(df: pd.DataFrame) -> dict:
+    """Serializes a DataFrame to a JSON-safe dict, keeping datetime axes intact."""
+    def encode_axis(axis):
+        if isinstance(axis, pd.DatetimeIndex):
+            return {
+                'type': 'datetime',
+                'tz': str(axis.tz) if axis.tz is not None else None,
+                'values': [ts.isoformat() for ts in axis],
+            }
+        return {'type': 'plain', 'values': [str(v) for v in axis]}
+
+    return {
+        'index': encode_axis(df.index),
+        'columns': encode_axis(df.columns),
+        'data': df.astype('float64').values.tolist(),
+    }
+
+
+def _fixture_to_frame(payload: dict) -> pd.DataFrame:
+    def decode_axis(axis):
+        if axis['type'] == 'datetime':
+            index = pd.to_datetime(axis['values'], utc=axis['tz'] is not None)
+            if axis['tz'] is not None:
+                index = index.tz_convert(axis['tz'])
+            return pd.DatetimeIndex(index)
+        return pd.Index(axis['values'])
+
+    return pd.DataFrame(
+        payload['data'],
+        index=decode_axis(payload['index']),
+        columns=decode_axis(payload['columns']),
+        dtype='float64',
+    )
+
+
+class RecordingProvider(MarketDataProvider):
+    """
+    Wraps another provider and writes every response it returns to the
+    fixtures directory so it can later be served by `ReplayProvider`.
+    """
+
+    name = 'record'
+
+    def __init__(self, upstream: MarketDataProvider, fixtures_dir: str = DEFAULT_FIXTURES_DIR):
+        self.upstream = upstream
+        self.fixtures_dir = fixtures_dir
+        self._lock = threading.Lock()
+
+    def _write(self, ticker: str, kind: str, payload) -> None:
+        path = _fixture_path(self.fixtures_dir, ticker, kind)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(payload, file, default=str)
+            os.replace(tmp_path, path)
+        logger.info(f"Recorded {kind} fixture for {ticker}")
+
+    def get_info(self, ticker: str) -> dict:
+        info = self.upstream.get_info(ticker)
+        self._write(ticker, 'info', info)
+        return info
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        hist = self.upstream.get_history(ticker, period=period, interval=interval, start=start)
+        # Incremental (start=...) responses are partial, so only full periods are recorded
+        if start is None:
+            self._write(ticker, f"history_{period}_{interval}", _frame_to_fixture(hist))
+        return hist
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        df = self.upstream.get_financials(ticker)
+        self._write(ticker, 'financials', _frame_to_fixture(df))
+        return df
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        df = self.upstream.get_balance_sheet(ticker)
+        self._write(ticker, 'balance_sheet', _frame_to_fixture(df))
+        return df
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        df = self.upstream.get_cashflow(ticker)
+        self._write(ticker, 'cashflow', _frame_to_fixture(df))
+        return df
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves responses previously captured by `RecordingProvider` without any
+    network access. Missing fixtures behave like an unknown ticker upstream:
+    an empty info dict or an empty DataFrame.
+    """
+
+    name = 'replay'
+
+    def __init__(self, fixtures_dir: str = DEFAULT_FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+
+    def _read(self, ticker: str, kind: str):
+        path = _fixture_path(self.fixtures_dir, ticker, kind)
+        if not os.path.exists(path):
+            logger.warning(f"No {kind} fixture recorded for {ticker}")
+            return None
+        with open(path, 'r') as file:
+            return json.load(file)
+
+    def _read_frame(self, ticker: str, kind: str) -> pd.DataFrame:
+        payload = self._read(ticker, kind)
+        if payload is None:
+            return pd.DataFrame()
+        return _fixture_to_frame(payload)
+
+    def get_info(self, ticker: str) -> dict:
+        return self._read(ticker, 'info') or {}
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        hist = self._read_frame(ticker, f"history_{period}_{interval}")
+        if start is not None and not hist.empty:
+            hist = hist[hist.index >= pd.Timestamp(start)]
+        return hist
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        return self._read_frame(ticker, 'financials')
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        return self._read_frame(ticker, 'balance_sheet')
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        return self._read_frame(ticker, 'cashflow')
+
+
+class TimedProvider(MarketDataProvider):
+    """
+    Wraps another provider and records how long each upstream call takes,
+    as the 'upstream_<call>' stages of the request pipeline metrics.
+    """
+
+    def __init__(self, upstream: MarketDataProvider):
+        self.upstream = upstream
+        self.name = upstream.name
+
+    def get_info(self, ticker: str) -> dict:
+        with timed('upstream_info'):
+            return self.upstream.get_info(ticker)
+
+    def get_history(self, ticker: str, period: str = '1mo', interval: str = '1d', start=None) -> pd.DataFrame:
+        with timed('upstream_history'):
+            return self.upstream.get_history(ticker, period=period, interval=interval, start=start)
+
+    def get_financials(self, ticker: str) -> pd.DataFrame:
+        with timed('upstream_financials'):
+            return self.upstream.get_financials(ticker)
+
+    def get_balance_sheet(self, ticker: str) -> pd.DataFrame:
+        with timed('upstream_balance_sheet'):
+            return self.upstream.get_balance_sheet(ticker)
+
+    def get_cashflow(self, ticker: str) -> pd.DataFrame:
+        with timed('upstream_cashflow'):
+            return self.upstream.get_cashflow(ticker)
+
+
+def create_provider(mode: str = None, fixtures_dir: str = None) -> MarketDataProvider:
+    """
+    Builds the market data provider selected by configuration.
+
+    Args:
+        mode (str): 'yfinance' (live, default), 'record' (live and capture
+            responses to disk) or 'replay' (serve captured responses only).
+            Falls back to the MARKET_DATA_PROVIDER environment variable.
+        fixtures_dir (str): Directory holding recorded responses. Falls back
+            to MARKET_DATA_FIXTURES_DIR, then `main/fixtures`.
+
+    Returns:
+        MarketDataProvider: The configured provider.
+    """
+    mode = (mode or os.getenv('MARKET_DATA_PROVIDER', 'yfinance')).lower()
+    fixtures_dir = fixtures_dir or os.getenv('MARKET_DATA_FIXTURES_DIR', DEFAULT_FIXTURES_DIR)
+
+    if mode == 'yfinance':
+        return YFinanceProvider()
+    if mode == 'record':
+        return RecordingProvider(YFinanceProvider(), fixtures_dir)
+    if mode == 'replay':
+        return ReplayProvider(fixtures_dir)
+    raise ValueError(f"Unknown market data provider: {mode}")
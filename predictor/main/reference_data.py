@@ -0,0 +1,284 @@
+# Backend: reference_data.py
+import os
+import re
+import json
+import time
+import logging
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'country_industry_data.json')
+
+
+class CountryData(NamedTuple):
+    name: str
+    treasury_rate: float          # decimal, e.g. 0.04497
+    benchmark_etf: str
+    benchmark_etf_return: float   # decimal, e.g. 0.075
+
+
+class IndustryData(NamedTuple):
+    name: str
+    growth_rate: float            # decimal, e.g. 0.05
+
+
+# Used when a country or industry can't be matched to the data file
+DEFAULT_COUNTRY = 'United States'
+DEFAULT_INDUSTRY = IndustryData('Technology', 0.05)
+
+# Alternative spellings Yahoo and users send for countries in the data file
+COUNTRY_ALIASES = {
+    'US': 'United States',
+    'USA': 'United States',
+    'U.S.': 'United States',
+    'U.S.A.': 'United States',
+    'United States of America': 'United States',
+    'UK': 'United Kingdom',
+    'U.K.': 'United Kingdom',
+    'Great Britain': 'United Kingdom',
+    'Britain': 'United Kingdom',
+    'England': 'United Kingdom',
+    'Korea': 'South Korea',
+    'Republic of Korea': 'South Korea',
+    'Korea, Republic of': 'South Korea',
+    'UAE': 'United Arab Emirates',
+    'Czechia': 'Czech Republic',
+    'Türkiye': 'Turkey',
+    'Turkiye': 'Turkey',
+    'Holland': 'Netherlands',
+    'The Netherlands': 'Netherlands',
+    'Russian Federation': 'Russia',
+    'Viet Nam': 'Vietnam',
+    "People's Republic of China": 'China',
+    'PRC': 'China',
+    'Hong Kong SAR': 'Hong Kong',
+}
+
+# Yahoo Finance industry names mapped onto the industries in the data file.
+# Yahoo's "Group - Detail" names also fall back to their group prefix.
+INDUSTRY_ALIASES = {
+    'Software - Infrastructure': 'Software',
+    'Software - Application': 'Software',
+    'Information Technology Services': 'Consulting',
+    'Internet Content & Information': 'Internet Services',
+    'Internet Retail': 'E-commerce',
+    'Computer Hardware': 'Computer Hardware',
+    'Communication Equipment': 'Telecommunications',
+    'Telecom Services': 'Telecommunications',
+    'Electronic Components': 'Electronics Manufacturing',
+    'Scientific & Technical Instruments': 'Electronics Manufacturing',
+    'Semiconductor Equipment & Materials': 'Semiconductors',
+    'Banks': 'Banking',
+    'Capital Markets': 'Investment Banking',
+    'Credit Services': 'Financial Services',
+    'Asset Management': 'Financial Services',
+    'Financial Data & Stock Exchanges': 'Financial Services',
+    'Drug Manufacturers': 'Pharmaceuticals',
+    'Medical Instruments & Supplies': 'Medical Devices',
+    'Medical Care Facilities': 'Healthcare Services',
+    'Healthcare Plans': 'Healthcare Services',
+    'Diagnostics & Research': 'Healthcare Services',
+    'Auto Manufacturers': 'Automotive',
+    'Auto Parts': 'Automotive',
+    'Auto & Truck Dealerships': 'Automotive',
+    'Oil & Gas Integrated': 'Oil & Gas',
+    'Oil & Gas E&P': 'Oil & Gas',
+    'Oil & Gas Midstream': 'Oil & Gas',
+    'Oil & Gas Refining & Marketing': 'Oil & Gas',
+    'Oil & Gas Equipment & Services': 'Energy Equipment & Services',
+    'Utilities': 'Utilities',
+    'Solar': 'Renewable Energy',
+    'Beverages': 'Non-Alcoholic Beverages',
+    'Beverages - Non-Alcoholic': 'Non-Alcoholic Beverages',
+    'Beverages - Brewers': 'Alcoholic Beverages',
+    'Beverages - Wineries & Distilleries': 'Alcoholic Beverages',
+    'Packaged Foods': 'Food Processing',
+    'Confectioners': 'Food & Beverage',
+    'Restaurants': 'Hospitality',
+    'Lodging': 'Hospitality',
+    'Resorts & Casinos': 'Gaming',
+    'Electronic Gaming & Multimedia': 'Gaming',
+    'Travel Services': 'Tourism',
+    'Discount Stores': 'Retail',
+    'Specialty Retail': 'Retail',
+    'Department Stores': 'Retail',
+    'Home Improvement Retail': 'Retail',
+    'Apparel Retail': 'Apparel & Fashion',
+    'Apparel Manufacturing': 'Apparel & Fashion',
+    'Footwear & Accessories': 'Apparel & Fashion',
+    'Luxury Goods': 'Luxury Goods',
+    'Household & Personal Products': 'Cosmetics',
+    'Entertainment': 'Entertainment',
+    'Broadcasting': 'Broadcasting',
+    'Publishing': 'Media',
+    'Advertising Agencies': 'Media',
+    'Specialty Industrial Machinery': 'Heavy Machinery',
+    'Farm & Heavy Construction Machinery': 'Heavy Machinery',
+    'Engineering & Construction': 'Construction',
+    'Residential Construction': 'Construction',
+    'Real Estate': 'Real Estate Development',
+    'Real Estate Services': 'Real Estate Development',
+    'Integrated Freight & Logistics': 'Logistics',
+    'Trucking': 'Transportation',
+    'Railroads': 'Transportation',
+    'Marine Shipping': 'Marine Transportation',
+    'Waste Management': 'Waste Management',
+    'Specialty Chemicals': 'Chemicals',
+    'Agricultural Inputs': 'Agriculture',
+    'Farm Products': 'Farming',
+    'Gold': 'Mining',
+    'Silver': 'Mining',
+    'Copper': 'Mining',
+    'Other Industrial Metals & Mining': 'Mining',
+    'Other Precious Metals & Mining': 'Mining',
+    'Steel': 'Mining',
+    'Lumber & Wood Production': 'Forestry',
+    'Packaging & Containers': 'Packaging',
+    'Textile Manufacturing': 'Textiles',
+    'Leisure': 'Sports',
+    'Education & Training Services': 'Education',
+    'Consulting Services': 'Consulting',
+    'Insurance': 'Insurance',
+    'Aerospace & Defense': 'Aerospace & Defense',
+}
+
+
+def normalize_key(name: str) -> str:
+    """Case/punctuation-insensitive lookup key: 'Oil & Gas E&P' -> 'oil and gas e and p'."""
+    key = str(name).casefold().replace('&', ' and ')
+    key = re.sub(r'[^\w]+', ' ', key)
+    return ' '.join(key.split())
+
+
+class ReferenceData:
+    """
+    Immutable, pre-indexed view of `country_industry_data.json`.
+
+    Percentages from the file are converted to decimals once at load time,
+    and every lookup goes through normalized keys plus the alias tables, so
+    'US', 'usa' and 'United States' resolve to the same country and Yahoo's
+    industry names resolve to the file's industries.
+    """
+
+    def __init__(self, raw: dict, path: str = None, mtime: float = None):
+        self.path = path
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+        countries = {}
+        for name, values in raw.get('countries', {}).items():
+            countries[name] = CountryData(
+                name=name,
+                treasury_rate=values.get('10y_treasury_rate', 4.4970) / 100,
+                benchmark_etf=values.get('benchmark_etf', 'SPY'),
+                benchmark_etf_return=values.get('benchmark_etf_return', 7.5) / 100,
+            )
+        industries = {
+            name: IndustryData(name=name, growth_rate=values.get('growth_rate', 5.0) / 100)
+            for name, values in raw.get('industries', {}).items()
+        }
+        self.countries = MappingProxyType(countries)
+        self.industries = MappingProxyType(industries)
+
+        self._country_index = MappingProxyType(self._build_index(countries, COUNTRY_ALIASES))
+        self._industry_index = MappingProxyType(self._build_index(industries, INDUSTRY_ALIASES))
+
+    @staticmethod
+    def _build_index(entries: dict, aliases: dict) -> dict:
+        index = {normalize_key(name): entry for name, entry in entries.items()}
+        for alias, target in aliases.items():
+            if target in entries:
+                index.setdefault(normalize_key(alias), entries[target])
+        return index
+
+    def find_country(self, name: str):
+        """Returns the CountryData for a name or alias, or None if unknown."""
+        if not name:
+            return None
+        return self._country_index.get(normalize_key(name))
+
+    def find_industry(self, name: str):
+        """Returns the IndustryData for a name, alias or Yahoo group, or None if unknown."""
+        if not name:
+            return None
+        match = self._industry_index.get(normalize_key(name))
+        if match is None and ' - ' in name:
+            match = self._industry_index.get(normalize_key(name.split(' - ', 1)[0]))
+        return match
+
+    def country(self, name: str) -> CountryData:
+        """Like `find_country`, falling back to the United States."""
+        match = self.find_country(name)
+        if match is None:
+            match = self.countries.get(DEFAULT_COUNTRY) or CountryData(DEFAULT_COUNTRY, 0.04497, 'SPY', 0.075)
+        return match
+
+    def industry(self, name: str) -> IndustryData:
+        """Like `find_industry`, falling back to DEFAULT_INDUSTRY."""
+        return self.find_industry(name) or DEFAULT_INDUSTRY
+
+
+def load_reference_data(path: str = DEFAULT_DATA_FILE) -> ReferenceData:
+    with open(path, 'r') as file:
+        raw = json.load(file)
+    data = ReferenceData(raw, path=path, mtime=os.path.getmtime(path))
+    logger.info(f"Loaded {len(data.countries)} countries and {len(data.industries)} industries from {path}")
+    return data
+
+
+# Loaded once, on first use (or by the startup warm-up); replaced wholesale
+# (never mutated) on reload
+_current = None
+_load_lock = threading.Lock()
+_watcher = None
+
+
+def get_reference_data() -> ReferenceData:
+    global _current
+    if _current is None:
+        with _load_lock:
+            if _current is None:
+                _current = load_reference_data(os.getenv('COUNTRY_INDUSTRY_DATA_FILE', DEFAULT_DATA_FILE))
+    return _current
+
+
+def reload_reference_data(force: bool = False) -> bool:
+    """
+    Reloads the data file if it changed on disk since the last load.
+
+    A file that fails to parse is logged and ignored, keeping the previous
+    data in service.
+
+    Returns:
+        bool: True if new data was swapped in.
+    """
+    global _current
+    get_reference_data()
+    try:
+        mtime = os.path.getmtime(_current.path)
+        if not force and mtime == _current.mtime:
+            return False
+        _current = load_reference_data(_current.path)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to reload reference data from {_current.path}: {str(e)}")
+        return False
+
+
+def start_reference_data_watcher(interval: float = 30.0) -> None:
+    """Starts a daemon thread that checks the data file every `interval` seconds."""
+    global _watcher
+    if _watcher is not None:
+        return
+
+    def watch():
+        while True:
+            time.sleep(interval)
+            reload_reference_data()
+
+    _watcher = threading.Thread(target=watch, name='reference-data-watcher', daemon=True)
+    _watcher.start()
+    logger.info(f"Watching {get_reference_data().path} for changes every {interval}s")
@@ -0,0 +1,242 @@
+# Backend: screener.py
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from metrics import timed
+from reference_data import normalize_key
+from startup import lazy_import
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UNIVERSE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'screener_universe.txt')
+
+# Numeric columns: sortable, and filterable with ?min<Field>/?max<Field>
+NUMERIC_FIELDS = ('discount', 'intrinsicValue', 'currentPrice', 'marketCap', 'wacc', 'peRatio', 'chosenGrowthRate')
+
+# Republish the table after this many newly valued tickers during a refresh
+PUBLISH_EVERY = 25
+
+
+def load_universe(path: str = DEFAULT_UNIVERSE_FILE) -> list:
+    """Reads one ticker per line ('#' starts a comment), upper-cased and de-duplicated in order."""
+    tickers = []
+    with open(path, 'r') as file:
+        for line in file:
+            ticker = line.split('#', 1)[0].strip().upper()
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def screen_row(ticker: str, quote: dict, valuation: dict) -> dict:
+    """
+    One screener row from a ticker's quote and valuation. `discount` is the
+    margin of safety, 1 - price / intrinsic value: positive when the stock
+    trades below its intrinsic value.
+    """
+    def number(value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if np.isfinite(value) else None
+
+    price = number(quote.get('currentPrice'))
+    intrinsic_value = number(valuation.get('intrinsicValue'))
+    discount = None
+    if price and intrinsic_value and price > 0 and intrinsic_value > 0:
+        discount = 1 - price / intrinsic_value
+
+    return {
+        'ticker': ticker,
+        'companyName': quote.get('companyName', ''),
+        'industry': valuation.get('industry', ''),
+        'country': valuation.get('country', ''),
+        'currentPrice': price,
+        'intrinsicValue': intrinsic_value,
+        'discount': discount,
+        'marketCap': number(valuation.get('marketCap')),
+        'wacc': number(valuation.get('wacc')),
+        'peRatio': number(valuation.get('peRatio')) or None,
+        'chosenGrowthRate': number(valuation.get('chosenGrowthRate')),
+    }
+
+
+class ScreenerTable:
+    """
+    Immutable columnar index over screener rows.
+
+    Each NUMERIC_FIELDS column is a float64 array (NaN where unknown) with its
+    ascending and descending orders precomputed, and industry/country map to
+    row positions, so a query is a few boolean masks and one take. An empty
+    table builds no arrays, so creating one doesn't import numpy.
+
+    Args:
+        rows (list): Rows as built by screen_row
+        updated_at (float): Epoch seconds of the newest row
+    """
+
+    def __init__(self, rows: list, updated_at: float = None):
+        self.rows = rows
+        self.updated_at = updated_at
+        self.columns, self.orders, self.by_industry, self.by_country = {}, {}, {}, {}
+        if not rows:
+            return
+        self.columns = {
+            field: np.array([np.nan if row[field] is None else row[field] for row in rows], dtype='float64')
+            for field in NUMERIC_FIELDS
+        }
+        # Unknown values sort last either way
+        for field, column in self.columns.items():
+            self.orders[field, False] = np.argsort(column, kind='stable')
+            self.orders[field, True] = np.argsort(np.where(np.isnan(column), np.inf, -column), kind='stable')
+        self.by_industry = self._index('industry')
+        self.by_country = self._index('country')
+
+    def _index(self, field: str) -> dict:
+        positions = {}
+        for i, row in enumerate(self.rows):
+            positions.setdefault(normalize_key(row[field]), []).append(i)
+        return {key: np.array(value) for key, value in positions.items()}
+
+    def _match(self, index: dict, names: list):
+        mask = np.zeros(len(self.rows), dtype=bool)
+        for name in names:
+            positions = index.get(normalize_key(name))
+            if positions is not None:
+                mask[positions] = True
+        return mask
+
+    def query(self, industries=None, countries=None, ranges=None, sort='discount', descending=True, offset=0, limit=50):
+        """
+        Rows matching every filter, sorted by `sort`.
+
+        Args:
+            industries (list): Keep rows in any of these industries
+            countries (list): Keep rows in any of these countries
+            ranges (dict): Field -> (low, high); None leaves a side open
+            sort (str): One of NUMERIC_FIELDS
+            descending (bool): Largest first
+            offset (int): Matching rows to skip
+            limit (int): Most rows to return
+
+        Returns:
+            tuple: (number of matching rows, list of rows for this page)
+        """
+        if not self.rows:
+            return 0, []
+        mask = np.ones(len(self.rows), dtype=bool)
+        if industries:
+            mask &= self._match(self.by_industry, industries)
+        if countries:
+            mask &= self._match(self.by_country, countries)
+        for field, (low, high) in (ranges or {}).items():
+            column = self.columns[field]
+            # NaN fails both comparisons, so unknown values never pass a range filter
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+
+        order = self.orders[sort, descending]
+        selected = order[mask[order]]
+        return len(selected), [self.rows[i] for i in selected[offset:offset + limit]]
+
+
+class Screener:
+    """
+    Values a ticker universe in the background and serves queries over the
+    results from a ScreenerTable.
+
+    Tickers are valued with `value(ticker)` -> (quote, valuation) on a pool
+    of `max_workers` threads. The table is rebuilt and swapped in every
+    PUBLISH_EVERY results, so the first refresh is queryable before it
+    finishes. A ticker that fails keeps its previous row.
+
+    Args:
+        value (callable): Returns (quote dict, valuation dict) for a ticker
+        universe_path (str): Ticker list file (see load_universe)
+        max_workers (int): Tickers valued concurrently
+        interval (float): Seconds between the end of one refresh and the next
+    """
+
+    def __init__(self, value, universe_path: str = DEFAULT_UNIVERSE_FILE, max_workers: int = 4, interval: float = 3600):
+        self.value = value
+        self.universe_path = universe_path
+        self.max_workers = max_workers
+        self.interval = interval
+        self.table = ScreenerTable([])
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._status = {'running': False, 'universe': 0, 'valued': 0, 'failed': 0, 'lastRefreshSeconds': None}
+
+    def status(self) -> dict:
+        with self._lock:
+            return dict(self._status, rows=len(self.table.rows), updatedAt=self.table.updated_at)
+
+    def _publish(self) -> None:
+        with self._lock:
+            rows = sorted(self._rows.values(), key=lambda row: row['ticker'])
+        self.table = ScreenerTable(rows, updated_at=time.time())
+
+    def _value_one(self, ticker: str) -> dict:
+        quote, valuation = self.value(ticker)
+        if not quote or not valuation:
+            raise ValueError("No quote or valuation available")
+        return screen_row(ticker, quote, valuation)
+
+    def refresh(self) -> None:
+        """Values every ticker in the universe once."""
+        universe = load_universe(self.universe_path)
+        with self._lock:
+            self._status.update(running=True, universe=len(universe), valued=0, failed=0)
+            # Tickers dropped from the universe file leave the table
+            self._rows = {ticker: row for ticker, row in self._rows.items() if ticker in universe}
+
+        start = time.perf_counter()
+        with timed('screener_refresh'), ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='screener') as pool:
+            futures = {pool.submit(self._value_one, ticker): ticker for ticker in universe}
+            for done, future in enumerate(as_completed(futures), 1):
+                ticker = futures[future]
+                try:
+                    row = future.result()
+                    with self._lock:
+                        self._rows[ticker] = row
+                        self._status['valued'] += 1
+                except Exception as e:
+                    logger.warning(f"Screener could not value {ticker}: {str(e)}")
+                    with self._lock:
+                        self._status['failed'] += 1
+                if done % PUBLISH_EVERY == 0:
+                    self._publish()
+
+        self._publish()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._status.update(running=False, lastRefreshSeconds=elapsed)
+        logger.info(f"Screener valued {self._status['valued']}/{len(universe)} tickers in {elapsed:.1f}s")
+
+    def start(self, delay: float = 0.0) -> None:
+        """Starts a daemon thread that refreshes after `delay` seconds, then every `interval`."""
+        if self._thread is not None:
+            return
+
+        def run():
+            time.sleep(delay)
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Screener refresh failed: {str(e)}")
+                    with self._lock:
+                        self._status['running'] = False
+                time.sleep(self.interval)
+
+        self._thread = threading.Thread(target=run, name='screener', daemon=True)
+        self._thread.start()
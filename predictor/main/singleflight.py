@@ -0,0 +1,90 @@
+# Backend: singleflight.py
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; every caller arriving
+    while it is in flight blocks until it finishes and receives the same
+    result (or the same exception, BaseExceptions included). Nothing is
+    remembered once the call completes, so this complements rather than
+    replaces the caches.
+
+    Args:
+        name (str): Label used in logs and stats
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'executions': 0, 'coalesced': 0, 'errors': 0}
+
+    def do(self, key, fn):
+        """
+        Runs `fn()` for `key` unless an identical call is already in flight.
+
+        Args:
+            key: Hashable identity of the work, e.g. (ticker, endpoint)
+            fn (callable): Zero-argument function doing the work
+
+        Returns:
+            The result of the single execution of `fn`.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats['executions'] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            # Including KeyboardInterrupt/SystemExit (e.g. a worker timeout),
+            # so followers raise it too instead of returning None
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            try:
+                with self._lock:
+                    del self._calls[key]
+            finally:
+                call.event.set()
+            if call.waiters:
+                logger.info(f"Shared {self.name} result for {key} with {call.waiters} concurrent callers")
+
+    def stats(self) -> dict:
+        """Returns call/execution/coalesced counters and the in-flight count."""
+        with self._lock:
+            return {**self._stats, 'inFlight': len(self._calls)}
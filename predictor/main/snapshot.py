@@ -0,0 +1,110 @@
+# Backend: snapshot.py
+import time
+import logging
+import threading
+from cache import TTLCache, caches, fundamentals_ttl
+from statements import extract_statements
+
+logger = logging.getLogger(__name__)
+
+
+class TickerSnapshot:
+    """
+    Fundamentals for one ticker, fetched at most once from the provider.
+
+    Each field (info, financials, balance sheet, cash flow) is loaded lazily on
+    first access and then reused by every caller holding the snapshot, so the
+    quote, valuation and country/industry lookups share a single upstream
+    fetch per field. Fetch errors are not memoized; the next access retries.
+
+    Statements are additionally read through the 'fundamentals' cache, so
+    they outlive the snapshot and are refetched only after a day or at the
+    company's next earnings date, whichever comes first. `statements` holds
+    their line items as arrays, extracted once per snapshot.
+    """
+
+    def __init__(self, ticker: str, provider):
+        self.ticker = ticker
+        self.provider = provider
+        self.created_at = time.time()
+        self._values = {}
+        self._locks = {name: threading.Lock() for name in ('info', 'financials', 'balance_sheet', 'cashflow', 'statements')}
+
+    def _load(self, name: str, fetch):
+        if name in self._values:
+            return self._values[name]
+        with self._locks[name]:
+            if name not in self._values:
+                logger.info(f"Fetching {name} for {self.ticker}")
+                self._values[name] = fetch(self.ticker)
+            return self._values[name]
+
+    @property
+    def info(self) -> dict:
+        return self._load('info', self.provider.get_info)
+
+    def _load_statement(self, name: str, fetch):
+        def load(ticker):
+            return caches['fundamentals'].get_or_load(
+                (ticker, name), lambda: fetch(ticker), ttl=fundamentals_ttl(self.info)
+            )
+        return self._load(name, load)
+
+    @property
+    def financials(self):
+        return self._load_statement('financials', self.provider.get_financials)
+
+    @property
+    def balance_sheet(self):
+        return self._load_statement('balance_sheet', self.provider.get_balance_sheet)
+
+    @property
+    def cashflow(self):
+        return self._load_statement('cashflow', self.provider.get_cashflow)
+
+    @property
+    def statements(self) -> dict:
+        """The three statements as columnar StatementTables (see statements.py), built once."""
+        return self._load('statements', lambda ticker: extract_statements(self))
+
+
+# Snapshots shared across endpoints, keyed by upper-cased ticker
+_snapshots = TTLCache(name='snapshot', maxsize=256, ttl=300)
+
+
+def get_snapshot(ticker: str, provider) -> TickerSnapshot:
+    """
+    Returns the shared snapshot for a ticker, creating a fresh one when none
+    exists or the existing one has expired from the snapshot cache.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        provider (MarketDataProvider): Upstream source used for new snapshots
+
+    Returns:
+        TickerSnapshot: Snapshot shared by every caller within the window.
+    """
+    key = ticker.upper()
+    return _snapshots.get_or_load(key, lambda: TickerSnapshot(key, provider))
+
+
+def refresh_snapshot(ticker: str, provider) -> TickerSnapshot:
+    """
+    Replaces a ticker's snapshot with a new one holding freshly fetched info.
+    The info is fetched before the swap, so readers never wait on it; if the
+    fetch fails the current snapshot stays in place.
+    """
+    key = ticker.upper()
+    snapshot = TickerSnapshot(key, provider)
+    snapshot.info
+    _snapshots.set(key, snapshot)
+    return snapshot
+
+
+def snapshot_cache() -> TTLCache:
+    """The cache holding the shared snapshots, keyed by upper-cased ticker."""
+    return _snapshots
+
+
+def snapshot_cache_stats() -> dict:
+    return _snapshots.stats()
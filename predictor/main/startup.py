@@ -0,0 +1,104 @@
+# Backend: startup.py
+import sys
+import time
+import logging
+import importlib
+import threading
+import types
+
+from metrics import timed, STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent importing each lazily loaded module, and in each startup phase
+IMPORT_SECONDS = {}
+STARTUP_SECONDS = {}
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stands in for a module until one of its attributes is first used, then
+    imports it and forwards everything to it.
+
+    Heavy libraries (pandas, numpy, yfinance, the dcf_calculator extension)
+    are bound this way so the app can answer `/` before they finish loading.
+    The import is timed as stage `import_<name>` and kept in IMPORT_SECONDS;
+    `on_load` callbacks (e.g. configuring the extension's thread count) run
+    once, right after it.
+    """
+
+    def __init__(self, name: str, on_load=None):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_on_load'] = list(on_load or [])
+
+    def _import(self):
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                # Only the first import of a module is timed; later proxies
+                # for it (or one already pulled in by another library) are free
+                first = self.__name__ not in sys.modules
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                if first:
+                    IMPORT_SECONDS[self.__name__] = time.perf_counter() - start
+                    STAGE_SECONDS.observe(IMPORT_SECONDS[self.__name__], stage=f'import_{self.__name__}')
+                for callback in self.__dict__['_lazy_on_load']:
+                    callback(module)
+                # Become a plain module holding a copy of the real one's
+                # namespace (as importlib.util.LazyLoader does), so later
+                # lookups run at normal module speed; names added to the real
+                # module afterwards are still found through __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__['__getattr__'] = lambda name: getattr(module, name)
+                self.__dict__['_lazy_module'] = module
+                self.__class__ = types.ModuleType
+        return module
+
+    def __getattr__(self, name):
+        return getattr(LazyModule._import(self), name)
+
+    def __dir__(self):
+        return dir(LazyModule._import(self))
+
+
+def lazy_import(name: str, on_load=None) -> LazyModule:
+    """Returns a LazyModule for `name`; see LazyModule."""
+    return LazyModule(name, on_load)
+
+
+def preload(module: LazyModule):
+    """Imports a LazyModule's module now instead of on first use."""
+    if isinstance(module, LazyModule):
+        LazyModule._import(module)
+    return module
+
+
+def start_warmup(steps: list, delay: float = 0.0) -> threading.Thread:
+    """
+    Runs `steps` ((name, fn) pairs) one after another on a daemon thread.
+
+    Each step is timed as stage `warmup_<name>`; a failing step is logged
+    and skipped, and the total lands in STARTUP_SECONDS['warmup'].
+    """
+    def warm():
+        if delay > 0:
+            time.sleep(delay)
+        start = time.perf_counter()
+        for name, fn in steps:
+            try:
+                with timed(f'warmup_{name}'):
+                    fn()
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed: {str(e)}")
+        STARTUP_SECONDS['warmup'] = time.perf_counter() - start
+        logger.info(f"Warm-up finished in {STARTUP_SECONDS['warmup']:.2f}s")
+
+    thread = threading.Thread(target=warm, name='warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,114 @@
+# Backend: statements.py
+from __future__ import annotations
+
+import logging
+from startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Line items read from each statement: field -> labels to try, in order. Later
+# labels fill the years where earlier ones are missing (Yahoo renames rows
+# between companies and over time, e.g. 'Tax Provision', 'Current Liabilities').
+STATEMENT_FIELDS = {
+    'financials': {
+        'interestExpense': ('Interest Expense', 'Interest Expense Non Operating'),
+        'taxProvision': ('Income Tax Expense', 'Tax Provision'),
+        'pretaxIncome': ('Pretax Income',),
+        'ebit': ('EBIT', 'Operating Income'),
+    },
+    'balance_sheet': {
+        'totalDebt': ('Total Debt',),
+        'cashAndCashEquivalents': ('Cash And Cash Equivalents', 'Cash Cash Equivalents And Short Term Investments'),
+        'totalAssets': ('Total Assets',),
+        'currentLiabilities': ('Total Current Liabilities', 'Current Liabilities'),
+    },
+    'cashflow': {
+        'operatingCashFlow': ('Operating Cash Flow', 'Cash Flow From Continuing Operating Activities'),
+        'capex': ('Capital Expenditure',),
+        'changeInWorkingCapital': ('Change In Working Capital',),
+    },
+}
+
+
+class StatementTable:
+    """
+    The line items of one financial statement as a years x fields float64
+    array (newest fiscal year first, NaN where a value is missing).
+
+    Args:
+        years (np.ndarray): Fiscal year of each row
+        fields (tuple): Field name of each column
+        values (np.ndarray): Array of shape (len(years), len(fields))
+        empty (bool): Whether the source statement was empty
+    """
+
+    def __init__(self, years, fields, values, empty: bool = False):
+        self.years = years
+        self.fields = tuple(fields)
+        self.values = values
+        self.empty = empty
+        self._columns = {field: i for i, field in enumerate(self.fields)}
+
+    def series(self, field: str) -> np.ndarray:
+        """Every year's value of `field`, newest first."""
+        return self.values[:, self._columns[field]]
+
+    def latest(self, field: str, default: float = 0.0) -> float:
+        """The newest value of `field`, or `default` if it is missing or not finite."""
+        if not len(self.years):
+            return default
+        value = self.values[0, self._columns[field]]
+        return float(value) if np.isfinite(value) else default
+
+    def __repr__(self):
+        return f"StatementTable(years={self.years.tolist()}, fields={list(self.fields)})"
+
+
+def _to_float64(frame: pd.DataFrame) -> np.ndarray:
+    try:
+        return frame.to_numpy(dtype='float64', na_value=np.nan)
+    except (ValueError, TypeError):
+        # Object columns holding text: anything non-numeric becomes NaN
+        return frame.apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+
+def extract_table(frame: pd.DataFrame, fields: dict) -> StatementTable:
+    """
+    Reads `fields` (field -> alias labels) out of a statement DataFrame
+    indexed by line item with one column per fiscal year.
+
+    The statement is converted to float64 once and every alias row gathered
+    from it in one take; each field then takes, year by year, the first
+    alias with a value.
+    """
+    if frame is None or frame.empty:
+        return StatementTable(np.empty(0, dtype='int64'), fields, np.empty((0, len(fields))), empty=True)
+
+    # Row of each line item (the first, if Yahoo repeats one)
+    rows = {label: i for i, label in reversed(list(enumerate(frame.index.tolist())))}
+    positions = np.array([rows.get(label, -1) for aliases in fields.values() for label in aliases])
+    block = _to_float64(frame)[positions]
+    block[positions < 0] = np.nan
+
+    values = np.empty((len(fields), block.shape[1]))
+    row = 0
+    for i, aliases in enumerate(fields.values()):
+        values[i] = block[row]
+        for alias in range(row + 1, row + len(aliases)):
+            missing = np.isnan(values[i])
+            values[i, missing] = block[alias, missing]
+        row += len(aliases)
+
+    years = np.array([column.year for column in frame.columns], dtype='int64')
+    return StatementTable(years, fields, values.T.copy())
+
+
+def extract_statements(snapshot) -> dict:
+    """The STATEMENT_FIELDS tables for a TickerSnapshot, keyed by statement name."""
+    return {
+        name: extract_table(getattr(snapshot, name), fields)
+        for name, fields in STATEMENT_FIELDS.items()
+    }
@@ -1,3 +1,4 @@
+import sys
 from setuptools import setup, Extension, find_packages
 import pybind11
 
@@ -6,7 +7,8 @@ dcf_calculator = Extension(
     sources=['main/dcf_calculator.cpp'],
     include_dirs=[pybind11.get_include()],
     language='c++',
-    extra_compile_args=['-std=c++11'],  # Ensure C++11 compatibility
+    extra_compile_args=['-std=c++11'] + ([] if sys.platform == 'win32' else ['-pthread']),  # Ensure C++11 compatibility
+    extra_link_args=[] if sys.platform == 'win32' else ['-pthread'],  # std::thread for Monte Carlo
 )
 
 setup(
@@ -27,5 +29,9 @@ setup(
         'pybind11>=2.10.4',
         'python-dotenv>=1.0.0',
     ],
+    extras_require={
+        'asgi': ['uvicorn>=0.23.2'],  # async serving mode, main/asgi.py
+        'fast': ['orjson>=3.9.10', 'msgpack>=1.0.7', 'Brotli>=1.1.0'],  # response encoding, main/encoding.py
+    },
     zip_safe=False,
 )
\ No newline at end of file
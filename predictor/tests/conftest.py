@@ -0,0 +1,30 @@
+# Tests: conftest.py
+# Runs the app offline against the fixed frames in benchmarks/fixtures.py.
+# The dcf_calculator extension must be built (pip install -e . or
+# python setup.py build_ext --inplace).
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'main'))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+# No upstream and no background jobs: must be set before main is imported
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('WARMUP', '0')
+os.environ.setdefault('SCREENER', '0')
+os.environ.setdefault('PREFETCH', '0')
+os.environ.setdefault('CACHE_BACKEND', 'memory')
+os.environ.setdefault('MARKET_DATA_PROVIDER', 'replay')
+
+import main
+from fixtures import FixtureProvider
+from providers import TimedProvider
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, 'provider', TimedProvider(FixtureProvider()))
+    return main.app.test_client()
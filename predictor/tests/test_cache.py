@@ -0,0 +1,29 @@
+# Tests: test_cache.py
+import sqlite3
+
+from cache import SQLiteCache
+
+
+def accessed_at(conn, key):
+    return conn.execute("SELECT accessed_at FROM cache WHERE key = ?", (repr(key),)).fetchone()[0]
+
+
+def test_sqlite_hits_only_write_stale_access_times(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = SQLiteCache('test', path=path, maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    conn = sqlite3.connect(path, isolation_level=None)
+
+    stamp = accessed_at(conn, 'a')
+    for _ in range(5):
+        assert cache.get('a') == 1
+    assert accessed_at(conn, 'a') == stamp
+
+    # Once the recorded access is old enough, a hit refreshes it and the
+    # least recently read entry is still the one evicted
+    conn.execute("UPDATE cache SET accessed_at = accessed_at - 600")
+    cache.get('a')
+    assert accessed_at(conn, 'a') >= stamp
+    cache.set('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
@@ -0,0 +1,18 @@
+# Tests: test_full.py
+import threading
+
+import main
+
+
+def test_sections_run_inline_when_the_pool_is_busy(client, monkeypatch):
+    pooled = client.get('/api/stock/BENCH/full').get_json()
+
+    # No free section threads: every section runs on the request's thread
+    monkeypatch.setattr(main, 'section_slots', threading.BoundedSemaphore(1))
+    main.section_slots.acquire()
+    submitted = []
+    monkeypatch.setattr(main.section_executor, 'submit', lambda *args: submitted.append(args))
+
+    inline = client.get('/api/stock/BENCH/full').get_json()
+    assert not submitted
+    assert inline == pooled
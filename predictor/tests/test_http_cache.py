@@ -0,0 +1,60 @@
+# Tests: test_http_cache.py
+import time
+
+import main
+
+URL = '/api/stock/BENCH/valuation'
+
+
+def fresh_etag(client):
+    main.etag_cache.clear()
+    # The first request loads the valuation; the second memoizes its ETag
+    client.get(URL)
+    response = client.get(URL)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def test_matching_etag_is_not_modified(client):
+    etag = fresh_etag(client)
+    assert client.get(URL, headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_refreshed_data_invalidates_memoized_etag(client):
+    etag = fresh_etag(client)
+    valuation = dict(main.valuation_cache.get('BENCH'), intrinsicValue=1.0)
+    time.sleep(0.01)
+    # As the prefetcher does: replace the entry without going through the view
+    main.valuation_cache.set('BENCH', valuation)
+
+    try:
+        response = client.get(URL, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['intrinsicValue'] == 1.0
+        assert response.headers['ETag'] != etag
+    finally:
+        main.valuation_cache.invalidate('BENCH')
+
+
+def test_refreshed_fundamentals_change_sensitivity_etag(client):
+    url = '/api/stock/BENCH/valuation/sensitivity'
+    main.etag_cache.clear()
+    client.get(url)
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    cashflow = main.caches['fundamentals'].get(('BENCH', 'cashflow'))
+    time.sleep(0.01)
+    try:
+        # New statements land in the fundamentals cache and the next snapshot reads them
+        main.caches['fundamentals'].set(('BENCH', 'cashflow'), cashflow * 1.5)
+        main.snapshot_cache().invalidate('BENCH')
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()['intrinsicValues'] != first.get_json()['intrinsicValues']
+    finally:
+        main.caches['fundamentals'].invalidate(('BENCH', 'cashflow'))
+        main.snapshot_cache().invalidate('BENCH')
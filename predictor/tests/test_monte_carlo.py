@@ -0,0 +1,15 @@
+# Tests: test_monte_carlo.py
+import pytest
+
+
+def test_zero_spread_reproduces_point_estimate(client):
+    valuation = client.get('/api/stock/BENCH/valuation').get_json()
+    result = client.get(
+        '/api/stock/BENCH/valuation/montecarlo?betaSd=0&waccSd=0&cagrSd=0&reinvestmentSd=0&simulations=1000'
+    ).get_json()
+
+    assert result['base']['intrinsicValue'] == pytest.approx(valuation['intrinsicValue'], rel=1e-12)
+    assert result['mean'] == pytest.approx(valuation['intrinsicValue'], rel=1e-12)
+    assert result['std'] == pytest.approx(0.0, abs=1e-9)
+    assert result['percentiles']['p5'] == pytest.approx(result['percentiles']['p95'], rel=1e-12)
+
@@ -0,0 +1,16 @@
+# Tests: test_prefetcher.py
+import pytest
+
+import prefetcher
+from prefetcher import DecayingCounter, PrefetchScheduler
+
+
+@pytest.mark.skipif(prefetcher.fcntl is None, reason="needs fcntl")
+def test_only_the_lock_holder_runs(tmp_path):
+    lock_path = str(tmp_path / 'prefetch.lock')
+    first = PrefetchScheduler([], DecayingCounter(), interval=3600)
+    second = PrefetchScheduler([], DecayingCounter(), interval=3600)
+
+    assert first.start(lock_path=lock_path)
+    assert not second.start(lock_path=lock_path)
+    assert second._thread is None
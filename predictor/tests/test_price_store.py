@@ -0,0 +1,60 @@
+# Tests: test_price_store.py
+import os
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+
+
+class DailyProvider:
+    """Serves a close series as daily bars, from `resend_days` before `start` when given."""
+
+    def __init__(self, closes, resend_days=0):
+        self.closes = closes
+        self.resend_days = resend_days
+
+    def get_history(self, ticker, period, interval, start=None):
+        if start is not None:
+            start -= pd.Timedelta(days=self.resend_days)
+        closes = self.closes if start is None else self.closes[self.closes.index >= start]
+        return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes, 'Volume': 1.0})
+
+
+def daily_closes(days):
+    end = pd.Timestamp.now(tz='America/New_York').normalize()
+    index = pd.date_range(end=end, periods=days, freq='D', tz='America/New_York')
+    return pd.Series(np.arange(days, dtype='float64'), index=index)
+
+
+def test_daily_refresh_updates_last_bar_in_place(tmp_path):
+    store = PriceStore(str(tmp_path))
+    closes = daily_closes(30)
+    store.update('TEST', '1d', '1y', DailyProvider(closes))
+    path = tmp_path / 'TEST' / '1d.bars'
+    inode = os.stat(path).st_ino
+
+    # The refetch covers the stored last bar again (with a new close) plus a newer one
+    closes.iloc[-1] = 100.0
+    closes[closes.index[-1] + pd.Timedelta(days=1)] = 101.0
+    store.update('TEST', '1d', '1y', DailyProvider(closes))
+
+    bars = store.bars('TEST', '1d')
+    assert os.stat(path).st_ino == inode
+    assert bars['close'].tolist() == closes.tolist()
+
+
+def test_revised_history_rewrites_the_file(tmp_path):
+    store = PriceStore(str(tmp_path))
+    closes = daily_closes(30)
+    store.update('TEST', '1d', '1y', DailyProvider(closes))
+    path = tmp_path / 'TEST' / '1d.bars'
+    inode = os.stat(path).st_ino
+
+    # Upstream restates the day before the last stored one
+    revised = closes.copy()
+    revised.iloc[-2] = -1.0
+    store.update('TEST', '1d', '1y', DailyProvider(revised, resend_days=1))
+
+    assert os.stat(path).st_ino != inode
+    assert store.bars('TEST', '1d')['close'].tolist() == revised.tolist()
@@ -0,0 +1,47 @@
+# Tests: test_screener.py
+import pytest
+
+import main
+from screener import ScreenerTable
+
+
+def row(ticker, wacc, discount):
+    return {
+        'ticker': ticker, 'companyName': ticker, 'industry': 'Software', 'country': 'United States',
+        'currentPrice': 100.0, 'intrinsicValue': 120.0, 'discount': discount, 'marketCap': 1e9,
+        'wacc': wacc, 'peRatio': 20.0, 'chosenGrowthRate': 0.05,
+    }
+
+
+@pytest.fixture
+def screened(client, monkeypatch):
+    rows = [row('AAA', 0.09, 0.1), row('BBB', 0.07, None), row('CCC', None, 0.3), row('DDD', 0.11, -0.2)]
+    monkeypatch.setattr(main.screener, 'table', ScreenerTable(rows, updated_at=0.0))
+    return client
+
+
+def tickers(response):
+    assert response.status_code == 200
+    return [result['ticker'] for result in response.get_json()['results']]
+
+
+def test_bare_field_sorts_ascending(screened):
+    assert tickers(screened.get('/api/screener?sort=wacc')) == ['BBB', 'AAA', 'DDD', 'CCC']
+
+
+def test_minus_prefix_sorts_descending(screened):
+    assert tickers(screened.get('/api/screener?sort=-wacc')) == ['DDD', 'AAA', 'BBB', 'CCC']
+
+
+def test_default_sort_is_largest_discount_first(screened):
+    assert tickers(screened.get('/api/screener')) == ['CCC', 'AAA', 'DDD', 'BBB']
+
+
+def test_unknown_sort_field_is_rejected(screened):
+    assert screened.get('/api/screener?sort=-price').status_code == 400
+
+
+def test_empty_table_answers_without_rows(client, monkeypatch):
+    monkeypatch.setattr(main.screener, 'table', ScreenerTable([]))
+    body = client.get('/api/screener?sort=-wacc&minDiscount=0.1').get_json()
+    assert body['total'] == 0 and body['results'] == []
@@ -0,0 +1,14 @@
+# Tests: test_sensitivity.py
+import pytest
+
+
+@pytest.mark.parametrize('query', ['waccMin=nan', 'waccMax=inf', 'growthMin=-inf', 'growthMax=NaN'])
+def test_non_finite_bounds_are_rejected(client, query):
+    response = client.get(f'/api/stock/BENCH/valuation/sensitivity?{query}')
+    assert response.status_code == 400
+    assert 'finite' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('query', ['waccSd=nan', 'cagrSd=inf'])
+def test_non_finite_spreads_are_rejected(client, query):
+    assert client.get(f'/api/stock/BENCH/valuation/montecarlo?{query}').status_code == 400
@@ -0,0 +1,38 @@
+# Tests: test_singleflight.py
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_followers_see_a_base_exception_from_the_leader():
+    flight = SingleFlight('test')
+    started, release = threading.Event(), threading.Event()
+    outcomes = []
+
+    def leader():
+        started.set()
+        release.wait()
+        raise SystemExit("worker timeout")
+
+    def follow():
+        try:
+            outcomes.append(flight.do('key', lambda: 'not run'))
+        except SystemExit as e:
+            outcomes.append(e)
+
+    leading = threading.Thread(target=lambda: pytest.raises(SystemExit, flight.do, 'key', leader))
+    leading.start()
+    started.wait()
+    following = threading.Thread(target=follow)
+    following.start()
+    while flight.stats()['coalesced'] < 1:
+        pass
+    release.set()
+    leading.join(5)
+    following.join(5)
+
+    assert not following.is_alive()
+    assert len(outcomes) == 1 and isinstance(outcomes[0], SystemExit)
+    assert flight.stats()['inFlight'] == 0